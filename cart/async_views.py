@@ -0,0 +1,160 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import (require_http_methods, require_POST,
+                                          require_safe)
+from rest_framework import serializers
+
+from products.models import Product
+from users.authentication import async_auth_required
+
+from .models import Cart, CartItem
+from .serializers import CartItemSerializer, CartSerializer
+
+User = get_user_model()
+
+
+def parse_body(request):
+    """
+    Возвращает данные тела запроса: JSON или данные формы.
+
+    Исключения:
+    - ValueError: Если тело не является корректным JSON-объектом.
+    """
+    if request.content_type == 'application/json':
+        data = json.loads(request.body or b'{}')
+        if not isinstance(data, dict):
+            raise ValueError('Ожидается JSON-объект.')
+        return data
+    return request.POST
+
+
+def validate_quantity(value):
+    """
+    Проверяет количество по правилам поля quantity
+    сериализатора CartItemSerializer.
+
+    Исключения:
+    - serializers.ValidationError: Если количество некорректно.
+    """
+    serializer = CartItemSerializer()
+    value = serializer.fields['quantity'].run_validation(value)
+    return serializer.validate_quantity(value)
+
+
+def add_to_cart(user_id, product_id, quantity):
+    """
+    Добавляет продукт в корзину пользователя двумя запросами
+    (см. CartQuerySet.touch_for_user и CartItemQuerySet.add_quantity)
+    в одной транзакции, чтобы выполнить их за один переход
+    в синхронный поток. Отклоненное добавление не меняет корзину.
+
+    Возвращает:
+    - Кортеж (элемент корзины, created).
+    """
+    with transaction.atomic():
+        cart = Cart.objects.touch_for_user(user_id)
+        return CartItem.objects.add_quantity(cart, product_id, quantity)
+
+
+@require_safe
+@async_auth_required
+async def cart_detail(request):
+    """
+    Асинхронное получение корзины текущего пользователя.
+
+    Корзина загружается так же, как в CartView (см.
+    CartQuerySet.for_detail). Если корзины нет, возвращается
+    несохраненная пустая корзина, в БД ничего не записывается.
+
+    Исключения:
+    - HTTP 401: Если пользователь из JWT удален.
+    """
+    cart = await Cart.objects.for_detail().filter(
+        user_id=request.user.pk).afirst()
+    if cart is None:
+        user = request.user
+        if not isinstance(user, User):
+            # Пользователь из JWT не загружается из БД, а корзине
+            # нужно имя пользователя.
+            try:
+                user = await User.objects.aget(pk=user.pk)
+            except User.DoesNotExist:
+                # Как JWTAuthentication в API на DRF.
+                return JsonResponse(
+                    {'detail': 'Пользователь не найден.'}, status=401)
+        cart = Cart.empty(user)
+    return JsonResponse(CartSerializer(cart).data)
+
+
+@csrf_exempt
+@require_POST
+@async_auth_required
+async def cart_add(request):
+    """
+    Асинхронное добавление продукта в корзину.
+
+    Работает как AddToCartView: количество увеличивается атомарно
+    одним запросом (см. CartItemQuerySet.add_quantity), корзина
+    создается при первом добавлении.
+
+    Возвращает:
+    - Сериализованные данные элемента корзины (CartItem)
+    и статус HTTP 201 (продукт добавлен впервые) или 200.
+
+    Исключения:
+    - HTTP 400: Если тело запроса или количество некорректны.
+    - HTTP 404: Если продукт не найден.
+    """
+    try:
+        data = parse_body(request)
+    except ValueError:
+        return JsonResponse(
+            {'detail': 'Некорректное тело запроса.'}, status=400)
+    try:
+        quantity = validate_quantity(data.get('quantity', 0))
+    except serializers.ValidationError as error:
+        return JsonResponse({'quantity': error.detail}, status=400)
+    try:
+        product = await Product.objects.with_taxonomy().aget(
+            pk=data.get('product_id'))
+    except (Product.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({'detail': 'Продукт не найден'}, status=404)
+
+    try:
+        cart_item, created = await sync_to_async(add_to_cart)(
+            request.user.pk, product.pk, quantity)
+    except ValidationError as error:
+        return JsonResponse({'quantity': error.messages}, status=400)
+
+    cart_item.product = product
+    return JsonResponse(
+        CartItemSerializer(cart_item).data, status=201 if created else 200)
+
+
+@csrf_exempt
+@require_http_methods(['DELETE'])
+@async_auth_required
+async def cart_remove(request, pk):
+    """
+    Асинхронное удаление элемента из корзины текущего пользователя.
+
+    Возвращает:
+    - Статус HTTP 204 (No Content) при успешном удалении.
+
+    Исключения:
+    - HTTP 404: Если элемент корзины не найден в корзине пользователя.
+    """
+    deleted, _ = await CartItem.objects.filter(
+        pk=pk, cart__user_id=request.user.pk).adelete()
+    if not deleted:
+        return JsonResponse(
+            {'detail': 'Элемент корзины не найден в вашей корзине.'},
+            status=404
+        )
+    return HttpResponse(status=204)
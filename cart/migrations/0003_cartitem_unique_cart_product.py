@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-17 12:30
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    """
+    Объединяет повторяющиеся элементы корзины (cart, product) в один,
+    суммируя количество, чтобы можно было добавить уникальное ограничение.
+    """
+    CartItem = apps.get_model('cart', 'CartItem')
+    duplicates = (
+        CartItem.objects
+        .values('cart_id', 'product_id')
+        .annotate(rows=Count('id'), keep_id=Min('id'), total=Sum('quantity'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        items = CartItem.objects.filter(
+            cart_id=duplicate['cart_id'], product_id=duplicate['product_id'])
+        items.exclude(pk=duplicate['keep_id']).delete()
+        items.update(quantity=min(duplicate['total'], 1000))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cart_updated_at_cartitem_updated_at'),
+        ('products', '0002_categorybase_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
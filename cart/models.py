@@ -1,12 +1,78 @@
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import DecimalField, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from products.models import Product
+from products.signals import mute_catalog_signals
 
 User = get_user_model()
 
 
+class CartQuerySet(models.QuerySet):
+    """
+    QuerySet для модели Cart.
+    """
+
+    def with_totals(self):
+        """
+        Добавляет общее количество товаров (total_items_cart) и общую
+        стоимость корзины (total_price_cart), посчитанные в БД.
+        """
+        return self.annotate(
+            total_items_cart=Coalesce(Sum('items__quantity'), 0),
+            total_price_cart=Coalesce(
+                Sum(
+                    F('items__quantity') * F('items__product__price'),
+                    output_field=DecimalField(
+                        max_digits=12, decimal_places=2)
+                ),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+
+    def touch(self):
+        """
+        Обновляет дату изменения корзин одним запросом UPDATE.
+        """
+        return self.update(updated_at=timezone.now())
+
+    def touch_for_user(self, user_id):
+        """
+        Возвращает корзину пользователя с обновленной датой изменения,
+        создавая корзину при необходимости, одним запросом
+        INSERT ... ON CONFLICT DO UPDATE.
+
+        Возвращает:
+        - Корзину (Cart) с заполненными pk и updated_at.
+        """
+        cart = Cart(user_id=user_id)
+        self.bulk_create(
+            [cart], update_conflicts=True, unique_fields=['user'],
+            update_fields=['updated_at'])
+        return cart
+
+    def for_detail(self):
+        """
+        Готовит корзину к выводу: пользователь, итоги, элементы корзины
+        и их продукты загружаются фиксированным числом запросов,
+        независимо от размера корзины. Названия подкатегории и категории
+        хранятся в самом продукте, поэтому их таблицы не присоединяются.
+        """
+        return self.with_totals().select_related('user').prefetch_related(
+            Prefetch(
+                'items',
+                queryset=CartItem.objects.select_related(
+                    'product').order_by('id')
+            )
+        )
+
+
 class Cart(models.Model):
     """
     Модель для корзины, связанной с пользователем.
@@ -20,6 +86,12 @@ class Cart(models.Model):
         'Дата создания',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
+    objects = CartQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Корзина пользователя'
@@ -28,25 +100,211 @@ class Cart(models.Model):
     def __str__(self):
         return f'Корзина пользователя: {self.user.username}'
 
+    @classmethod
+    def empty(cls, user):
+        """
+        Возвращает несохраненную пустую корзину пользователя.
+
+        Используется для чтения корзины, которой еще нет в БД:
+        строка корзины создается только при первом изменении.
+
+        Аргументы:
+        - user: Пользователь (экземпляр модели или объект
+        с атрибутом pk, например пользователь из JWT).
+        """
+        if isinstance(user, User):
+            cart = cls(user=user)
+        else:
+            cart = cls(user_id=user.pk)
+        cart.total_items_cart = 0
+        cart.total_price_cart = Decimal('0.00')
+        return cart
+
+    @property
+    def item_list(self):
+        """
+        Возвращает элементы корзины; у несохраненной корзины их нет.
+        """
+        if self.pk is None:
+            return []
+        return self.items.all()
+
     @property
     def total_items(self):
         """
         Возвращает общее количество товаров в корзине.
         """
-        return sum(item.quantity for item in self.items.all())
+        return sum(item.quantity for item in self.item_list)
 
     @property
     def total_price(self):
         """
         Возвращает общую стоимость всех товаров в корзине.
         """
-        return sum(item.total_price for item in self.items.all())
+        return sum(item.total_price for item in self.item_list)
+
+
+class CartItemQuerySet(models.QuerySet):
+    """
+    QuerySet для модели CartItem.
+    """
+
+    def add_quantity(self, cart, product_id, quantity):
+        """
+        Атомарно добавляет quantity единиц продукта в корзину одним
+        запросом INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+        Отсутствующая строка вставляется, существующая увеличивается
+        на quantity, если итог не превысит максимум. Конкурентные
+        запросы разрешаются уникальным ограничением (cart, product):
+        увеличение не теряется, дубликаты строк не создаются. Запрос
+        не вызывает сигналы модели: дату изменения корзины обновляет
+        вызывающий код (см. CartQuerySet.touch_for_user).
+
+        Аргументы:
+        - cart: Сохраненная корзина (Cart).
+        - product_id: ID существующего продукта.
+        - quantity: Добавляемое количество (от 0 до MAX_QUANTITY).
+
+        Возвращает:
+        - Кортеж (элемент корзины, created). created равно True, если
+          в корзине не было этого продукта или его количество было 0.
+
+        Исключения:
+        - ValidationError: Если итоговое количество превысит максимум.
+        """
+        alias = router.db_for_write(self.model)
+        connection = connections[alias]
+        meta = self.model._meta
+        quote_name = connection.ops.quote_name
+        table = quote_name(meta.db_table)
+        cart_column, product_column, quantity_column, updated_column = [
+            quote_name(meta.get_field(name).column)
+            for name in ('cart', 'product', 'quantity', 'updated_at')
+        ]
+        updated_at = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({cart_column}, {product_column}, '
+                f'{quantity_column}, {updated_column}) '
+                f'VALUES (%s, %s, %s, %s) '
+                f'ON CONFLICT ({cart_column}, {product_column}) DO UPDATE '
+                f'SET {quantity_column} = {table}.{quantity_column} '
+                f'+ excluded.{quantity_column}, '
+                f'{updated_column} = excluded.{updated_column} '
+                f'WHERE {table}.{quantity_column} '
+                f'+ excluded.{quantity_column} <= %s '
+                f'RETURNING {quote_name(meta.pk.column)}, {quantity_column}',
+                [cart.pk, product_id, quantity,
+                 meta.get_field('updated_at').get_db_prep_save(
+                     updated_at, connection),
+                 CartItem.MAX_QUANTITY]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            # Строка есть, но условие WHERE не выполнено.
+            raise ValidationError(CartItem.QUANTITY_ERROR)
+        pk, total = row
+        item = self.model.from_db(
+            alias, ['id', 'cart_id', 'product_id', 'quantity', 'updated_at'],
+            [pk, cart.pk, product_id, total, updated_at])
+        # Вставленная строка содержит ровно добавленное количество.
+        return item, total == quantity
+
+    # Количество попыток применить операции при конкурентной вставке
+    # того же элемента корзины.
+    APPLY_ATTEMPTS = 3
+
+    def apply_operations(self, cart, operations):
+        """
+        Применяет к корзине набор операций в одной транзакции.
+
+        Аргументы:
+        - cart: Экземпляр корзины (Cart).
+        - operations: Список словарей с ключами op ('add', 'set' или
+          'remove'), product_id и quantity. Операции применяются по
+          порядку, 'set' с количеством 0 удаляет элемент.
+
+        Существующие элементы загружаются одним запросом, новые создаются
+        через bulk_create, измененные сохраняются через bulk_update,
+        удаленные удаляются одним запросом DELETE с отключенным сигналом
+        touch_cart (дата изменения корзины обновляется один раз в конце).
+
+        select_for_update не блокирует строки, которых еще нет, а в SQLite
+        ничего не блокирует, поэтому параллельный add_quantity может
+        вставить тот же элемент между чтением и bulk_create. Тогда
+        операции применяются заново к прочитанному повторно состоянию
+        (до APPLY_ATTEMPTS раз), и добавленное количество не теряется.
+
+        Исключения:
+        - ValidationError: Если итоговое количество какого-либо элемента
+          выходит за допустимые пределы (см. CartItem.clean).
+        - IntegrityError: Если конфликт повторился APPLY_ATTEMPTS раз.
+        """
+        for attempt in range(1, self.APPLY_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    return self._apply_operations(cart, operations)
+            except IntegrityError:
+                if attempt == self.APPLY_ATTEMPTS:
+                    raise
+
+    def _apply_operations(self, cart, operations):
+        product_ids = {operation['product_id'] for operation in operations}
+        existing = {
+            item.product_id: item
+            for item in self.select_for_update().filter(
+                cart=cart, product_id__in=product_ids)
+        }
+        items = dict(existing)
+        for operation in operations:
+            product_id = operation['product_id']
+            if operation['op'] == 'remove':
+                items.pop(product_id, None)
+                continue
+            item = items.get(product_id)
+            if item is None:
+                item = existing.get(product_id) or CartItem(
+                    cart=cart, product_id=product_id)
+                item.quantity = 0
+                items[product_id] = item
+            if operation['op'] == 'add':
+                item.quantity += operation['quantity']
+            else:
+                item.quantity = operation['quantity']
+            if not item.quantity:
+                items.pop(product_id)
+
+        now = timezone.now()
+        for item in items.values():
+            item.clean()
+            item.updated_at = now
+
+        to_delete = [
+            item.pk for product_id, item in existing.items()
+            if product_id not in items
+        ]
+        if to_delete:
+            # Дата изменения корзины обновляется один раз в конце,
+            # а не сигналом touch_cart на каждый удаленный элемент.
+            with mute_catalog_signals():
+                self.filter(pk__in=to_delete).delete()
+        self.bulk_create(
+            [item for item in items.values() if item.pk is None])
+        self.bulk_update(
+            [item for item in items.values() if item.pk is not None],
+            ['quantity', 'updated_at']
+        )
+        Cart.objects.filter(pk=cart.pk).touch()
 
 
 class CartItem(models.Model):
     """
     Модель для корзины, которая содержит продукты и их количество.
     """
+    MAX_QUANTITY = 1000
+    QUANTITY_ERROR = f'Количество должно быть от 0 до {MAX_QUANTITY}.'
+
     cart = models.ForeignKey(
         Cart,
         on_delete=models.CASCADE,
@@ -62,10 +320,22 @@ class CartItem(models.Model):
         'Количество продуктов в корзине',
         default=0
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
+    objects = CartItemQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'корзина'
         verbose_name_plural = 'Корзины'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('cart', 'product'),
+                name='unique_cart_product'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.product.name} (x{self.quantity})'
@@ -81,8 +351,8 @@ class CartItem(models.Model):
         """
         Проверяет, что количество товаров находится в допустимых пределах.
         """
-        if self.quantity < 0 or self.quantity > 1000:
-            raise ValidationError('Количество должно быть от 0 до 1000.')
+        if self.quantity < 0 or self.quantity > self.MAX_QUANTITY:
+            raise ValidationError(self.QUANTITY_ERROR)
 
     def save(self, *args, **kwargs):
         """
@@ -1,4 +1,4 @@
-from django.db.models import Sum
+from django.db.models import F, Sum
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
@@ -32,7 +32,7 @@ class CartItemSerializer(serializers.ModelSerializer):
         max_digits=10, decimal_places=2, read_only=True)
     quantity = serializers.IntegerField(
         min_value=0,
-        max_value=1000,
+        max_value=CartItem.MAX_QUANTITY,
         default=0
     )
 
@@ -41,9 +41,8 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'product_id', 'quantity', 'total_price']
 
     def validate_quantity(self, value):
-        if value < 0 or value > 1000:
-            raise serializers.ValidationError(
-                "Количество должно быть от 0 до 1000.")
+        if value < 0 or value > CartItem.MAX_QUANTITY:
+            raise serializers.ValidationError(CartItem.QUANTITY_ERROR)
         return value
 
 
@@ -62,7 +61,8 @@ class CartSerializer(serializers.ModelSerializer):
     - user: Имя пользователя.
     """
 
-    items = CartItemSerializer(many=True, read_only=True)
+    items = CartItemSerializer(
+        many=True, read_only=True, source='item_list')
     total_items_cart = serializers.SerializerMethodField()
     total_price_cart = serializers.SerializerMethodField()
     user = serializers.ReadOnlyField(source='user.username')
@@ -84,8 +84,13 @@ class CartSerializer(serializers.ModelSerializer):
         Возвращает:
         - Общее количество товаров в корзине
         (сумма quantity всех элементов корзины).
+        Если корзина получена через Cart.objects.with_totals(),
+        используется уже посчитанное в БД значение.
         """
-        return obj.items.aggregate(total=Sum('quantity'))['total'] or 0
+        total = getattr(obj, 'total_items_cart', None)
+        if total is None:
+            total = obj.items.aggregate(total=Sum('quantity'))['total']
+        return total or 0
 
     @extend_schema_field(
         serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -100,6 +105,61 @@ class CartSerializer(serializers.ModelSerializer):
         Возвращает:
         - Общая стоимость всех товаров в корзине
         (сумма total_price всех элементов корзины).
+        Если корзина получена через Cart.objects.with_totals(),
+        используется уже посчитанное в БД значение.
+        """
+        total = getattr(obj, 'total_price_cart', None)
+        if total is None:
+            total = obj.items.aggregate(
+                total=Sum(F('quantity') * F('product__price'))
+            )['total']
+        return total or 0
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    Сериализатор для одной операции пакетного изменения корзины.
+
+    Поля:
+    - op: Тип операции: add (добавить количество), set (установить
+    количество, 0 удаляет элемент) или remove (удалить элемент).
+    - product_id: ID продукта.
+    - quantity: Количество продукта (для add и set).
+    """
+
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(
+        min_value=0,
+        max_value=CartItem.MAX_QUANTITY,
+        default=0
+    )
+
+    validate_quantity = CartItemSerializer.validate_quantity
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """
+    Сериализатор для пакетного изменения корзины.
+
+    Поля:
+    - operations: Список операций (см. CartOperationSerializer),
+    применяемых по порядку в одной транзакции.
+    """
+
+    operations = CartOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, operations):
+        """
+        Проверяет существование всех продуктов одним запросом.
         """
-        total = sum(item.total_price for item in obj.items.all())
-        return total
+        product_ids = {operation['product_id'] for operation in operations}
+        existing = set(
+            Product.objects.filter(pk__in=product_ids)
+            .values_list('pk', flat=True)
+        )
+        missing = sorted(product_ids - existing)
+        if missing:
+            raise serializers.ValidationError(
+                f'Продукты не найдены: {", ".join(map(str, missing))}.')
+        return operations
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.signals import signals_muted
+
+from .models import Cart, CartItem
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def touch_cart(sender, instance, **kwargs):
+    """
+    Обновляет дату изменения корзины при изменении или удалении
+    её элемента, чтобы менялись ETag и Last-Modified корзины.
+    """
+    if signals_muted.get():
+        return
+    Cart.objects.filter(pk=instance.cart_id).touch()
@@ -1,7 +1,7 @@
 from django.urls import path
 
-from .views import (AddToCartView, CartView, ClearCartView, RemoveFromCartView,
-                    UpdateCartItemView)
+from .views import (AddToCartView, BatchCartView, CartView, ClearCartView,
+                    RemoveFromCartView, UpdateCartItemView)
 
 urlpatterns = [
     path('', CartView.as_view(), name='cart-detail'),
@@ -9,4 +9,5 @@ urlpatterns = [
     path('update/<int:pk>/', UpdateCartItemView.as_view(), name='cart-update'),
     path('remove/<int:pk>/', RemoveFromCartView.as_view(), name='cart-remove'),
     path('clear/', ClearCartView.as_view(), name='cart-clear'),
+    path('batch/', BatchCartView.as_view(), name='cart-batch'),
 ]
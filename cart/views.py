@@ -1,33 +1,81 @@
-from rest_framework import generics, permissions, status
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
+from products.cache import get_catalog_last_modified, get_catalog_version
+from products.mixins import ConditionalGetMixin
 from products.models import Product
 
 from .models import Cart, CartItem
-from .serializers import CartItemSerializer, CartSerializer
+from .serializers import (CartBatchSerializer, CartItemSerializer,
+                          CartSerializer)
 
 
-class CartView(generics.RetrieveAPIView):
+class CartView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     Представление для получения корзины пользователя.
 
     Поддерживает только GET-запросы.
     Доступно только для аутентифицированных пользователей.
+    Поддерживает условные запросы: ETag и Last-Modified вычисляются
+    по дате изменения корзины и версии каталога без сериализации.
     """
 
     serializer_class = CartSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get_cart_updated_at(self):
+        """
+        Возвращает дату изменения корзины текущего пользователя
+        или None, если корзины нет.
+        """
+        if not hasattr(self, '_cart_updated_at'):
+            self._cart_updated_at = Cart.objects.filter(
+                user_id=self.request.user.pk
+            ).values_list('updated_at', flat=True).first()
+        return self._cart_updated_at
+
+    def get_etag(self, request, *args, **kwargs):
+        updated_at = self.get_cart_updated_at()
+        state = updated_at.isoformat() if updated_at else 'empty'
+        return hashlib.md5(
+            f'{request.user.pk}:{state}:{get_catalog_version()}:'
+            f'{request.accepted_media_type}'.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        updated_at = self.get_cart_updated_at()
+        if updated_at is None:
+            return None
+        catalog_modified = get_catalog_last_modified()
+        if catalog_modified is None:
+            return updated_at
+        return max(updated_at, catalog_modified)
+
     def get_object(self):
         """
         Получает корзину текущего пользователя.
-        Если корзина не существует, создает её.
+
+        Корзина, её элементы, продукты и итоги загружаются
+        фиксированным числом запросов (см. CartQuerySet.for_detail).
+        Если корзины нет, возвращается несохраненная пустая корзина:
+        чтение ничего не пишет в БД, строка корзины создается
+        при первом изменении.
 
         Возвращает:
         - Экземпляр корзины (Cart) для текущего пользователя.
         """
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
+        cart = None
+        if self.get_cart_updated_at() is not None:
+            cart = Cart.objects.for_detail().filter(
+                user_id=self.request.user.pk).first()
+        if cart is None:
+            cart = Cart.empty(self.request.user)
         return cart
 
 
@@ -54,27 +102,59 @@ class AddToCartView(generics.CreateAPIView):
         и статус HTTP 200 (если продукт уже был в корзине).
         - Сериализованные данные элемента корзины (CartItem)
         и статус HTTP 201 (если продукт добавлен впервые).
-        """
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        product_id = request.data.get('product_id')
-        quantity = request.data.get('quantity', 0)
 
+        Продукт загружается одним запросом (он нужен для ответа),
+        корзина создается или получает новую дату изменения одним
+        запросом (см. CartQuerySet.touch_for_user), количество
+        увеличивается атомарно одним запросом, возвращающим элемент
+        корзины (см. CartItemQuerySet.add_quantity), поэтому
+        параллельные запросы не теряют обновления. Обе записи идут
+        в одной транзакции: отклоненное добавление не меняет корзину.
+
+        Исключения:
+        - HTTP 400: Если количество некорректно или итоговое количество
+        превысит допустимое.
+        - NotFound: Если продукт не найден.
+        """
+        quantity = self.get_quantity(request)
         try:
-            product = Product.objects.get(pk=product_id)
-        except Product.DoesNotExist:
+            product = Product.objects.with_taxonomy().get(
+                pk=request.data.get('product_id'))
+        except (Product.DoesNotExist, ValueError, TypeError):
             raise NotFound('Продукт не найден')
 
         try:
-            cart_item = CartItem.objects.get(cart=cart, product=product)
-            cart_item.quantity += int(quantity)
-            cart_item.save()
-            serializer = CartItemSerializer(cart_item)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except CartItem.DoesNotExist:
-            cart_item = CartItem.objects.create(
-                cart=cart, product=product, quantity=int(quantity))
-            serializer = CartItemSerializer(cart_item)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # Отклоненное добавление откатывает и запись корзины,
+            # поэтому ее дата изменения (ETag) не меняется.
+            with transaction.atomic():
+                cart = Cart.objects.touch_for_user(self.request.user.pk)
+                cart_item, created = CartItem.objects.add_quantity(
+                    cart, product.pk, quantity)
+        except ValidationError as error:
+            raise serializers.ValidationError({'quantity': error.messages})
+
+        cart_item.product = product
+        serializer = CartItemSerializer(cart_item)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def get_quantity(self, request):
+        """
+        Проверяет количество из запроса по правилам поля quantity
+        сериализатора CartItemSerializer.
+
+        Возвращает:
+        - Количество продукта (целое число).
+        """
+        serializer = self.get_serializer()
+        value = request.data.get('quantity', 0)
+        try:
+            value = serializer.fields['quantity'].run_validation(value)
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError({'quantity': error.detail})
+        return serializer.validate_quantity(value)
 
 
 class UpdateCartItemView(generics.UpdateAPIView):
@@ -101,7 +181,7 @@ class UpdateCartItemView(generics.UpdateAPIView):
         - NotFound: Если корзина или элемент корзины не найдены.
         """
         try:
-            cart = Cart.objects.get(user=self.request.user)
+            cart = Cart.objects.get(user_id=self.request.user.pk)
             return CartItem.objects.get(pk=self.kwargs['pk'], cart=cart)
         except Cart.DoesNotExist:
             raise NotFound('Корзина не найдена для этого пользователя.')
@@ -173,7 +253,7 @@ class RemoveFromCartView(generics.DestroyAPIView):
         - NotFound: Если корзина или элемент корзины не найдены.
         """
         try:
-            cart = Cart.objects.get(user=self.request.user)
+            cart = Cart.objects.get(user_id=self.request.user.pk)
             return CartItem.objects.get(pk=self.kwargs['pk'], cart=cart)
         except Cart.DoesNotExist:
             raise NotFound('Корзина не найдена для этого пользователя.')
@@ -181,6 +261,50 @@ class RemoveFromCartView(generics.DestroyAPIView):
             raise NotFound('Элемент корзины не найден в вашей корзине.')
 
 
+class BatchCartView(generics.GenericAPIView):
+    """
+    Представление для пакетного изменения корзины.
+
+    Поддерживает только POST-запросы.
+    Доступно только для аутентифицированных пользователей.
+    Позволяет за один запрос применить к корзине много операций
+    add/set/remove, например при синхронизации корзины после
+    изменений в офлайне.
+    """
+
+    serializer_class = CartBatchSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        """
+        Применяет операции к корзине текущего пользователя.
+
+        Все операции применяются в одной транзакции: либо все,
+        либо ни одной.
+
+        Возвращает:
+        - Сериализованные данные обновленной корзины (Cart)
+        и статус HTTP 200.
+
+        Исключения:
+        - HTTP 400: Если операции некорректны, продукт не найден
+        или итоговое количество выходит за допустимые пределы.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        cart, _ = Cart.objects.get_or_create(user_id=self.request.user.pk)
+        try:
+            CartItem.objects.apply_operations(
+                cart, serializer.validated_data['operations'])
+        except ValidationError as error:
+            raise serializers.ValidationError(
+                {'operations': error.messages})
+
+        cart = Cart.objects.for_detail().get(pk=cart.pk)
+        return Response(CartSerializer(cart).data)
+
+
 class ClearCartView(generics.DestroyAPIView):
     """
     Представление для очистки корзины пользователя.
@@ -202,7 +326,7 @@ class ClearCartView(generics.DestroyAPIView):
         - NotFound: Если корзина не найдена.
         """
         try:
-            cart = Cart.objects.get(user=self.request.user)
+            cart = Cart.objects.get(user_id=self.request.user.pk)
             CartItem.objects.filter(cart=cart).delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Cart.DoesNotExist:
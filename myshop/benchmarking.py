@@ -0,0 +1,110 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+# Кэш, который ничего не хранит: с ним эндпоинты каталога выполняют
+# запросы к БД, а не отдают сохраненный ответ.
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    """
+    Контекстный менеджер, создающий отдельную тестовую базу данных
+    для бенчмарков.
+
+    Таблицы создаются миграциями, после выхода из блока база удаляется,
+    а соединение возвращается к рабочей базе. Данные рабочей базы
+    не изменяются.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, keepdb=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+@contextmanager
+def database_profile(name):
+    """
+    Контекстный менеджер, применяющий к соединению default профиль
+    настроек из settings.DATABASE_PROFILES.
+
+    Настройки соединения читаются при подключении, поэтому текущее
+    соединение закрывается на входе и на выходе, после выхода
+    восстанавливаются прежние настройки.
+    """
+    profile = settings.DATABASE_PROFILES[name]
+    previous = {key: connection.settings_dict[key] for key in profile}
+    connection.close()
+    connection.settings_dict.update(profile)
+    try:
+        yield connection
+    finally:
+        connection.close()
+        connection.settings_dict.update(previous)
+
+
+def percentile(values, percent):
+    """
+    Возвращает перцентиль отсортированного списка значений
+    (ближайший ранг).
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1,
+                       round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def measure(func, repeat=1):
+    """
+    Вызывает func repeat раз и возвращает список длительностей
+    в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings):
+    """
+    Возвращает сводку по длительностям в миллисекундах.
+
+    Возвращает:
+    - Словарь с количеством замеров (count), средним (mean),
+      медианой (p50), перцентилями p95 и p99 и максимумом (max).
+    """
+    values = sorted(timings)
+    return {
+        'count': len(values),
+        'mean': statistics.fmean(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+    }
+
+
+def format_summary(name, summary):
+    """
+    Форматирует сводку замеров в одну строку.
+    """
+    return (
+        f'{name}: {summary["count"]} замеров, '
+        f'среднее {summary["mean"]:.2f} мс, '
+        f'p50 {summary["p50"]:.2f} мс, '
+        f'p95 {summary["p95"]:.2f} мс, '
+        f'p99 {summary["p99"]:.2f} мс, '
+        f'max {summary["max"]:.2f} мс'
+    )
@@ -0,0 +1,200 @@
+import math
+import threading
+from bisect import bisect_left
+
+# Границы корзин гистограмм (верхние, включительно).
+DURATION_BUCKETS = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Метрики запросов: имя, описание и границы корзин.
+REQUEST_METRICS = (
+    ('myshop_request_duration_ms',
+     'Время обработки запроса, мс.', DURATION_BUCKETS),
+    ('myshop_request_db_queries',
+     'Количество запросов к БД за запрос.', QUERY_BUCKETS),
+    ('myshop_request_db_duration_ms',
+     'Время запросов к БД за запрос, мс.', DURATION_BUCKETS),
+    ('myshop_response_size_bytes',
+     'Размер тела ответа, байт.', SIZE_BUCKETS),
+)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами.
+
+    Хранит количество значений в каждой корзине, их сумму и общее
+    количество. Перцентили оцениваются линейной интерполяцией внутри
+    корзины, как histogram_quantile в Prometheus, поэтому память
+    не растет с числом наблюдений.
+
+    Аргументы:
+    - buckets: Возрастающие верхние границы корзин.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        """
+        Добавляет значение в гистограмму.
+        """
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        """
+        Возвращает согласованную копию состояния гистограммы.
+
+        Возвращает:
+        - Кортеж (накопленные количества по корзинам, включая +Inf,
+          сумма, количество).
+        """
+        with self.lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+    def quantile(self, q, cumulative=None):
+        """
+        Возвращает оценку перцентиля q (от 0 до 1) или NaN,
+        если наблюдений нет.
+
+        Значения в последней корзине (выше последней границы)
+        оцениваются последней границей.
+        """
+        if cumulative is None:
+            cumulative = self.snapshot()[0]
+        count = cumulative[-1]
+        if not count:
+            return math.nan
+        rank = q * count
+        index = bisect_left(cumulative, rank)
+        if index >= len(self.buckets):
+            return float(self.buckets[-1])
+        lower = self.buckets[index - 1] if index else 0
+        below = cumulative[index - 1] if index else 0
+        in_bucket = cumulative[index] - below
+        upper = self.buckets[index]
+        if not in_bucket:
+            return float(upper)
+        return lower + (upper - lower) * (rank - below) / in_bucket
+
+
+class RequestMetrics:
+    """
+    Метрики запросов в памяти процесса, по имени представления.
+
+    Для каждого имени URL (например, cart-detail или product-list)
+    ведутся гистограммы из REQUEST_METRICS. Каждый процесс сервера
+    хранит свои метрики.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def get_histograms(self, view):
+        histograms = self.histograms.get(view)
+        if histograms is None:
+            with self.lock:
+                histograms = self.histograms.setdefault(view, {
+                    name: Histogram(buckets)
+                    for name, _, buckets in REQUEST_METRICS
+                })
+        return histograms
+
+    def observe(self, view, duration, queries, db_duration, size=None):
+        """
+        Записывает метрики одного запроса.
+
+        Аргументы:
+        - view: Имя представления (resolver_match.view_name).
+        - duration: Время обработки запроса, мс.
+        - queries: Количество запросов к БД.
+        - db_duration: Время запросов к БД, мс.
+        - size: Размер тела ответа в байтах (None, если неизвестен).
+        """
+        histograms = self.get_histograms(view)
+        histograms['myshop_request_duration_ms'].observe(duration)
+        histograms['myshop_request_db_queries'].observe(queries)
+        histograms['myshop_request_db_duration_ms'].observe(db_duration)
+        if size is not None:
+            histograms['myshop_response_size_bytes'].observe(size)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def render(self):
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+
+        Для каждой метрики выводится гистограмма (_bucket, _sum,
+        _count) и перцентили p50/p95/p99 (метрика с суффиксом
+        _quantile).
+        """
+        lines = []
+        with self.lock:
+            views = sorted(self.histograms.items())
+        for name, description, buckets in REQUEST_METRICS:
+            lines += [f'# HELP {name} {description}',
+                      f'# TYPE {name} histogram']
+            quantile_lines = []
+            for view, histograms in views:
+                label = f'view="{escape_label(view)}"'
+                cumulative, total, count = histograms[name].snapshot()
+                for bound, value in zip(buckets, cumulative):
+                    lines.append(
+                        f'{name}_bucket{{{label},le="{bound}"}} {value}')
+                lines += [
+                    f'{name}_bucket{{{label},le="+Inf"}} {count}',
+                    f'{name}_sum{{{label}}} {format_value(total)}',
+                    f'{name}_count{{{label}}} {count}',
+                ]
+                quantile_lines += [
+                    f'{name}_quantile{{{label},quantile="{q}"}} '
+                    f'{format_value(histograms[name].quantile(q, cumulative))}'
+                    for q in QUANTILES
+                ]
+            lines += [f'# HELP {name}_quantile {description} Перцентили.',
+                      f'# TYPE {name}_quantile gauge', *quantile_lines]
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    """
+    Экранирует значение метки для текстового формата Prometheus.
+    """
+    return (value.replace('\\', '\\\\').replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+def format_value(value):
+    """
+    Форматирует число для текстового формата Prometheus.
+    """
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        return f'{value:.3f}'.rstrip('0').rstrip('.')
+    return str(value)
+
+
+request_metrics = RequestMetrics()
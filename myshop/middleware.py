@@ -0,0 +1,175 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import request_metrics
+from .routers import replica_reads
+
+# Имя для запросов, адрес которых не сопоставлен ни с одним URL.
+UNRESOLVED_VIEW = '<unresolved>'
+# HTTP-методы, не изменяющие данные.
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class QueryCounter:
+    """
+    Счетчик количества запросов к БД и их суммарного времени
+    в миллисекундах за один HTTP-запрос.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Счетчик текущего HTTP-запроса. Контекст копируется в потоки
+# sync_to_async, поэтому запросы асинхронных представлений
+# учитываются в счетчике своего HTTP-запроса.
+current_counter = ContextVar('query_counter', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Обертка выполнения SQL (connection.execute_wrappers), добавляющая
+    запрос в счетчик текущего HTTP-запроса. Работает без DEBUG,
+    в отличие от connection.queries.
+    """
+    counter = current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counter.duration += (time.perf_counter() - started) * 1000
+        counter.count += 1
+
+
+def install_query_counter(connection, **kwargs):
+    """
+    Подключает count_query к соединению с БД.
+
+    Обертка ставится первой, чтобы connection.execute_wrapper()
+    других модулей снимал свою обертку, а не эту.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+# Соединения создаются в каждом потоке отдельно, в том числе в потоках
+# sync_to_async, поэтому обертка подключается при создании соединения.
+connection_created.connect(install_query_counter)
+
+
+class MetricsMiddleware:
+    """
+    Middleware, измеряющее каждый запрос.
+
+    Для каждого запроса измеряются время обработки, количество
+    и время запросов к БД и размер ответа. Метрики накапливаются
+    в гистограммах по имени представления (см. myshop.metrics)
+    и добавляются в заголовок ответа Server-Timing
+    (app - время обработки, db - время запросов к БД).
+    Поддерживает синхронные (WSGI) и асинхронные (ASGI) запросы.
+    Должно стоять первым в MIDDLEWARE, чтобы учитывать время
+    остальных middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Соединения, открытые до загрузки middleware.
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, counter, started)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, counter, started)
+        return response
+
+    def record(self, request, response, counter, started):
+        duration = (time.perf_counter() - started) * 1000
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else None
+        request_metrics.observe(
+            view or UNRESOLVED_VIEW, duration, counter.count,
+            counter.duration, get_response_size(response))
+        response['Server-Timing'] = (
+            f'app;dur={duration:.1f}, '
+            f'db;dur={counter.duration:.1f};desc="{counter.count} queries"'
+        )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware, задающее границу запроса для ReplicaRouter.
+
+    Чтение каталога в запросе идет с реплик, пока запрос не запишет
+    что-либо в основную БД; запросы с изменяющими методами (POST, PUT,
+    PATCH, DELETE) читают из основной БД с самого начала, так как
+    проверки перед записью не должны видеть отстающую реплику.
+    Закрепление за основной БД снимается по окончании запроса.
+    Поддерживает синхронные (WSGI) и асинхронные (ASGI) запросы.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with replica_reads(pinned=writes(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with replica_reads(pinned=writes(request)):
+            return await self.get_response(request)
+
+
+def writes(request):
+    """Возвращает True для запросов с изменяющим HTTP-методом."""
+    return request.method not in SAFE_METHODS
+
+
+def get_response_size(response):
+    """
+    Возвращает размер тела ответа в байтах или None, если он
+    неизвестен (потоковый ответ без заголовка Content-Length).
+    """
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
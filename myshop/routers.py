@@ -0,0 +1,129 @@
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Приложения, чтение моделей которых идет с реплик.
+REPLICA_APPS = {'products'}
+
+
+class RoutingState:
+    """
+    Состояние маршрутизации одного HTTP-запроса: pinned - запрос
+    пишет в основную БД, и чтение идет из нее же.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+
+
+# Состояние текущего HTTP-запроса. Объект изменяемый, поэтому запись
+# в потоке sync_to_async закрепляет и асинхронный запрос целиком.
+current_state = ContextVar('replica_routing', default=None)
+
+
+@contextmanager
+def replica_reads(pinned=False):
+    """
+    Контекстный менеджер, разрешающий чтение с реплик в пределах
+    блока (HTTP-запроса, см. ReplicaRoutingMiddleware). С pinned=True
+    блок с самого начала читает из основной БД.
+
+    Вне блока все запросы идут в основную БД: у management-команд
+    и фоновых задач нет границы запроса, после которой закрепление
+    за основной БД можно было бы снять.
+    """
+    state = RoutingState(pinned)
+    token = current_state.set(state)
+    try:
+        yield state
+    finally:
+        current_state.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Контекстный менеджер, направляющий чтение в пределах блока
+    в основную БД.
+
+    Используется для чтения, результат которого сохраняется в кэш
+    каталога: ключ кэша содержит текущую версию каталога, и ответ
+    с отстающей реплики остался бы в кэше под новой версией
+    и после того, как реплика догонит основную БД.
+    """
+    state = current_state.get()
+    if state is None or state.pinned:
+        yield
+        return
+    state.pinned = True
+    try:
+        yield
+    finally:
+        state.pinned = False
+
+
+class ReplicaRouter:
+    """
+    Роутер, направляющий чтение каталога на реплики.
+
+    Реплики и их веса задаются в settings.DATABASE_REPLICAS
+    ({алиас: вес}). Реплика выбирается по кругу, реплика с весом n
+    выбирается n раз за круг; при равных весах это обычный
+    round-robin. Запись всегда идет в основную БД, после первой
+    записи запрос закрепляется за основной БД, чтобы читать
+    собственные изменения (корзина, админка).
+
+    Чтение, которое готовит запись (проверка уникальности формы,
+    подбор слага), не должно идти на отстающую реплику: поэтому
+    запросы с изменяющими HTTP-методами закрепляются за основной БД
+    сразу (ReplicaRoutingMiddleware), а подбор слага читает из БД
+    для записи (products.slugs). Чтение для кэша каталога также идет
+    в основную БД (primary_reads).
+    """
+
+    def __init__(self):
+        self.counter = itertools.count()
+
+    def get_replica(self):
+        """
+        Возвращает алиас следующей реплики или None, если реплики
+        не настроены.
+        """
+        rotation = [
+            alias
+            for alias, weight in settings.DATABASE_REPLICAS.items()
+            for _ in range(weight)
+        ]
+        if not rotation:
+            return None
+        return rotation[next(self.counter) % len(rotation)]
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if (state is None or state.pinned
+                or model._meta.app_label not in REPLICA_APPS):
+            return DEFAULT_DB_ALIAS
+        return self.get_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД, поэтому
+        # продукт, прочитанный с реплики, можно добавить в корзину.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик повторяет основную БД при репликации.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
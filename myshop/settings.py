@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 
     'rest_framework',
     'rest_framework.authtoken',
+    'rest_framework_simplejwt.token_blacklist',
     'django_filters',
     'drf_spectacular',
 
@@ -40,6 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы измерять время всех остальных middleware
+    'myshop.middleware.MetricsMiddleware',
+    'myshop.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,8 +82,65 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая БД в файле, а не в памяти: in-memory SQLite с общим
+        # кэшем не дает параллельным соединениям ждать блокировку,
+        # что делает невозможными тесты конкурентных запросов.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
+# Профили настроек SQLite, профиль выбирается переменной окружения
+# DB_PROFILE. Профиль production:
+# - журнал WAL: читатели не блокируются записью, synchronous=NORMAL
+#   в режиме WAL не теряет целостность при сбое процесса;
+# - mmap (256 МБ) и кэш страниц (64 МБ) уменьшают число чтений с диска;
+# - увеличенное ожидание блокировки вместо "database is locked";
+# - транзакции BEGIN IMMEDIATE: блокировка записи берется в начале
+#   транзакции, поэтому чтение с последующей записью не упирается
+#   во взаимную блокировку (ее SQLite не ждет, а сразу возвращает ошибку);
+# - постоянные соединения с проверкой перед использованием.
+DATABASE_PROFILES = {
+    'default': {
+        'OPTIONS': {},
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+    },
+    'production': {
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA cache_size=-65536;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+            # Ожидание блокировки в секундах (PRAGMA busy_timeout),
+            # по умолчанию 5.
+            'timeout': 20,
+        },
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+DB_PROFILE = os.getenv('DB_PROFILE', 'default')
+DATABASES['default'].update(DATABASE_PROFILES[DB_PROFILE])
+# Реплики для чтения каталога (см. myshop.routers.ReplicaRouter):
+# DATABASE_REPLICAS=replica1:2,replica2:1 - алиасы и веса (по умолчанию 1).
+# Локально реплика - отдельный файл SQLite db_<алиас>.sqlite3,
+# копия основной БД (python manage.py sync_replicas). В тестах
+# реплики - зеркала тестовой БД.
+DATABASE_REPLICAS = {}
+for replica in filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')):
+    alias, _, weight = replica.strip().partition(':')
+    DATABASE_REPLICAS[alias] = int(weight or 1)
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['myshop.routers.ReplicaRouter']
 # Настройки для подключения БД Postgresql
 # DATABASES = {
 #     'default': {
@@ -98,6 +160,53 @@ DATABASES = {
 # DB_HOST=your_name_host
 # DB_PORT=your_port
 
+# Кэш. Бэкенд задается переменными окружения, по умолчанию используется
+# локальная память процесса (locmem). Для нескольких процессов стоит
+# подключить общий бэкенд, например
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Алиас кэша и время жизни ответов эндпоинтов каталога (в секундах)
+CATALOG_CACHE_ALIAS = os.getenv('CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 60 * 15))
+
+# Вывод списка продуктов из values_list без ModelSerializer
+PRODUCT_LIST_FAST_PATH = os.getenv(
+    'PRODUCT_LIST_FAST_PATH', 'True') in ['True', 'true', '1']
+
+# Производные изображения продуктов: размеры (ширина, высота),
+# формат и качество. Файлы отдаются по прямым ссылкам без согласования
+# формата, поэтому по умолчанию JPEG; WEBP - если все клиенты его
+# поддерживают (без поддержки WebP в Pillow - JPEG)
+PRODUCT_IMAGE_SIZES = {
+    'small': (200, 200),
+    'medium': (600, 600),
+    'large': (1200, 1200),
+}
+PRODUCT_IMAGE_FORMAT = os.getenv('PRODUCT_IMAGE_FORMAT', 'JPEG')
+PRODUCT_IMAGE_QUALITY = int(os.getenv('PRODUCT_IMAGE_QUALITY', 80))
+
+# Превью изображений из MEDIA_ROOT по адресу MEDIA_URL/w/<ширина>/<путь>
+# (WebP, если клиент принимает image/webp, иначе JPEG):
+# допустимые ширины, каталог дискового кэша и время кэширования
+# в браузере и CDN (в секундах)
+THUMBNAIL_WIDTHS = (160, 320, 480, 640, 960, 1280)
+THUMBNAIL_CACHE_DIR = os.getenv(
+    'THUMBNAIL_CACHE_DIR', os.path.join(BASE_DIR, 'thumbnails'))
+THUMBNAIL_MAX_AGE = int(os.getenv('THUMBNAIL_MAX_AGE', 60 * 60 * 24 * 365))
+
+# Максимальное количество результатов полнотекстового поиска продуктов
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 1000))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -133,6 +242,10 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # JWT (заголовок 'Bearer <token>') проверяется без запросов к БД,
+        # токены 'Token <token>' по-прежнему принимаются.
+        'rest_framework_simplejwt.authentication.'
+        'JWTStatelessUserAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -141,6 +254,20 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# JWT: короткоживущий access-токен проверяется только по подписи,
+# refresh-токены обновляются при каждом использовании, старые
+# и отозванные попадают в черный список
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        seconds=int(os.getenv('JWT_ACCESS_TOKEN_LIFETIME', 5 * 60))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(
+        seconds=int(os.getenv('JWT_REFRESH_TOKEN_LIFETIME', 24 * 60 * 60))),
+    'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True,
+    'UPDATE_LAST_LOGIN': False,
+    'AUTH_HEADER_TYPES': ('Bearer',),
+}
+
 # Swagger settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Shop API',
@@ -5,18 +5,46 @@ from django.urls import include, path
 from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework_simplejwt.views import (TokenBlacklistView,
+                                            TokenObtainPairView,
+                                            TokenRefreshView, TokenVerifyView)
+
+from cart.async_views import cart_add, cart_detail, cart_remove
+from products.async_views import product_detail, product_list
+from products.views import thumbnail
+
+from .views import metrics
+
+# Асинхронные версии эндпоинтов каталога и корзины для запуска
+# под ASGI-сервером (см. myshop/asgi.py).
+async_urlpatterns = [
+    path('products/', product_list, name='async-product-list'),
+    path('products/<int:pk>/', product_detail, name='async-product-detail'),
+    path('cart/', cart_detail, name='async-cart-detail'),
+    path('cart/add/', cart_add, name='async-cart-add'),
+    path('cart/remove/<int:pk>/', cart_remove, name='async-cart-remove'),
+]
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
     path('api/token-auth/', obtain_auth_token, name='token-auth'),
+    path('api/jwt/create/', TokenObtainPairView.as_view(), name='jwt-create'),
+    path('api/jwt/refresh/', TokenRefreshView.as_view(), name='jwt-refresh'),
+    path('api/jwt/verify/', TokenVerifyView.as_view(), name='jwt-verify'),
+    path('api/jwt/blacklist/', TokenBlacklistView.as_view(),
+         name='jwt-blacklist'),
     path('api/', include('products.urls')),
     path('api/cart/', include('cart.urls')),
+    path('api/async/', include(async_urlpatterns)),
+    path('metrics/', metrics, name='metrics'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/',
          SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/',
          SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path(f'{settings.MEDIA_URL.strip("/")}/w/<int:width>/<path:path>',
+         thumbnail, name='thumbnail'),
 ]
 
 if settings.DEBUG:
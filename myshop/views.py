@@ -0,0 +1,45 @@
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import (api_view, authentication_classes,
+                                       permission_classes)
+from rest_framework.settings import api_settings
+
+from products.cache import get_cache_stats
+
+from .metrics import request_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@api_view(['GET'])
+@authentication_classes(
+    [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, SessionAuthentication])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    """
+    Метрики запросов процесса в текстовом формате Prometheus.
+
+    Доступно только администраторам (is_staff): по токену или по сессии
+    админки. Содержит гистограммы и перцентили p50/p95/p99 времени
+    обработки, количества и времени запросов к БД и размера ответа
+    по имени представления (см. myshop.middleware.MetricsMiddleware),
+    а также счетчики попаданий и промахов кэша ответов каталога.
+    Метрики хранятся в памяти процесса: при нескольких процессах
+    сервера каждый отдает свои.
+    """
+    stats = get_cache_stats()
+    cache_lines = [
+        '# HELP myshop_catalog_cache_hits_total '
+        'Попадания в кэш ответов каталога.',
+        '# TYPE myshop_catalog_cache_hits_total counter',
+        f'myshop_catalog_cache_hits_total {stats["hits"]}',
+        '# HELP myshop_catalog_cache_misses_total '
+        'Промахи кэша ответов каталога.',
+        '# TYPE myshop_catalog_cache_misses_total counter',
+        f'myshop_catalog_cache_misses_total {stats["misses"]}',
+    ]
+    return HttpResponse(
+        request_metrics.render() + '\n'.join(cache_lines) + '\n',
+        content_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from .images import build_product_images
 from .models import Category, Product, Subcategory
 
 
@@ -31,10 +32,16 @@ class SubcategoryAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'price', 'parent_subcategory', 'image_small')
     list_display_links = ('id', 'name')
-    search_fields = ('id', 'name', 'parent_subcategory__name',
-                     'parent_subcategory__parent_category__name')
+    search_fields = ('id', 'name', 'subcategory_name', 'category_name')
     ordering = ('parent_subcategory', 'id')
     empty_value_display = '-пусто-'
     list_filter = ('parent_subcategory',)
     # Автоматическое заполнение slug на основе name
     prepopulated_fields = {'slug': ('name',)}
+
+    def save_model(self, request, obj, form, change):
+        # Маленькое, среднее и большое изображения строятся
+        # из загруженного исходного.
+        if 'image_source' in form.changed_data and obj.image_source:
+            build_product_images(obj)
+        super().save_model(request, obj, form, change)
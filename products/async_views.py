@@ -0,0 +1,82 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from .filters import ProductFilter
+from .models import Product
+from .paginations import CustomPagination
+from .serializers import ProductSerializer
+
+
+def get_page_size(request):
+    """
+    Возвращает размер страницы из параметра page_size с теми же
+    ограничениями, что и у CustomPagination.
+    """
+    try:
+        page_size = int(request.GET['page_size'])
+    except (KeyError, ValueError):
+        return CustomPagination.page_size
+    if page_size <= 0:
+        return CustomPagination.page_size
+    return min(page_size, CustomPagination.max_page_size)
+
+
+@require_safe
+async def product_list(request):
+    """
+    Асинхронный список продуктов.
+
+    Принимает те же фильтры, что и /api/products/ (см. ProductFilter).
+    Продукты сортируются по id и разбиваются на страницы по ключу:
+    следующая страница запрашивается параметром after=<id последнего
+    продукта>, ссылка на нее возвращается в поле next.
+
+    Возвращает:
+    - Словарь с полями next и results (сериализованные продукты).
+
+    Исключения:
+    - HTTP 400: Если параметры фильтров или after некорректны.
+    """
+    filterset = ProductFilter(
+        request.GET, queryset=Product.objects.with_taxonomy())
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors, status=400)
+    queryset = filterset.qs.order_by('id')
+
+    after = request.GET.get('after')
+    if after is not None:
+        try:
+            queryset = queryset.filter(pk__gt=int(after))
+        except ValueError:
+            return JsonResponse(
+                {'after': ['Введите целое число.']}, status=400)
+
+    page_size = get_page_size(request)
+    products = [product async for product in queryset[:page_size + 1]]
+    next_url = None
+    if len(products) > page_size:
+        products = products[:page_size]
+        query = request.GET.copy()
+        query['after'] = products[-1].pk
+        next_url = request.build_absolute_uri(
+            f'{request.path}?{query.urlencode()}')
+
+    serializer = ProductSerializer(
+        products, many=True, context={'request': request})
+    return JsonResponse({'next': next_url, 'results': serializer.data})
+
+
+@require_safe
+async def product_detail(request, pk):
+    """
+    Асинхронное получение продукта по его ID.
+
+    Исключения:
+    - HTTP 404: Если продукт не найден.
+    """
+    try:
+        product = await Product.objects.with_taxonomy().aget(pk=pk)
+    except Product.DoesNotExist:
+        return JsonResponse({'detail': 'Продукт не найден'}, status=404)
+    serializer = ProductSerializer(product, context={'request': request})
+    return JsonResponse(serializer.data)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+from itertools import islice
+
+from django.db import connections, router
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .models import CategoryBase
+from .slugs import assign_unique_slugs
+
+logger = logging.getLogger(__name__)
+
+# Количество слагов в одном запросе поиска существующих записей.
+SLUG_LOOKUP_BATCH_SIZE = 1000
+
+
+def iter_json_array(path, chunk_size=64 * 1024):
+    """
+    Поэлементно читает JSON-файл с массивом верхнего уровня.
+
+    Файл читается кусками по chunk_size символов, в памяти держится
+    только текущий кусок и разобранный элемент, поэтому размер файла
+    не ограничен объемом памяти.
+
+    Исключения:
+    - json.JSONDecodeError: Если файл не является JSON-массивом.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as data_file:
+        buffer, position, eof = '', 0, False
+
+        def read_more():
+            nonlocal buffer, position, eof
+            chunk = data_file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            return not eof
+
+        # start: ждем '['; first: элемент или ']';
+        # value: элемент; separator: ',' или ']'.
+        state = 'start'
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position == len(buffer):
+                if not read_more():
+                    raise json.JSONDecodeError(
+                        'Неожиданный конец файла', buffer, position)
+                continue
+
+            char = buffer[position]
+            if state == 'start':
+                if char != '[':
+                    raise json.JSONDecodeError(
+                        'Ожидался массив', buffer, position)
+                position += 1
+                state = 'first'
+            elif char == ']' and state in ('first', 'separator'):
+                return
+            elif state == 'separator':
+                if char != ',':
+                    raise json.JSONDecodeError(
+                        'Ожидалась запятая', buffer, position)
+                position += 1
+                state = 'value'
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    end = None
+                # Значение в конце куска могло быть прочитано не целиком.
+                if end is None or (end == len(buffer) and not eof):
+                    if not read_more() and end is None:
+                        raise json.JSONDecodeError(
+                            'Некорректный элемент массива', buffer, position)
+                    continue
+                yield item
+                position = end
+                state = 'separator'
+
+
+def content_hash(record):
+    """
+    Возвращает SHA-256 хэш записи фида, не зависящий от порядка ключей.
+    """
+    payload = json.dumps(
+        record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def batched(iterable, size):
+    """
+    Разбивает итерируемый объект на списки длиной не больше size.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def bulk_upsert(model, objs, update_fields, batch_size=None):
+    """
+    Вставляет или обновляет по slug объекты категорий, подкатегорий
+    или продуктов пакетами.
+
+    Модели каталога наследуются от CategoryBase (multi-table
+    inheritance), поэтому стандартный bulk_create для них недоступен,
+    а слаг уникален в общей таблице CategoryBase. Поэтому сначала
+    одним запросом на SLUG_LOOKUP_BATCH_SIZE слагов загружаются
+    существующие записи с этими слагами и их модель. Объекты,
+    слаг которых занят записью другой модели (например, категория
+    со слагом продукта), не записываются: о них пишется ошибка в лог.
+    Остальные записываются в два запроса на пакет:
+    1. INSERT ... ON CONFLICT (slug) DO UPDATE в таблицу CategoryBase,
+       которое возвращает первичные ключи;
+    2. INSERT ... ON CONFLICT DO UPDATE в таблицу самой модели.
+    Если слаг повторяется в objs, записывается последний объект:
+    PostgreSQL не позволяет обновить одну строку дважды в одном
+    INSERT ... ON CONFLICT. Объекты без слага получают уникальный
+    слаг по названию (assign_unique_slugs), запросом на весь пакет.
+
+    Аргументы:
+    - model: Category, Subcategory или Product.
+    - objs: Список несохраненных объектов модели.
+    - update_fields: Имена собственных полей модели, которые нужно
+      обновить у существующих записей.
+    - batch_size: Максимальный размер пакета.
+
+    Возвращает:
+    - Список записанных объектов (по одному на слаг) с заполненными
+      первичными ключами.
+    """
+    if not objs:
+        return objs
+    assign_unique_slugs(objs)
+    by_slug = {obj.slug: obj for obj in objs}
+
+    # Имя обратной связи CategoryBase -> model (parent link).
+    owner = model._meta.model_name
+    for slugs in batched(by_slug, SLUG_LOOKUP_BATCH_SIZE):
+        existing = CategoryBase.objects.filter(
+            slug__in=slugs).values_list('slug', owner)
+        for slug, owned_pk in existing:
+            if owned_pk is None:
+                logger.error(
+                    f'Слаг {slug} занят записью другого типа, '
+                    f'{model.__name__} с этим слагом не записан.')
+                del by_slug[slug]
+    objs = list(by_slug.values())
+    if not objs:
+        return objs
+
+    now = timezone.now()
+    base_objs = []
+    for obj in objs:
+        obj.updated_at = now
+        base_objs.append(CategoryBase(
+            name=obj.name, slug=obj.slug, content_hash=obj.content_hash,
+            updated_at=now))
+    CategoryBase.objects.bulk_create(
+        base_objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['slug'],
+        update_fields=['name', 'content_hash', 'updated_at'],
+    )
+    for obj, base_obj in zip(objs, base_objs):
+        obj.pk = obj.categorybase_ptr_id = base_obj.pk
+
+    _upsert_local_rows(model, objs, update_fields, batch_size)
+    return objs
+
+
+def _upsert_local_rows(model, objs, update_fields, batch_size):
+    """
+    Пакетно вставляет или обновляет строки собственной таблицы модели,
+    связанные с CategoryBase по categorybase_ptr.
+    """
+    connection = connections[router.db_for_write(model)]
+    opts = model._meta
+    fields = opts.local_concrete_fields
+    parent_link = opts.pk
+    # Без полей для обновления конфликт все равно обрабатывается
+    # через DO UPDATE ключа: суффикс для IGNORE в SQLite пустой
+    # (там используется INSERT OR IGNORE), и повторная вставка падала бы.
+    update_columns = [
+        opts.get_field(name).column for name in update_fields
+    ] or [parent_link.column]
+    quote = connection.ops.quote_name
+
+    max_batch_size = connection.ops.bulk_batch_size(fields, objs)
+    batch_size = min(batch_size or max_batch_size, max_batch_size)
+
+    sql_prefix = 'INSERT INTO %s (%s) ' % (
+        quote(opts.db_table),
+        ', '.join(quote(field.column) for field in fields),
+    )
+    on_conflict = connection.ops.on_conflict_suffix_sql(
+        fields,
+        OnConflict.UPDATE,
+        update_columns,
+        [parent_link.column],
+    )
+    with connection.cursor() as cursor:
+        for batch in batched(objs, batch_size):
+            rows = [
+                [
+                    field.get_db_prep_save(
+                        field.pre_save(obj, add=True), connection)
+                    for field in fields
+                ]
+                for obj in batch
+            ]
+            values_sql = connection.ops.bulk_insert_sql(
+                fields, [['%s'] * len(fields)] * len(rows))
+            cursor.execute(
+                f'{sql_prefix}{values_sql} {on_conflict}',
+                [value for row in rows for value in row]
+            )
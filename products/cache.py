@@ -0,0 +1,128 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import CategoryBase
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_MODIFIED_KEY = 'catalog:modified'
+CATALOG_HITS_KEY = 'catalog:stats:hits'
+CATALOG_MISSES_KEY = 'catalog:stats:misses'
+
+
+def get_catalog_cache():
+    """
+    Возвращает бэкенд кэша каталога (settings.CATALOG_CACHE_ALIAS).
+    """
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_catalog_version():
+    """
+    Возвращает текущую версию каталога.
+
+    Версия входит в ключи всех кэшей каталога, поэтому её увеличение
+    делает недействительными все ранее сохраненные значения.
+    Начальное значение берется из текущего времени, чтобы после
+    вытеснения ключа из кэша версии не повторялись.
+    """
+    cache = get_catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, time.time_ns())
+    return version
+
+
+def bump_catalog_version():
+    """
+    Увеличивает версию каталога после изменения категорий,
+    подкатегорий или продуктов.
+    """
+    cache = get_catalog_cache()
+    cache.set(CATALOG_MODIFIED_KEY, timezone.now(), timeout=None)
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+        return version
+
+
+def get_catalog_last_modified():
+    """
+    Возвращает время последнего изменения каталога.
+
+    Время запоминается при каждом увеличении версии каталога (в том
+    числе при удалении записей). Если в кэше его нет, берется
+    максимальное значение updated_at категорий, подкатегорий и продуктов.
+    """
+    cache = get_catalog_cache()
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        modified = CategoryBase.objects.aggregate(
+            modified=Max('updated_at'))['modified']
+        if modified is not None:
+            cache.add(CATALOG_MODIFIED_KEY, modified, timeout=None)
+    return modified
+
+
+def get_response_cache_key(request):
+    """
+    Строит ключ кэша ответа из адреса запроса, отсортированных
+    параметров запроса и версии каталога.
+    """
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    digest = hashlib.md5(
+        repr((request.build_absolute_uri(request.path), query)).encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    return f'catalog:response:{get_catalog_version()}:{digest}'
+
+
+def _increment(key):
+    cache = get_catalog_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def record_cache_hit():
+    _increment(CATALOG_HITS_KEY)
+
+
+def record_cache_miss():
+    _increment(CATALOG_MISSES_KEY)
+
+
+def get_cache_stats():
+    """
+    Возвращает статистику кэша ответов каталога.
+
+    Возвращает:
+    - Словарь с количеством попаданий (hits), промахов (misses)
+      и долей попаданий (hit_ratio).
+    """
+    cache = get_catalog_cache()
+    hits = cache.get(CATALOG_HITS_KEY, 0)
+    misses = cache.get(CATALOG_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_cache_stats():
+    get_catalog_cache().delete_many([CATALOG_HITS_KEY, CATALOG_MISSES_KEY])
@@ -0,0 +1,53 @@
+from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
+from .models import Product
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    Фильтры списка продуктов.
+
+    Каждый фильтр (и их сочетания) обслуживается индексом:
+    слаги - уникальным индексом CategoryBase.slug, категория
+    и подкатегория - составными индексами (parent_category, price),
+    (parent_category, id), (parent_subcategory, price)
+    и (parent_subcategory, id), диапазон цен - индексом по price.
+
+    Параметры:
+    - category: Слаг категории.
+    - subcategory: Слаг подкатегории.
+    - price_min: Минимальная цена (включительно).
+    - price_max: Максимальная цена (включительно).
+    """
+
+    category = filters.CharFilter(
+        field_name='parent_category__slug',
+        label='Слаг категории'
+    )
+    subcategory = filters.CharFilter(
+        field_name='parent_subcategory__slug',
+        label='Слаг подкатегории'
+    )
+    price_min = filters.NumberFilter(
+        field_name='price', lookup_expr='gte', label='Минимальная цена')
+    price_max = filters.NumberFilter(
+        field_name='price', lookup_expr='lte', label='Максимальная цена')
+
+    class Meta:
+        model = Product
+        fields = ['category', 'subcategory', 'price_min', 'price_max']
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    Сортировка, которая добавляет id последним полем сортировки,
+    чтобы порядок продуктов с одинаковой ценой или названием
+    не менялся между страницами.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering = [*ordering, 'id']
+        return ordering
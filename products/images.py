@@ -0,0 +1,202 @@
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+IMAGE_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+# Ошибки чтения и декодирования исходного изображения.
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def output_format():
+    """
+    Возвращает формат производных изображений.
+
+    Используется settings.PRODUCT_IMAGE_FORMAT (по умолчанию JPEG);
+    если Pillow собран без поддержки WebP, используется JPEG.
+    """
+    image_format = settings.PRODUCT_IMAGE_FORMAT.upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def accepted_format(accept):
+    """
+    Возвращает формат изображения для заголовка Accept запроса:
+    WebP, если клиент явно принимает image/webp и Pillow поддерживает
+    WebP, иначе JPEG, который декодируют все клиенты.
+
+    Маски image/* и */* не учитываются: их отправляют и клиенты
+    без поддержки WebP.
+    """
+    if 'image/webp' in accept and features.check('webp'):
+        return 'WEBP'
+    return 'JPEG'
+
+
+def render_image(image, size, image_format, quality):
+    """
+    Уменьшает изображение до размеров size с сохранением пропорций
+    и кодирует его в image_format.
+
+    Ориентация из EXIF применяется к пикселям, метаданные (EXIF,
+    ICC-профиль, комментарии) в результат не попадают.
+    Изображение меньше size не увеличивается.
+
+    Возвращает:
+    - Байты закодированного изображения.
+    """
+    image = ImageOps.exif_transpose(image)
+    if image_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (
+            image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert(
+            'RGBA' if has_alpha and image_format != 'JPEG' else 'RGB')
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    image.info = {}
+
+    output = BytesIO()
+    image.save(output, image_format, quality=quality, optimize=True,
+               **({'method': 6} if image_format == 'WEBP' else {}))
+    return output.getvalue()
+
+
+def render_derivatives(source, sizes, image_format, quality):
+    """
+    Строит производные изображения всех размеров из исходного.
+
+    Функция не обращается к Django и может выполняться в дочернем
+    процессе пула. Имена файлов строятся из хэша исходного файла,
+    поэтому одинаковые исходники дают одинаковые файлы.
+
+    Аргументы:
+    - source: Байты исходного изображения.
+    - sizes: Словарь {имя размера: (ширина, высота)}.
+    - image_format: Формат результата ('WEBP' или 'JPEG').
+    - quality: Качество сжатия.
+
+    Возвращает:
+    - Словарь {имя размера: (имя файла, байты изображения)}.
+    """
+    digest = hashlib.sha256(source).hexdigest()[:16]
+    extension = IMAGE_EXTENSIONS.get(image_format, image_format.lower())
+    derivatives = {}
+    with Image.open(BytesIO(source)) as image:
+        image.load()
+        for name, size in sizes.items():
+            derivatives[name] = (
+                f'products/{name}/{digest}.{extension}',
+                render_image(image, size, image_format, quality)
+            )
+    return derivatives
+
+
+def save_derivatives(derivatives):
+    """
+    Сохраняет производные изображения в хранилище, если файлов
+    с такими именами еще нет.
+
+    Возвращает:
+    - Словарь {поле продукта: имя файла} для обновления продукта.
+    """
+    fields = {}
+    for size, (name, content) in derivatives.items():
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(content))
+        fields[f'image_{size}'] = name
+    return fields
+
+
+def product_image_source(product):
+    """
+    Возвращает поле с исходным изображением продукта: image_source,
+    а если оно не загружено - image_large.
+    """
+    return product.image_source or product.image_large or None
+
+
+def read_source(field):
+    with field.open('rb') as source:
+        return source.read()
+
+
+def build_product_images(product):
+    """
+    Строит маленькое, среднее и большое изображения продукта
+    из исходного и сохраняет их в поля продукта (без вызова save).
+
+    Возвращает:
+    - Словарь {поле продукта: имя файла} или None, если у продукта
+      нет исходного изображения.
+    """
+    source = product_image_source(product)
+    if source is None:
+        return None
+    fields = save_derivatives(render_derivatives(
+        read_source(source), settings.PRODUCT_IMAGE_SIZES,
+        output_format(), settings.PRODUCT_IMAGE_QUALITY))
+    for field, name in fields.items():
+        setattr(product, field, name)
+    return fields
+
+
+def iter_derivatives(sources, workers):
+    """
+    Строит производные изображения для нескольких исходных файлов
+    параллельно в пуле процессов.
+
+    Аргументы:
+    - sources: Список имен исходных файлов в хранилище.
+    - workers: Количество процессов; при 1 обработка идет
+      в текущем процессе.
+
+    Возвращает:
+    - Итератор пар (имя исходного файла, производные изображения
+      или исключение, если файл не удалось обработать).
+    """
+    options = (settings.PRODUCT_IMAGE_SIZES, output_format(),
+               settings.PRODUCT_IMAGE_QUALITY)
+
+    def read(name):
+        with default_storage.open(name, 'rb') as source:
+            return source.read()
+
+    if workers <= 1:
+        for name in sources:
+            try:
+                yield name, render_derivatives(read(name), *options)
+            except IMAGE_ERRORS as error:
+                yield name, error
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(name):
+            try:
+                return executor.submit(
+                    render_derivatives, read(name), *options)
+            except IMAGE_ERRORS as error:
+                return error
+
+        # В очереди не больше workers * 2 задач, чтобы не держать
+        # в памяти все исходные файлы сразу.
+        sources = iter(sources)
+        queue = deque(
+            (name, submit(name)) for name in islice(sources, workers * 2))
+        while queue:
+            name, task = queue.popleft()
+            for next_name in islice(sources, 1):
+                queue.append((next_name, submit(next_name)))
+            if isinstance(task, Exception):
+                yield name, task
+                continue
+            try:
+                yield name, task.result()
+            except IMAGE_ERRORS as error:
+                yield name, error
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from cart.models import Cart, CartItem
+from myshop.benchmarking import (DUMMY_CACHES, format_summary,
+                                 isolated_database, summarize)
+from products.models import Category, Product, Subcategory
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочное сравнение синхронных эндпоинтов (WSGI, пул потоков) '
+        'и асинхронных эндпоинтов /api/async/ (ASGI, цикл событий) '
+        'в одном процессе на отдельной тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Количество запросов для каждого сценария (по умолчанию 500).'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=20,
+            help='Количество одновременных запросов (по умолчанию 20).'
+        )
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=100,
+            help='Количество продуктов в каталоге (по умолчанию 100).'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            # Кэш ответов каталога отключается, чтобы оба пути
+            # выполняли запросы к БД.
+            with isolated_database(), override_settings(CACHES=DUMMY_CACHES):
+                self.run(options['requests'], options['concurrency'],
+                         options['products'])
+        finally:
+            teardown_test_environment()
+
+    def run(self, requests, concurrency, products):
+        product = self.generate(products)
+        scenarios = [
+            ('Список продуктов', reverse('product-list'),
+             reverse('async-product-list')),
+            ('Продукт', reverse('product-detail', args=[product.pk]),
+             reverse('async-product-detail', args=[product.pk])),
+            ('Корзина', reverse('cart-detail'),
+             reverse('async-cart-detail')),
+        ]
+        for name, wsgi_url, asgi_url in scenarios:
+            for path, runner, url in (
+                ('WSGI', self.run_wsgi, wsgi_url),
+                ('ASGI', self.run_asgi, asgi_url),
+            ):
+                timings, elapsed = runner(url, requests, concurrency)
+                self.stdout.write(
+                    f'{format_summary(f"{name}, {path}", summarize(timings))}'
+                    f'; {len(timings) / elapsed:.0f} запросов/с')
+
+    def generate(self, count):
+        """
+        Создает каталог из count продуктов и пользователя с корзиной,
+        запоминает JWT пользователя для заголовка Authorization.
+        """
+        category = Category.objects.create(name='Категория')
+        subcategory = Subcategory.objects.create(
+            name='Подкатегория', parent_category=category)
+        products = [
+            Product.objects.create(
+                name=f'Продукт {number}', parent_subcategory=subcategory,
+                price=number + 1)
+            for number in range(count)
+        ]
+        user = User.objects.create_user(
+            username='benchmark', email='benchmark@example.com',
+            password='benchmark-password')
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.bulk_create(
+            CartItem(cart=cart, product=product, quantity=1)
+            for product in products[:10])
+        access_token = RefreshToken.for_user(user).access_token
+        self.authorization = f'Bearer {access_token}'
+        return products[0]
+
+    def run_wsgi(self, url, requests, concurrency):
+        """
+        Выполняет запросы через WSGI-обработчик в пуле из concurrency
+        потоков, как в WSGI-сервере с потоками (myshop/wsgi.py).
+
+        Возвращает:
+        - Кортеж (длительности запросов в мс, общее время в секундах).
+        """
+        local = threading.local()
+
+        def request(_):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_AUTHORIZATION=self.authorization)
+            started = time.perf_counter()
+            response = local.client.get(url)
+            assert response.status_code == 200, response.content
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(request, range(requests)))
+        return timings, time.perf_counter() - started
+
+    def run_asgi(self, url, requests, concurrency):
+        """
+        Выполняет запросы через ASGI-обработчик в одном цикле событий,
+        не более concurrency запросов одновременно (myshop/asgi.py).
+
+        Возвращает:
+        - Кортеж (длительности запросов в мс, общее время в секундах).
+        """
+        async def run():
+            client = AsyncClient()
+            headers = {'Authorization': self.authorization}
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(url, headers=headers)
+                    assert response.status_code == 200, response.content
+                    return (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            timings = await asyncio.gather(
+                *(request() for _ in range(requests)))
+            return timings, time.perf_counter() - started
+
+        return asyncio.run(run())
@@ -0,0 +1,74 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from myshop.benchmarking import (format_summary, isolated_database, measure,
+                                 summarize)
+from products.search import LikeSearchBackend, get_search_backend
+from products.synthetic import generate_catalog
+
+QUERIES = ['яблоко', 'сладкий сок', 'фермерский сыр', 'хлеб', 'напитки', 'ябл']
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение полнотекстового поиска продуктов с поиском через LIKE '
+        'на сгенерированных данных в отдельной тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1_000_000,
+            help='Количество генерируемых продуктов (по умолчанию 1000000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов каждого запроса (по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Размер пакета при генерации (по умолчанию 5000).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            started = time.perf_counter()
+            generate_catalog(options['products'],
+                             random.Random(options['seed']),
+                             options['batch_size'])
+            self.stdout.write(
+                f'Сгенерировано продуктов: {options["products"]} '
+                f'за {time.perf_counter() - started:.1f} с')
+            self.compare(options['repeat'])
+
+    def compare(self, repeat):
+        """
+        Выполняет одни и те же запросы через индекс и через LIKE
+        и выводит время выполнения и количество найденных продуктов.
+        """
+        backends = {
+            'Индекс': get_search_backend(),
+            'LIKE': LikeSearchBackend(get_search_backend().connection),
+        }
+        for query in QUERIES:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Запрос "{query}"'))
+            for name, backend in backends.items():
+                found = len(backend.search(query, limit=None))
+                timings = measure(
+                    lambda: backend.search(query, limit=100), repeat)
+                self.stdout.write(
+                    f'{format_summary(name, summarize(timings))}; '
+                    f'найдено {found}')
@@ -0,0 +1,77 @@
+import logging
+import time
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from products.bulk import batched
+from products.cache import bump_catalog_version
+from products.images import iter_derivatives, save_derivatives
+from products.models import Product
+from users.passwords import available_cpu_count
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Построение маленьких, средних и больших изображений продуктов '
+        'из исходных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов (по умолчанию - число доступных ядер).'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Строит производные изображения для всех продуктов.
+
+        Исходным считается image_source, а если его нет - image_large
+        (он же запоминается как исходный, чтобы повторный запуск
+        не пережимал уже уменьшенное изображение). Каждый исходный файл
+        обрабатывается один раз, даже если он общий для многих продуктов,
+        файлы обрабатываются параллельно в пуле процессов.
+        """
+        workers = options['workers'] or available_cpu_count()
+        products_by_source = defaultdict(list)
+        rows = Product.objects.filter(
+            ~Q(image_source='') & Q(image_source__isnull=False)
+            | ~Q(image_large='') & Q(image_large__isnull=False)
+        ).values_list('pk', 'image_source', 'image_large')
+        for pk, image_source, image_large in rows:
+            products_by_source[image_source or image_large].append(pk)
+
+        started = time.perf_counter()
+        source_bytes = derivative_bytes = processed = 0
+        for name, result in iter_derivatives(
+                list(products_by_source), workers):
+            if isinstance(result, Exception):
+                logger.error(
+                    f'Не удалось обработать изображение {name}: {result}')
+                continue
+            fields = save_derivatives(result)
+            for batch in batched(products_by_source[name], 500):
+                with transaction.atomic():
+                    Product.objects.filter(pk__in=batch).update(
+                        image_source=name, **fields)
+            source_bytes += default_storage.size(name)
+            derivative_bytes += sum(
+                len(content) for _, content in result.values())
+            processed += 1
+
+        # Обновление через update() не вызывает сигналы моделей.
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано исходных изображений: {processed} из '
+            f'{len(products_by_source)} за '
+            f'{time.perf_counter() - started:.2f} с; '
+            f'исходные: {source_bytes // 1024} КБ, '
+            f'производные: {derivative_bytes // 1024} КБ'))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from products.cache import (get_cache_stats, get_catalog_cache,
+                            get_catalog_version, reset_cache_stats)
+
+# Кэши, которые не разделяются между процессами: счетчики сервера
+# не видны из процесса команды.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class Command(BaseCommand):
+    help = 'Статистика кэша ответов каталога (попадания и промахи)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счетчики после вывода статистики.'
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(get_catalog_cache(), PROCESS_LOCAL_CACHES):
+            raise CommandError(
+                f'Кэш {settings.CATALOG_CACHE_ALIAS} не разделяется между '
+                f'процессами, счетчики сервера недоступны команде. '
+                f'Используйте общий кэш (CACHE_BACKEND, например Redis '
+                f'или Memcached) или счетчики myshop_catalog_cache_* '
+                f'на /metrics/.')
+        stats = get_cache_stats()
+        self.stdout.write(
+            f'Версия каталога: {get_catalog_version()}\n'
+            f'Попадания: {stats["hits"]}\n'
+            f'Промахи: {stats["misses"]}\n'
+            f'Доля попаданий: {stats["hit_ratio"]:.2%}'
+        )
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Счетчики обнулены'))
@@ -0,0 +1,160 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.cache import bump_catalog_version
+from products.synthetic import (generate_taxonomy, write_customers,
+                                write_products)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация большого синтетического каталога, пользователей '
+        'и корзин прямо в базу пакетной записью'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1_000_000,
+            help='Количество продуктов (по умолчанию 1000000).'
+        )
+        parser.add_argument(
+            '--categories',
+            type=int,
+            default=5,
+            help='Количество категорий (по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--subcategories',
+            type=int,
+            default=5,
+            help='Количество подкатегорий в каждой категории '
+                 '(по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10_000,
+            help='Количество пользователей с корзинами (по умолчанию 10000).'
+        )
+        parser.add_argument(
+            '--cart-items',
+            type=int,
+            default=5,
+            help='Среднее количество позиций в корзине (по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--zipf-exponent',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для подкатегорий '
+                 'и популярности продуктов (по умолчанию 1.1).'
+        )
+        parser.add_argument(
+            '--password',
+            default='synthetic-password',
+            help='Пароль всех сгенерированных пользователей.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Размер пакета записи (по умолчанию 5000).'
+        )
+        parser.add_argument(
+            '--no-index',
+            action='store_true',
+            help='Не добавлять продукты в поисковый индекс '
+                 '(затем выполните rebuild_search_index).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+
+    def handle(self, *args, **options):
+        if options['products'] < 1 or options['zipf_exponent'] <= 0:
+            raise CommandError(
+                'Количество продуктов и показатель распределения '
+                'должны быть больше нуля.')
+        for option in ('categories', 'subcategories', 'batch_size'):
+            if options[option] < 1:
+                raise CommandError(
+                    f'--{option.replace("_", "-")} должен быть '
+                    f'больше нуля.')
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+
+        self.run_phase('Категории и подкатегории', self.generate_taxonomy)
+        self.run_phase('Продукты', self.generate_products)
+        self.run_phase('Пользователи и корзины', self.generate_customers)
+        # Пакетная запись не вызывает сигналы моделей.
+        bump_catalog_version()
+        if options['no_index']:
+            self.stdout.write(self.style.WARNING(
+                'Поисковый индекс не обновлен: '
+                'выполните python manage.py rebuild_search_index'))
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы'))
+
+    def run_phase(self, name, generate):
+        """
+        Выполняет этап генерации и выводит число записанных строк
+        и скорость (строк в секунду).
+        """
+        started = time.perf_counter()
+        stats = generate()
+        elapsed = time.perf_counter() - started
+        rate = stats['rows'] / elapsed if elapsed else 0
+        message = (
+            f'{name}: {stats["rows"]} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с)'
+        )
+        if 'items' in stats:
+            message += f'; позиций в корзинах: {stats["items"]}'
+        self.stdout.write(message)
+
+    def progress(self, name, rows, total):
+        self.stdout.write(f'  {name}: {rows} из {total}', ending='\r')
+        self.stdout.flush()
+
+    def generate_taxonomy(self):
+        self.subcategories = generate_taxonomy(
+            self.options['categories'], self.options['subcategories'])
+        return {'rows': len(self.subcategories)}
+
+    def generate_products(self):
+        """
+        Записывает продукты пакетами (см. write_products), повторный
+        запуск обновляет те же продукты.
+        """
+        total = self.options['products']
+        rows = 0
+        for written in write_products(
+                total, self.subcategories, self.rng,
+                self.options['zipf_exponent'], self.batch_size,
+                index=not self.options['no_index']):
+            rows += len(written)
+            self.progress('Продукты', rows, total)
+        return {'rows': rows}
+
+    def generate_customers(self):
+        """
+        Создает пользователей, их корзины и позиции корзин пакетами
+        (см. write_customers).
+        """
+        total = self.options['users']
+        rows = items = 0
+        for user_ids, cart_items in write_customers(
+                total, self.options['products'], self.rng,
+                self.options['cart_items'], self.options['zipf_exponent'],
+                self.options['password'], self.batch_size):
+            rows += len(user_ids)
+            items += cart_items
+            self.progress('Пользователи', rows, total)
+        return {'rows': rows, 'items': items}
@@ -1,12 +1,21 @@
 import json
 import logging
+import os
+import time
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import make_password
+from django.contrib.auth.hashers import identify_hasher, make_password
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
+from cart.models import Cart
+from products.bulk import batched, bulk_upsert, content_hash, iter_json_array
+from products.cache import bump_catalog_version
 from products.models import Category, Product, Subcategory
+from products.search import index_products, remove_products
+from products.signals import mute_catalog_signals
+from users.passwords import password_hasher
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -15,18 +24,349 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Загрузка пользователей, категорий, подкатегорий и продуктов в базу'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Потоковая пакетная загрузка (для больших файлов).'
+        )
+        parser.add_argument(
+            '--delta',
+            action='store_true',
+            help='Пакетная загрузка только новых, измененных и удаленных '
+                 'записей каталога (по хэшу содержимого).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета для пакетной загрузки (по умолчанию 1000).'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов для хэширования паролей '
+                 '(по умолчанию - число доступных ядер).'
+        )
+        parser.add_argument(
+            '--data-dir',
+            default='data',
+            help='Каталог с JSON-файлами (по умолчанию data).'
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING(
             'Загрузка пользователей, категорий, подкатегорий '
             'и продуктов в базу начата'))
 
-        self.load_users()
-        self.load_categories()
-        self.load_subcategories()
-        self.load_products()
+        if options['bulk'] or options['delta']:
+            self.data_dir = options['data_dir']
+            self.batch_size = options['batch_size']
+            self.workers = options['workers']
+            self.delta = options['delta']
+            self.run_phase('Пользователи', self.bulk_load_users)
+            self.run_phase('Категории', self.bulk_load_categories)
+            self.run_phase('Подкатегории', self.bulk_load_subcategories)
+            self.run_phase('Продукты', self.bulk_load_products)
+            # Пакетная запись не вызывает сигналы моделей.
+            bump_catalog_version()
+        else:
+            self.load_users()
+            self.load_categories()
+            self.load_subcategories()
+            self.load_products()
 
         self.stdout.write(self.style.SUCCESS('Данные загружены'))
 
+    def run_phase(self, name, loader):
+        """
+        Выполняет этап пакетной загрузки и выводит число
+        загруженных строк и скорость загрузки (строк в секунду),
+        а в режиме --delta - количество новых, измененных,
+        удаленных и неизмененных записей.
+        """
+        started = time.perf_counter()
+        try:
+            stats = loader()
+        except FileNotFoundError as error:
+            logger.error(f'Файл {error.filename} не найден.')
+            return
+        except json.JSONDecodeError:
+            logger.error(
+                f'Ошибка при чтении JSON ({name}). Проверьте формат файла.')
+            return
+        elapsed = time.perf_counter() - started
+        rows = stats['rows']
+        rate = rows / elapsed if elapsed else 0
+        message = (
+            f'{name}: {rows} строк за {elapsed:.2f} с ({rate:.0f} строк/с)'
+        )
+        if self.delta and 'unchanged' in stats:
+            message += (
+                f'; новых: {stats["created"]}, '
+                f'изменено: {stats["updated"]}, '
+                f'удалено: {stats["deleted"]}, '
+                f'без изменений: {stats["unchanged"]}'
+            )
+        self.stdout.write(message)
+
+    def iter_records(self, file_name):
+        """
+        Поэлементно читает записи из JSON-файла каталога данных.
+        """
+        return iter_json_array(os.path.join(self.data_dir, file_name))
+
+    def bulk_load_users(self):
+        """
+        Пакетно загружает пользователей из файла users.json.
+
+        Уже существующие пользователи (по username или email)
+        пропускаются без хэширования пароля. Пароли хэшируются
+        параллельно в пуле процессов. Если в записи указан готовый
+        хэш (password_hash), он сохраняется без повторного хэширования.
+
+        Возвращает:
+        - Количество обработанных записей.
+        """
+        rows = 0
+        with password_hasher(self.workers) as hash_passwords:
+            for batch in batched(self.iter_records('users.json'),
+                                 self.batch_size):
+                records = self.new_user_records(batch)
+                plain = [
+                    record for record in records
+                    if not record.get('password_hash')
+                ]
+                for record, password in zip(
+                        plain,
+                        hash_passwords([r['password'] for r in plain])):
+                    record['password_hash'] = password
+
+                users = [
+                    User(
+                        username=record['username'],
+                        email=record['email'],
+                        password=record['password_hash'],
+                        first_name=record.get('first_name', ''),
+                        last_name=record.get('last_name', '')
+                    )
+                    for record in records
+                ]
+                with transaction.atomic():
+                    User.objects.bulk_create(users, ignore_conflicts=True)
+                rows += len(batch)
+        return {'rows': rows}
+
+    def new_user_records(self, batch):
+        """
+        Отбирает из пакета записи пользователей, которых еще нет в базе,
+        одним запросом. Записи с некорректным готовым хэшем пропускаются.
+        """
+        existing = User.objects.filter(
+            Q(username__in=[record['username'] for record in batch])
+            | Q(email__in=[record['email'] for record in batch])
+        ).values_list('username', 'email')
+        usernames = {username for username, _ in existing}
+        emails = {email for _, email in existing}
+
+        records = []
+        for record in batch:
+            if (record['username'] in usernames
+                    or record['email'] in emails):
+                continue
+            if record.get('password_hash'):
+                try:
+                    identify_hasher(record['password_hash'])
+                except ValueError:
+                    logger.error(
+                        f'Некорректный хэш пароля пользователя '
+                        f'{record["username"]}.')
+                    continue
+            usernames.add(record['username'])
+            emails.add(record['email'])
+            records.append(record)
+        return records
+
+    def bulk_load_catalog(self, model, file_name, build, update_fields):
+        """
+        Пакетно загружает записи каталога из JSON-файла.
+
+        Для каждой записи считается хэш содержимого, который сохраняется
+        в content_hash. В режиме --delta хэши существующих записей
+        загружаются одним запросом, и записываются только новые
+        и измененные записи, а записи фида, отсутствующие в файле,
+        удаляются. Записи, созданные не из фида (с пустым content_hash),
+        не удаляются.
+
+        Аргументы:
+        - model: Category, Subcategory или Product.
+        - file_name: Имя JSON-файла.
+        - build: Функция, создающая из записи объект модели
+          (или возвращающая None для некорректной записи).
+        - update_fields: Собственные поля модели для обновления.
+
+        Возвращает:
+        - Словарь со статистикой загрузки.
+        """
+        stats = {'rows': 0, 'created': 0, 'updated': 0,
+                 'deleted': 0, 'unchanged': 0}
+        existing = {}
+        if self.delta:
+            existing = {
+                slug: (pk, record_hash)
+                for slug, pk, record_hash in model.objects.values_list(
+                    'slug', 'pk', 'content_hash')
+            }
+        seen = set()
+
+        def changed_objects():
+            for record in self.iter_records(file_name):
+                stats['rows'] += 1
+                record_hash = content_hash(record)
+                obj = build(record)
+                if obj is None:
+                    # Запись есть в фиде, но отклонена (например, нет
+                    # родителя): существующая строка не удаляется.
+                    if record.get('slug'):
+                        seen.add(record['slug'])
+                    else:
+                        stats['rejected_without_slug'] = True
+                    continue
+                obj.content_hash = record_hash
+                seen.add(obj.slug)
+                current = existing.get(obj.slug)
+                if current is not None and current[1] == record_hash:
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated' if current else 'created'] += 1
+                yield obj
+
+        for batch in batched(changed_objects(), self.batch_size):
+            with transaction.atomic():
+                written = bulk_upsert(model, batch, update_fields)
+                self.sync_products(model, [obj.pk for obj in written])
+
+        if self.delta and stats.pop('rejected_without_slug', False):
+            logger.error(
+                f'В {file_name} есть отклоненные записи без слага, '
+                f'удаление отсутствующих записей пропущено.')
+        elif self.delta:
+            removed = [
+                pk for slug, (pk, record_hash) in existing.items()
+                if record_hash and slug not in seen
+            ]
+            for batch in batched(removed, self.batch_size):
+                with transaction.atomic():
+                    self.delete_catalog(model, batch)
+            stats['deleted'] = len(removed)
+        return stats
+
+    def delete_catalog(self, model, pks):
+        """
+        Удаляет записи каталога вместе с зависимыми (CASCADE) без
+        обработчиков сигналов на каждую строку: даты корзин с удаляемыми
+        продуктами, поисковый индекс и версия кэша обновляются
+        один раз на пакет.
+        """
+        lookup = {
+            Product: 'pk__in',
+            Subcategory: 'parent_subcategory__in',
+            Category: 'parent_category__in',
+        }[model]
+        products = Product.objects.filter(**{lookup: pks})
+        product_ids = list(products.values_list('pk', flat=True))
+        Cart.objects.filter(items__product__in=products).touch()
+        with mute_catalog_signals():
+            model.objects.filter(pk__in=pks).delete()
+        remove_products(product_ids)
+        bump_catalog_version()
+
+    def sync_products(self, model, pks):
+        """
+        Обновляет продукты после пакетной записи: денормализованные
+        названия у продуктов измененных категорий и подкатегорий
+        (одним запросом UPDATE на пакет) и поисковый индекс
+        записанных продуктов и продуктов измененных категорий
+        и подкатегорий. Остальной индекс не перестраивается.
+        """
+        if model is Product:
+            index_products(pks)
+            return
+        if model is Subcategory:
+            products = Product.objects.filter(parent_subcategory_id__in=pks)
+        else:
+            products = Product.objects.filter(parent_category_id__in=pks)
+        products.sync_taxonomy()
+        index_products(list(products.values_list('pk', flat=True)))
+
+    def bulk_load_categories(self):
+        """
+        Пакетно загружает категории из файла categories.json.
+
+        Существующие категории (по slug) обновляются.
+        """
+        return self.bulk_load_catalog(
+            Category, 'categories.json',
+            lambda record: Category(**record),
+            ['image']
+        )
+
+    def bulk_load_subcategories(self):
+        """
+        Пакетно загружает подкатегории из файла subcategories.json.
+
+        Категории проверяются по заранее загруженному множеству ID,
+        без отдельного запроса на каждую подкатегорию.
+        """
+        category_ids = set(Category.objects.values_list('pk', flat=True))
+
+        def build(record):
+            record = dict(record)
+            category_id = record.pop('parent_category', None)
+            if category_id not in category_ids:
+                logger.error(
+                    f'Категория с ID {category_id} не найдена '
+                    f'для подкатегории {record["name"]}.')
+                return None
+            return Subcategory(parent_category_id=category_id, **record)
+
+        return self.bulk_load_catalog(
+            Subcategory, 'subcategories.json', build,
+            ['parent_category', 'image']
+        )
+
+    def bulk_load_products(self):
+        """
+        Пакетно загружает продукты из файла products.json.
+
+        Подкатегории (вместе с категориями) загружаются заранее одним
+        запросом, без отдельного запроса на каждый продукт; из них же
+        заполняются денормализованные названия продукта.
+        """
+        subcategories = Subcategory.objects.select_related(
+            'parent_category').in_bulk()
+
+        def build(record):
+            record = dict(record)
+            subcategory_id = record.pop('parent_subcategory', None)
+            subcategory = subcategories.get(subcategory_id)
+            if subcategory is None:
+                logger.error(
+                    f'Подкатегория с ID {subcategory_id} не '
+                    f'найдена для продукта {record["name"]}.')
+                return None
+            product = Product(parent_subcategory=subcategory, **record)
+            product.fill_taxonomy(subcategory)
+            return product
+
+        return self.bulk_load_catalog(
+            Product, 'products.json', build,
+            ['parent_subcategory', 'parent_category', 'category_name',
+             'subcategory_name', 'image_small', 'image_medium',
+             'image_large', 'price']
+        )
+
     def load_users(self):
         """
         Загружает пользователей из файла users.json в базу данных.
@@ -35,8 +375,9 @@ class Command(BaseCommand):
             with open('data/users.json', encoding='utf-8') as data_file_users:
                 user_data = json.load(data_file_users)
                 for user in user_data:
-                    user_password = make_password(
-                        user['password'])  # Хэшируем пароль
+                    # Хэшируем пароль, если в записи нет готового хэша
+                    user_password = (user.get('password_hash')
+                                     or make_password(user['password']))
                     try:
                         User.objects.get_or_create(
                             username=user['username'],
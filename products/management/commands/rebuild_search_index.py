@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Полная перестройка поискового индекса продуктов'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано продуктов: {count} '
+            f'за {time.perf_counter() - started:.2f} с'))
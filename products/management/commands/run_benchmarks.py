@@ -0,0 +1,309 @@
+import json
+import platform
+import random
+import subprocess
+import time
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myshop.benchmarking import (DUMMY_CACHES, format_summary,
+                                 isolated_database, summarize)
+from myshop.metrics import request_metrics
+from products.synthetic import NOUNS, generate_catalog, generate_customers
+
+# Отдельный кэш в памяти процесса: бенчмарк не читает и не портит
+# кэш рабочего окружения (например, общий Redis).
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    },
+}
+
+# Сценарии: имя представления, метрики которого берутся
+# для подсчета запросов к БД.
+SCENARIOS = {
+    'list': 'product-list',
+    'detail': 'product-detail',
+    'search': 'product-search',
+    'cart-read': 'cart-detail',
+    'cart-add': 'cart-add',
+}
+# Страницы списка продуктов, из которых выбирается случайная.
+MAX_LIST_PAGE = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк эндпоинтов каталога и корзины на сгенерированных данных '
+        'в отдельной тестовой базе: запросы/с, перцентили времени ответа '
+        'и запросы к БД на запрос, с сохранением результатов в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1000,
+            help='Количество продуктов в каталоге, например 1000, 100000 '
+                 'или 1000000 (по умолчанию 1000).'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Количество пользователей с корзинами (по умолчанию 20).'
+        )
+        parser.add_argument(
+            '--cart-items',
+            type=int,
+            default=5,
+            help='Количество продуктов в каждой корзине (по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов в каждом сценарии (по умолчанию 200).'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Количество запросов для прогрева перед замерами '
+                 '(по умолчанию 20).'
+        )
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=list(SCENARIOS),
+            default=list(SCENARIOS),
+            help='Сценарии для запуска (по умолчанию все).'
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Отключить кэш ответов каталога.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Размер пакета при генерации (по умолчанию 5000).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к JSON-файлу для сохранения результатов.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл с результатами предыдущего запуска '
+                 'для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(
+                    f'Не удалось прочитать {options["baseline"]}: {error}')
+
+        setup_test_environment()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(isolated_database())
+                stack.enter_context(override_settings(
+                    CACHES=DUMMY_CACHES if options['no_cache']
+                    else BENCHMARK_CACHES))
+                results = self.run(options)
+        finally:
+            teardown_test_environment()
+
+        for name, result in results['scenarios'].items():
+            self.stdout.write(
+                f'{format_summary(name, result["latency_ms"])}; '
+                f'{result["ops_per_sec"]:.0f} запросов/с; '
+                f'запросов к БД на запрос: {result["queries_per_request"]}; '
+                f'ошибок: {result["errors"]}')
+        if baseline is not None:
+            self.compare(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+                file.write('\n')
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты сохранены в {options["output"]}'))
+
+    def run(self, options):
+        """
+        Генерирует данные и выполняет сценарии.
+
+        Возвращает:
+        - Словарь с параметрами запуска (meta) и результатами
+          сценариев (scenarios).
+        """
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        self.product_ids = generate_catalog(
+            options['products'], rng, options['batch_size'])
+        users = generate_customers(
+            options['users'], len(self.product_ids), rng,
+            options['cart_items'])
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f'Сгенерировано продуктов: {len(self.product_ids)}, '
+            f'пользователей: {len(users)} за {seconds:.1f} с')
+
+        self.rng = rng
+        self.anonymous = Client()
+        self.customers = [
+            Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            for user in users
+        ]
+        self.list_pages = max(1, min(
+            MAX_LIST_PAGE, -(-len(self.product_ids) // 10)))
+
+        scenarios = {}
+        for name in options['scenarios']:
+            scenarios[name] = self.run_scenario(
+                name, options['requests'], options['warmup'])
+        return {
+            'meta': self.get_meta(options),
+            'scenarios': scenarios,
+        }
+
+    def run_scenario(self, name, requests, warmup):
+        """
+        Выполняет warmup запросов для прогрева, затем requests
+        запросов с замерами.
+
+        Возвращает:
+        - Словарь с количеством запросов и ошибок, запросами в секунду,
+          сводкой времени ответа (мс) и средним числом запросов к БД.
+        """
+        make_request = getattr(self, f'request_{name.replace("-", "_")}')
+        for _ in range(warmup):
+            make_request()
+
+        request_metrics.reset()
+        timings = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            response = make_request()
+            timings.append((time.perf_counter() - request_started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+        queries = None
+        histograms = request_metrics.histograms.get(SCENARIOS[name])
+        if histograms is not None:
+            histogram = histograms['myshop_request_db_queries']
+            _, total, count = histogram.snapshot()
+            queries = round(total / count, 2) if count else None
+        return {
+            'view': SCENARIOS[name],
+            'requests': requests,
+            'errors': errors,
+            'ops_per_sec': round(requests / elapsed, 1) if elapsed else None,
+            'latency_ms': {
+                key: round(value, 3)
+                for key, value in summarize(timings).items()
+            },
+            'queries_per_request': queries,
+        }
+
+    def request_list(self):
+        return self.anonymous.get(
+            reverse('product-list'),
+            {'page': self.rng.randint(1, self.list_pages)})
+
+    def request_detail(self):
+        return self.anonymous.get(reverse(
+            'product-detail', args=[self.rng.choice(self.product_ids)]))
+
+    def request_search(self):
+        return self.anonymous.get(
+            reverse('product-search'), {'q': self.rng.choice(NOUNS)})
+
+    def request_cart_read(self):
+        return self.rng.choice(self.customers).get(reverse('cart-detail'))
+
+    def request_cart_add(self):
+        return self.rng.choice(self.customers).post(
+            reverse('cart-add'),
+            {'product_id': self.rng.choice(self.product_ids), 'quantity': 1},
+            content_type='application/json'
+        )
+
+    def get_meta(self, options):
+        """
+        Возвращает параметры запуска и окружения для сравнения
+        результатов между коммитами.
+        """
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cache': not options['no_cache'],
+            'products': options['products'],
+            'users': options['users'],
+            'cart_items': options['cart_items'],
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'seed': options['seed'],
+        }
+
+    def compare(self, results, baseline):
+        """
+        Выводит изменение запросов в секунду и p95 относительно
+        результатов предыдущего запуска.
+        """
+        commit = baseline.get('meta', {}).get('commit')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Сравнение с {commit or "предыдущим запуском"}'))
+        for name, result in results['scenarios'].items():
+            previous = baseline.get('scenarios', {}).get(name)
+            if not previous:
+                continue
+            changes = []
+            for label, current, before in (
+                ('запросов/с', result['ops_per_sec'],
+                 previous.get('ops_per_sec')),
+                ('p95', result['latency_ms']['p95'],
+                 previous.get('latency_ms', {}).get('p95')),
+            ):
+                if current is not None and before:
+                    changes.append(
+                        f'{label} {(current - before) / before:+.1%}')
+            self.stdout.write(f'{name}: {", ".join(changes)}')
@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+
+from cart.models import Cart, CartItem
+from myshop.benchmarking import (database_profile, format_summary,
+                                 isolated_database, summarize)
+from products.synthetic import generate_catalog, generate_customers
+
+
+class Command(BaseCommand):
+    help = (
+        'Конкурентная нагрузка чтения и записи корзин на отдельной '
+        'тестовой базе для каждого профиля настроек БД '
+        '(settings.DATABASE_PROFILES)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            choices=list(settings.DATABASE_PROFILES),
+            default=list(settings.DATABASE_PROFILES),
+            help='Профили для сравнения (по умолчанию все).'
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=8,
+            help='Количество потоков чтения корзин (по умолчанию 8).'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=4,
+            help='Количество потоков записи в корзины (по умолчанию 4).'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность нагрузки в секундах (по умолчанию 5).'
+        )
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=200,
+            help='Количество продуктов в каталоге (по умолчанию 200).'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Количество пользователей с корзинами (по умолчанию 20).'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.'
+        )
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Профиль {profile}'))
+            with database_profile(profile), isolated_database():
+                results = self.run(options)
+            for role, (timings, errors, elapsed) in results.items():
+                self.stdout.write(
+                    f'{format_summary(role, summarize(timings))}; '
+                    f'{len(timings) / elapsed:.0f} операций/с; '
+                    f'ошибок блокировки: {errors}')
+
+    def run(self, options):
+        """
+        Генерирует каталог и корзины, затем в течение duration секунд
+        параллельно читает корзины в readers потоках и изменяет их
+        в writers потоках.
+
+        Каждая операция обрамляется close_old_connections, как запрос
+        в обработчике Django: без постоянных соединений поток
+        подключается к БД заново на каждую операцию.
+
+        Возвращает:
+        - Словарь {роль: (длительности успешных операций в мс,
+          количество ошибок OperationalError, время в секундах)}.
+        """
+        rng = random.Random(options['seed'])
+        self.product_ids = generate_catalog(options['products'], rng)
+        users = generate_customers(
+            options['users'], len(self.product_ids), rng)
+        self.carts = list(Cart.objects.filter(user__in=users))
+        # Потоки открывают собственные соединения.
+        connection.close()
+
+        deadline = time.perf_counter() + options['duration']
+        workers = (
+            [('Чтение', self.read_cart)] * options['readers']
+            + [('Запись', self.write_cart)] * options['writers']
+        )
+        barrier = threading.Barrier(len(workers))
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            outcomes = list(executor.map(
+                lambda args: self.work(*args),
+                [(operation, random.Random(options['seed'] + number),
+                  deadline, barrier)
+                 for number, (_, operation) in enumerate(workers)]
+            ))
+
+        results = {role: ([], 0, options['duration']) for role, _ in workers}
+        for (role, _), (timings, errors) in zip(workers, outcomes):
+            role_timings, role_errors, elapsed = results[role]
+            results[role] = (role_timings + timings, role_errors + errors,
+                             elapsed)
+        return results
+
+    def work(self, operation, rng, deadline, barrier):
+        """
+        Выполняет operation в цикле до deadline.
+
+        Возвращает:
+        - Кортеж (длительности успешных операций в мс,
+          количество ошибок OperationalError).
+        """
+        timings = []
+        errors = 0
+        barrier.wait()
+        try:
+            while time.perf_counter() < deadline:
+                close_old_connections()
+                started = time.perf_counter()
+                try:
+                    operation(rng)
+                except OperationalError:
+                    errors += 1
+                else:
+                    timings.append((time.perf_counter() - started) * 1000)
+                finally:
+                    close_old_connections()
+        finally:
+            connection.close()
+        return timings, errors
+
+    def read_cart(self, rng):
+        cart = Cart.objects.for_detail().get(pk=rng.choice(self.carts).pk)
+        return cart.total_price
+
+    def write_cart(self, rng):
+        CartItem.objects.apply_operations(rng.choice(self.carts), [
+            {'op': 'set', 'product_id': rng.choice(self.product_ids),
+             'quantity': rng.randint(1, 5)},
+        ])
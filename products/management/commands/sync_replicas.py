@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирование основной БД SQLite в файлы реплик '
+        '(settings.DATABASE_REPLICAS) для локальной проверки '
+        'чтения с реплик'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте переменную окружения '
+                'DATABASE_REPLICAS, например replica1:2,replica2:1.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Копирование поддерживается только для SQLite, для других '
+                'СУБД используйте их собственную репликацию.')
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.close()
+            replica.ensure_connection()
+            # Онлайн-копия через backup API SQLite: основная БД
+            # остается доступной для чтения и записи.
+            primary.connection.backup(replica.connection)
+            replica.close()
+            self.stdout.write(
+                f'{alias}: скопирована в {replica.settings_dict["NAME"]}')
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены'))
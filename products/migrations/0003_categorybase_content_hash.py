@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_categorybase_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorybase',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Заполняется при загрузке из фида (load_database).', max_length=64, verbose_name='Хэш записи фида'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from django.db import migrations
+
+# DDL и запросы индекса зафиксированы на момент миграции и не зависят
+# от products.search: последующие изменения поиска добавляются новыми
+# миграциями.
+SEARCH_TABLE = 'products_product_search'
+BATCH_SIZE = 500
+
+CREATE_INDEX_SQL = {
+    'sqlite': [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+        f'name, subcategory, category, '
+        f"tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    'postgresql': [
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        f'product_id bigint PRIMARY KEY REFERENCES '
+        f'products_product (categorybase_ptr_id) ON DELETE CASCADE '
+        f'DEFERRABLE INITIALLY DEFERRED, '
+        f'document tsvector NOT NULL)',
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx '
+        f'ON {SEARCH_TABLE} USING GIN (document)',
+    ],
+}
+
+INDEX_ROWS_SQL = {
+    'sqlite': (
+        f'INSERT OR REPLACE INTO {SEARCH_TABLE} '
+        f'(rowid, name, subcategory, category) '
+        f'VALUES (%s, %s, %s, %s)'
+    ),
+    'postgresql': (
+        f'INSERT INTO {SEARCH_TABLE} (product_id, document) '
+        f'VALUES (%s, '
+        f"setweight(to_tsvector('russian', %s), 'A') || "
+        f"setweight(to_tsvector('russian', %s), 'B') || "
+        f"setweight(to_tsvector('russian', %s), 'C')) "
+        f'ON CONFLICT (product_id) '
+        f'DO UPDATE SET document = EXCLUDED.document'
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Создает поисковый индекс продуктов для SQLite (FTS5) или PostgreSQL
+    (tsvector) и заполняет его существующими продуктами. Для других
+    СУБД индекс не нужен: поиск идет через LIKE.
+    """
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_INDEX_SQL:
+        return
+    for sql in CREATE_INDEX_SQL[connection.vendor]:
+        schema_editor.execute(sql)
+
+    Product = apps.get_model('products', 'Product')
+    rows = (
+        Product.objects.using(connection.alias)
+        .order_by('pk')
+        .values_list(
+            'pk', 'name', 'parent_subcategory__name',
+            'parent_subcategory__parent_category__name'
+        )
+    )
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(INDEX_ROWS_SQL[connection.vendor], batch)
+                batch = []
+        if batch:
+            cursor.executemany(INDEX_ROWS_SQL[connection.vendor], batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_INDEX_SQL:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_categorybase_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
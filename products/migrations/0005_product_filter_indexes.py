@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='parent_subcategory',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='products', to='products.subcategory', verbose_name='Подкатегория'),
+        ),
+        migrations.AddIndex(
+            model_name='categorybase',
+            index=models.Index(fields=['name'], name='categorybase_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['parent_subcategory', 'price'], name='product_subcategory_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['parent_subcategory', 'categorybase_ptr'], name='product_subcategory_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='product_price_idx'),
+        ),
+    ]
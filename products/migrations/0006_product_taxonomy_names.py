@@ -0,0 +1,61 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_product_taxonomy(apps, schema_editor):
+    """
+    Заполняет категорию и названия категории и подкатегории
+    существующих продуктов одним запросом UPDATE.
+    """
+    Product = apps.get_model('products', 'Product')
+    Subcategory = apps.get_model('products', 'Subcategory')
+    subcategory = Subcategory.objects.filter(
+        pk=OuterRef('parent_subcategory'))
+    Product.objects.using(schema_editor.connection.alias).update(
+        parent_category=Subquery(subcategory.values('parent_category')[:1]),
+        category_name=Subquery(
+            subcategory.values('parent_category__name')[:1]),
+        subcategory_name=Subquery(subcategory.values('name')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='category_name',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Название категории'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='subcategory_name',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Название подкатегории'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='parent_category',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='products', to='products.category', verbose_name='Категория'),
+        ),
+        migrations.RunPython(fill_product_taxonomy, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='product',
+            name='parent_category',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='products', to='products.category', verbose_name='Категория'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['parent_category', 'price'], name='product_category_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['parent_category', 'categorybase_ptr'], name='product_category_id_idx'),
+        ),
+    ]
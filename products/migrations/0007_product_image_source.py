@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_taxonomy_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_source',
+            field=models.ImageField(blank=True, help_text='Из него строятся маленькое, среднее и большое изображения.', null=True, upload_to='products/source/', verbose_name='Исходное изображение продукта'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+import hashlib
+
+from django.conf import settings
+from django.views.decorators.http import condition
+from rest_framework import status
+from rest_framework.response import Response
+
+from myshop.routers import primary_reads
+
+from .cache import (get_catalog_cache, get_catalog_last_modified,
+                    get_response_cache_key, record_cache_hit,
+                    record_cache_miss)
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для условных GET-запросов (ETag и Last-Modified)
+    в методах list и retrieve.
+
+    Значения вычисляются методами get_etag и get_last_modified до
+    выполнения запроса к данным и сериализации. Если клиент передал
+    совпадающий If-None-Match или If-Modified-Since, возвращается
+    304 Not Modified без тела ответа.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        return condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified
+        )(handler)(request, *args, **kwargs)
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+
+class CatalogConditionalGetMixin(ConditionalGetMixin):
+    """
+    Условные GET-запросы для эндпоинтов каталога.
+
+    ETag строится из версии каталога, адреса и параметров запроса
+    и формата ответа, Last-Modified - время последнего изменения каталога.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        return hashlib.md5(
+            f'{get_response_cache_key(request)}:'
+            f'{request.accepted_media_type}'.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return get_catalog_last_modified()
+
+
+class CachedResponseMixin:
+    """
+    Миксин для кэширования ответов list и retrieve представлений каталога.
+
+    В кэше хранятся сериализованные данные ответа (response.data), ключ
+    зависит от адреса, параметров запроса и версии каталога. Сохранение
+    или удаление категории, подкатегории или продукта увеличивает версию
+    каталога, и старые ответы больше не используются. При промахе
+    ответ читается из основной БД (см. primary_reads), а не с реплики,
+    которая может еще не видеть изменение, увеличившее версию.
+    В заголовке X-Cache возвращается HIT или MISS.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """
+        Возвращает ответ из кэша или вызывает handler и сохраняет
+        успешный ответ в кэш.
+        """
+        cache = get_catalog_cache()
+        key = get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            record_cache_hit()
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_cache_miss()
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -1,5 +1,7 @@
 from django.db import models
-from django.utils.text import slugify
+from django.db.models import OuterRef, Subquery
+
+from .slugs import unique_slug
 
 
 class CategoryBase(models.Model):
@@ -15,15 +17,28 @@ class CategoryBase(models.Model):
         unique=True,
         blank=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+    content_hash = models.CharField(
+        'Хэш записи фида',
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text='Заполняется при загрузке из фида (load_database).'
+    )
+
+    class Meta:
+        indexes = [
+            # Сортировка продуктов по названию.
+            models.Index(fields=['name'], name='categorybase_name_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug and self.name:
-            self.slug = slugify(self.name)
-            original_slug = self.slug
-            counter = 1
-            while self.__class__.objects.filter(slug=self.slug).exists():
-                self.slug = f'{original_slug}-{counter}'
-                counter += 1
+            # Свободный суффикс ищется одним запросом (см. products.slugs).
+            self.slug = unique_slug(self.name)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -68,6 +83,44 @@ class Subcategory(CategoryBase):
         verbose_name_plural = 'Подкатегории'
 
 
+class ProductQuerySet(models.QuerySet):
+    """
+    QuerySet для модели Product.
+    """
+
+    def with_taxonomy(self):
+        """
+        Выбирает только поля, которые выводит ProductSerializer.
+
+        Названия подкатегории и категории хранятся в самом продукте
+        (category_name, subcategory_name), поэтому таблицы подкатегорий
+        и категорий в запрос не входят.
+        """
+        return self.only(
+            'id', 'name', 'slug', 'price',
+            'image_small', 'image_medium', 'image_large',
+            'category_name', 'subcategory_name',
+        )
+
+    def sync_taxonomy(self):
+        """
+        Обновляет parent_category, category_name и subcategory_name продуктов
+        по их подкатегориям одним запросом UPDATE.
+
+        Возвращает:
+        - Количество обновленных продуктов.
+        """
+        subcategory = Subcategory.objects.filter(
+            pk=OuterRef('parent_subcategory'))
+        return self.update(
+            parent_category=Subquery(
+                subcategory.values('parent_category')[:1]),
+            category_name=Subquery(
+                subcategory.values('parent_category__name')[:1]),
+            subcategory_name=Subquery(subcategory.values('name')[:1]),
+        )
+
+
 class Product(CategoryBase):
     """
     Модель для продуктов.
@@ -76,7 +129,37 @@ class Product(CategoryBase):
         Subcategory,
         on_delete=models.CASCADE,
         related_name='products',
-        verbose_name='Подкатегория'
+        verbose_name='Подкатегория',
+        # Покрывается составными индексами из Meta.indexes.
+        db_index=False
+    )
+    # Денормализованные данные подкатегории и категории для чтения
+    # без JOIN. Заполняются сигналами (см. products/signals.py).
+    parent_category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='products',
+        verbose_name='Категория',
+        editable=False,
+        db_index=False
+    )
+    category_name = models.CharField(
+        'Название категории',
+        max_length=255,
+        editable=False
+    )
+    subcategory_name = models.CharField(
+        'Название подкатегории',
+        max_length=255,
+        editable=False
+    )
+    image_source = models.ImageField(
+        'Исходное изображение продукта',
+        upload_to='products/source/',
+        blank=True,
+        null=True,
+        help_text='Из него строятся маленькое, среднее '
+                  'и большое изображения.'
     )
     image_small = models.ImageField(
         'Маленькое изображение продукта',
@@ -102,11 +185,41 @@ class Product(CategoryBase):
         decimal_places=2
     )
 
-    @property
-    def category(self):
-        return (self.parent_subcategory.category
-                if self.parent_subcategory else None)
+    objects = ProductQuerySet.as_manager()
+
+    def fill_taxonomy(self, subcategory):
+        """
+        Заполняет денормализованные поля продукта по подкатегории.
+
+        Аргументы:
+        - subcategory: Подкатегория с загруженной категорией.
+        """
+        self.parent_category_id = subcategory.parent_category_id
+        self.category_name = subcategory.parent_category.name
+        self.subcategory_name = subcategory.name
 
     class Meta:
         verbose_name = 'Продукт'
         verbose_name_plural = 'Продукты'
+        indexes = [
+            # Фильтр по категории или подкатегории с сортировкой
+            # или фильтром по цене.
+            models.Index(
+                fields=['parent_category', 'price'],
+                name='product_category_price_idx'
+            ),
+            models.Index(
+                fields=['parent_category', 'categorybase_ptr'],
+                name='product_category_id_idx'
+            ),
+            models.Index(
+                fields=['parent_subcategory', 'price'],
+                name='product_subcategory_price_idx'
+            ),
+            models.Index(
+                fields=['parent_subcategory', 'categorybase_ptr'],
+                name='product_subcategory_id_idx'
+            ),
+            # Фильтр и сортировка по цене без категории и подкатегории.
+            models.Index(fields=['price'], name='product_price_idx'),
+        ]
@@ -1,17 +1,129 @@
+import hashlib
+
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from rest_framework import pagination
 
+from myshop.routers import primary_reads
+
+from .cache import get_catalog_cache, get_catalog_version
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который кэширует общее количество объектов.
+
+    Ключ кэша строится из SQL-запроса и версии каталога, поэтому
+    после изменения каталога количество пересчитывается заново.
+    Количество для кэша считается в основной БД (см. primary_reads).
+    """
+
+    count_cache_timeout = 60 * 15
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return super().count
+        sql, params = query.sql_with_params()
+        digest = hashlib.md5(
+            repr((sql, params)).encode(), usedforsecurity=False
+        ).hexdigest()
+        key = f'catalog:count:{get_catalog_version()}:{digest}'
+        cache = get_catalog_cache()
+        count = cache.get(key)
+        if count is None:
+            with primary_reads():
+                count = super().count
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+
+class CatalogCursorPagination(pagination.CursorPagination):
+    """
+    Курсорная (keyset) пагинация для списков каталога.
+
+    Следующая страница выбирается условием по id, а не OFFSET,
+    и общее количество объектов не считается.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+
 
 class CustomPagination(pagination.PageNumberPagination):
     """
     Пагинация для списков категорий, подкатегорий и продуктов.
 
+    По умолчанию используется постраничная пагинация с кэшированным
+    общим количеством объектов. Курсорная пагинация включается
+    параметром запроса ?pagination=cursor (или наличием параметра cursor).
+    Списки, не являющиеся QuerySet (например, ранжированные результаты
+    поиска), всегда разбиваются на страницы по номеру.
+
     Атрибуты:
     - page_size: Количество элементов на одной странице по умолчанию.
     - page_size_query_param: Параметр запроса для изменения количества
       элементов на странице.
     - max_page_size: Максимальное количество элементов на одной странице.
+    - pagination_query_param: Параметр запроса для выбора режима пагинации.
     """
 
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    django_paginator_class = CachedCountPaginator
+    pagination_query_param = 'pagination'
+    cursor_pagination_class = CatalogCursorPagination
+
+    cursor_pagination = None
+
+    def use_cursor(self, request):
+        """
+        Проверяет, запросил ли клиент курсорную пагинацию.
+        """
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if isinstance(queryset, QuerySet) and self.use_cursor(request):
+            self.cursor_pagination = self.cursor_pagination_class()
+            page = self.cursor_pagination.paginate_queryset(
+                queryset, request, view)
+            self.display_page_controls = (
+                self.cursor_pagination.display_page_controls)
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        cursor_parameters = [
+            parameter for parameter in (
+                self.cursor_pagination_class()
+                .get_schema_operation_parameters(view)
+            )
+            if parameter['name'] != self.page_size_query_param
+        ]
+        return parameters + cursor_parameters + [{
+            'name': self.pagination_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Режим пагинации: page (по умолчанию) или cursor.',
+            'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+        }]
@@ -0,0 +1,39 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson.
+
+    Вывод совпадает с JSONRenderer (компактный JSON в UTF-8): типы,
+    которые orjson кодирует иначе (Decimal, даты, ленивые строки),
+    передаются в кодировщик DRF. Если orjson не установлен или запрошен
+    отступ (например, в Browsable API), используется обычный
+    JSONRenderer: отступы и разделители orjson отличаются от json.dumps.
+    """
+
+    options = 0
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=encoders.JSONEncoder().default,
+            option=self.options)
+        # Как и JSONRenderer, экранируем \u2028 и \u2029.
+        for char in ('\u2028', '\u2029'):
+            ret = ret.replace(char.encode(), char.encode('unicode_escape'))
+        return ret
@@ -0,0 +1,251 @@
+import re
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+
+from .bulk import batched
+from .models import Product
+
+SEARCH_TABLE = 'products_product_search'
+SEARCH_BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    """
+    Разбивает поисковый запрос на слова, отбрасывая служебные символы
+    синтаксиса полнотекстового поиска.
+    """
+    return TOKEN_RE.findall(query.lower())
+
+
+class SearchBackend(ABC):
+    """
+    Базовый класс поиска продуктов по названию продукта,
+    подкатегории и категории.
+
+    Подклассы реализуют search; методы обслуживания индекса
+    по умолчанию ничего не делают (поиск без индекса).
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index_rows(self, rows):
+        """
+        Добавляет или обновляет строки индекса.
+
+        Аргументы:
+        - rows: Список кортежей (id, название продукта,
+          название подкатегории, название категории).
+        """
+
+    def remove(self, product_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def search(self, query, limit):
+        """
+        Возвращает ID продуктов, подходящих под запрос,
+        в порядке убывания релевантности (не больше limit,
+        без ограничения при limit=None).
+        """
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+    Поиск без индекса через LIKE (icontains). Используется для СУБД
+    без поддержки полнотекстового поиска и как точка сравнения
+    в бенчмарке.
+    """
+
+    def search(self, query, limit):
+        condition = Q()
+        for token in tokenize(query):
+            condition &= (
+                Q(name__icontains=token)
+                | Q(subcategory_name__icontains=token)
+                | Q(category_name__icontains=token)
+            )
+        return list(
+            Product.objects.using(self.connection.alias)
+            .filter(condition).order_by('id')
+            .values_list('pk', flat=True)[:limit]
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Поиск через виртуальную таблицу SQLite FTS5.
+
+    rowid строки индекса совпадает с ID продукта, ранжирование -
+    bm25 с весами: название продукта важнее подкатегории,
+    подкатегория важнее категории. Таблица индекса создается
+    миграцией products.0004_product_search_index.
+    """
+
+    def index_rows(self, rows):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {SEARCH_TABLE} '
+                f'(rowid, name, subcategory, category) '
+                f'VALUES (%s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, product_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [(product_id,) for product_id in product_ids]
+            )
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0), rowid '
+                f'LIMIT %s',
+                [match, -1 if limit is None else limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Поиск через столбец tsvector с GIN-индексом.
+
+    Документ собирается из названий продукта (вес A),
+    подкатегории (вес B) и категории (вес C), ранжирование - ts_rank.
+    Таблица индекса создается миграцией products.0004_product_search_index.
+    """
+
+    config = 'russian'
+
+    def index_rows(self, rows):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (product_id, document) '
+                f'VALUES (%s, '
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'C')) "
+                f'ON CONFLICT (product_id) '
+                f'DO UPDATE SET document = EXCLUDED.document',
+                rows
+            )
+
+    def remove(self, product_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE product_id = ANY(%s)',
+                [list(product_ids)]
+            )
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        ts_query = ' & '.join(f'{token}:*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT product_id FROM {SEARCH_TABLE}, '
+                f"to_tsquery('{self.config}', %s) query "
+                f'WHERE document @@ query '
+                f'ORDER BY ts_rank(document, query) DESC, product_id '
+                f'LIMIT %s',
+                [ts_query, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    """
+    Возвращает реализацию поиска для СУБД соединения.
+    """
+    if connection is None:
+        connection = connections[router.db_for_write(Product)]
+    backend_class = SEARCH_BACKENDS.get(connection.vendor, LikeSearchBackend)
+    return backend_class(connection)
+
+
+def index_products(product_ids, backend=None):
+    """
+    Обновляет поисковый индекс для указанных продуктов.
+
+    Названия продукта, подкатегории и категории (денормализованные
+    в продукте) загружаются пакетами, по одному запросу на пакет.
+    """
+    backend = backend or get_search_backend()
+    for batch in batched(product_ids, SEARCH_BATCH_SIZE):
+        rows = list(
+            Product.objects.using(backend.connection.alias)
+            .filter(pk__in=batch)
+            .values_list('pk', 'name', 'subcategory_name', 'category_name')
+        )
+        backend.remove(set(batch) - {row[0] for row in rows})
+        backend.index_rows(rows)
+
+
+def remove_products(product_ids, backend=None):
+    """
+    Удаляет продукты из поискового индекса.
+    """
+    backend = backend or get_search_backend()
+    for batch in batched(product_ids, SEARCH_BATCH_SIZE):
+        backend.remove(batch)
+
+
+def rebuild_index(backend=None):
+    """
+    Полностью перестраивает поисковый индекс.
+
+    Возвращает:
+    - Количество проиндексированных продуктов.
+    """
+    backend = backend or get_search_backend()
+    backend.clear()
+    product_ids = list(
+        Product.objects.using(backend.connection.alias)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    count = 0
+    for batch in batched(product_ids, SEARCH_BATCH_SIZE):
+        index_products(batch, backend)
+        count += len(batch)
+    return count
+
+
+def search_product_ids(query, limit=None, backend=None):
+    """
+    Возвращает ID продуктов, подходящих под запрос, в порядке
+    убывания релевантности (не больше settings.SEARCH_MAX_RESULTS).
+    """
+    backend = backend or get_search_backend(
+        connections[router.db_for_read(Product)])
+    return backend.search(query, limit or settings.SEARCH_MAX_RESULTS)
@@ -1,3 +1,5 @@
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
 from rest_framework import serializers
 
 from .models import Category, Product, Subcategory
@@ -50,14 +52,14 @@ class ProductSerializer(serializers.ModelSerializer):
     - subcategory: Название подкатегории продукта (только для чтения).
     - price: Цена продукта.
     - images: Словарь с URL изображений продукта разных размеров.
+
+    Названия категории и подкатегории берутся из денормализованных
+    полей продукта, без обращения к связанным моделям.
     """
 
-    category = serializers.CharField(
-        source='parent_subcategory.parent_category.name',
-        read_only=True
-    )
+    category = serializers.CharField(source='category_name', read_only=True)
     subcategory = serializers.CharField(
-        source='parent_subcategory.name', read_only=True)
+        source='subcategory_name', read_only=True)
 
     class Meta:
         model = Product
@@ -82,3 +84,66 @@ class ProductSerializer(serializers.ModelSerializer):
             'medium': obj.image_medium.url if obj.image_medium else None,
             'large': obj.image_large.url if obj.image_large else None,
         }
+
+
+class ProductRowSerializer:
+    """
+    Быстрая сериализация списка продуктов без ModelSerializer.
+
+    Продукты выбираются кортежами (values_list(..., named=True) по полям
+    fields), экземпляры модели и поля сериализатора не создаются.
+    Результат совпадает с ProductSerializer: URL изображений строятся
+    из префикса, вычисленного один раз для запроса, цена выводится
+    строкой, как в DecimalField.
+
+    Аргументы:
+    - request: Запрос для построения абсолютных URL изображений
+    (или None - тогда URL относительные).
+    """
+
+    fields = ('id', 'name', 'slug', 'category_name', 'subcategory_name',
+              'price', 'image_small', 'image_medium', 'image_large')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.storage = Product._meta.get_field('image_small').storage
+        self.media_url = None
+        if isinstance(self.storage, FileSystemStorage):
+            self.media_url = self.storage.base_url
+            if request is not None:
+                self.media_url = request.build_absolute_uri(self.media_url)
+
+    def image_url(self, name):
+        """
+        Возвращает URL изображения так же, как ImageField сериализатора.
+        """
+        if not name:
+            return None
+        if self.media_url is not None:
+            return self.media_url + filepath_to_uri(name).lstrip('/')
+        url = self.storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, row):
+        """
+        Возвращает словарь с данными продукта из строки values_list.
+        """
+        return {
+            'id': row.id,
+            'name': row.name,
+            'slug': row.slug,
+            'category': row.category_name,
+            'subcategory': row.subcategory_name,
+            'price': None if row.price is None else f'{row.price:f}',
+            'image_small': self.image_url(row.image_small),
+            'image_medium': self.image_url(row.image_medium),
+            'image_large': self.image_url(row.image_large),
+        }
+
+    def serialize(self, rows):
+        """
+        Возвращает список словарей с данными продуктов.
+        """
+        return [self.to_representation(row) for row in rows]
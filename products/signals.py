@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .models import Category, Product, Subcategory
+from .search import index_products, remove_products
+
+# Пакетные удаления (load_database --delta) сами обновляют поисковый
+# индекс, версию кэша каталога и даты корзин один раз на пакет.
+signals_muted = ContextVar('catalog_signals_muted', default=False)
+
+
+@contextmanager
+def mute_catalog_signals():
+    """
+    Контекстный менеджер, отключающий в пределах блока обработчики
+    удаления записей каталога и элементов корзин (cart.signals).
+    """
+    token = signals_muted.set(True)
+    try:
+        yield
+    finally:
+        signals_muted.reset(token)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Subcategory)
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Сбрасывает кэши каталога при сохранении или удалении
+    категории, подкатегории или продукта.
+    """
+    if signals_muted.get():
+        return
+    bump_catalog_version()
+
+
+@receiver(pre_save, sender=Product)
+def fill_product_taxonomy(sender, instance, **kwargs):
+    """
+    Заполняет категорию и названия категории и подкатегории
+    продукта перед сохранением.
+    """
+    if instance.parent_subcategory_id is None:
+        return
+    if sender.parent_subcategory.is_cached(instance):
+        subcategory = instance.parent_subcategory
+    else:
+        subcategory = Subcategory.objects.select_related(
+            'parent_category').get(pk=instance.parent_subcategory_id)
+    instance.fill_taxonomy(subcategory)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    """
+    Обновляет продукт в поисковом индексе после сохранения.
+    """
+    index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    """
+    Удаляет продукт из поискового индекса.
+    """
+    if signals_muted.get():
+        return
+    remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Subcategory)
+def sync_subcategory_products(sender, instance, created, **kwargs):
+    """
+    Обновляет денормализованные названия у продуктов подкатегории
+    одним запросом UPDATE и переиндексирует их, так как названия
+    подкатегории и категории входят в поисковый документ продукта.
+    """
+    if not created:
+        products = Product.objects.filter(parent_subcategory=instance)
+        products.sync_taxonomy()
+        index_products(products.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+def sync_category_products(sender, instance, created, **kwargs):
+    """
+    Обновляет название категории у всех ее продуктов одним запросом
+    UPDATE и переиндексирует их.
+    """
+    if not created:
+        products = Product.objects.filter(parent_category=instance)
+        products.update(category_name=instance.name)
+        index_products(products.values_list('pk', flat=True))
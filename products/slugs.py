@@ -0,0 +1,127 @@
+from collections import defaultdict
+from functools import partial, reduce
+from operator import or_
+
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Количество базовых слагов в одном запросе.
+SLUG_QUERY_BATCH_SIZE = 100
+
+
+def _suffix_lookup(base, vendor):
+    if vendor == 'sqlite':
+        # Диапазон ['<base>-', '<base>.') содержит все слаги вида
+        # "<base>-...": '.' следует за '-' в таблице символов,
+        # а правило сравнения BINARY сравнивает байты. LIKE в SQLite
+        # не использует индекс по slug, диапазон - использует.
+        return Q(slug=base) | Q(slug__gte=f'{base}-', slug__lt=f'{base}.')
+    # Правила сравнения других СУБД (например, en_US.UTF-8
+    # в PostgreSQL) не сравнивают '-' и '.' побайтно, поэтому
+    # диапазон может пропустить занятые слаги. Префикс LIKE
+    # использует индекс *_like (varchar_pattern_ops), который Django
+    # создает в PostgreSQL для уникального slug.
+    return Q(slug=base) | Q(slug__startswith=f'{base}-')
+
+
+def _parse(slug):
+    """
+    Возвращает возможные пары (базовый слаг, номер суффикса) для слага:
+    сам слаг с номером 0 и, если слаг оканчивается на -<номер>,
+    часть до суффикса с этим номером.
+    """
+    yield slug, 0
+    head, separator, tail = slug.rpartition('-')
+    if separator and tail.isdigit():
+        yield head, int(tail)
+
+
+def taken_suffixes(bases):
+    """
+    Возвращает занятые номера суффиксов для базовых слагов.
+
+    Слаги, совпадающие с базовым или начинающиеся с "<базовый>-",
+    выбираются одним запросом на SLUG_QUERY_BATCH_SIZE базовых слагов
+    по индексу slug (диапазоном или префиксом, см. _suffix_lookup),
+    слаги вида "<базовый>-<номер>" отбираются из них в Python.
+    Сам базовый слаг соответствует номеру 0.
+
+    Аргументы:
+    - bases: Базовые слаги.
+
+    Возвращает:
+    - Словарь {базовый слаг: множество занятых номеров}.
+    """
+    # Импорт внутри функции: модуль используется в CategoryBase.save.
+    from .models import CategoryBase
+
+    # Слаг подбирается для записи, поэтому занятые слаги читаются
+    # из БД для записи, а не с возможно отстающей реплики.
+    alias = router.db_for_write(CategoryBase)
+    queryset = CategoryBase.objects.using(alias)
+    lookup = partial(_suffix_lookup, vendor=connections[alias].vendor)
+    taken = defaultdict(set)
+    bases = sorted(set(bases))
+    for start in range(0, len(bases), SLUG_QUERY_BATCH_SIZE):
+        batch = bases[start:start + SLUG_QUERY_BATCH_SIZE]
+        batch_bases = set(batch)
+        slugs = queryset.filter(
+            reduce(or_, map(lookup, batch))
+        ).values_list('slug', flat=True)
+        for slug in slugs:
+            for base, number in _parse(slug):
+                if base in batch_bases:
+                    taken[base].add(number)
+    return taken
+
+
+def _next_free(taken):
+    number = 0
+    while number in taken:
+        number += 1
+    taken.add(number)
+    return number
+
+
+def _with_suffix(base, number):
+    return f'{base}-{number}' if number else base
+
+
+def unique_slug(name):
+    """
+    Возвращает свободный слаг для названия одним запросом к БД.
+
+    Если slugify(name) занят, добавляется наименьший свободный
+    суффикс -1, -2 и т.д.
+    """
+    base = slugify(name)
+    return _with_suffix(base, _next_free(taken_suffixes([base])[base]))
+
+
+def assign_unique_slugs(objs):
+    """
+    Заполняет уникальные слаги у несохраненных объектов каталога
+    без слага (например, перед bulk_create).
+
+    Занятые слаги загружаются одним запросом на пакет базовых слагов,
+    слаги, уже заданные у объектов пакета, тоже считаются занятыми.
+
+    Аргументы:
+    - objs: Объекты Category, Subcategory или Product.
+
+    Возвращает:
+    - Тот же список объектов.
+    """
+    pending = [obj for obj in objs if not obj.slug and obj.name]
+    if not pending:
+        return objs
+    taken = taken_suffixes(slugify(obj.name) for obj in pending)
+    for obj in objs:
+        if obj.slug:
+            for base, number in _parse(obj.slug):
+                taken[base].add(number)
+    for obj in pending:
+        base = slugify(obj.name)
+        obj.slug = _with_suffix(base, _next_free(taken[base]))
+    return objs
@@ -0,0 +1,347 @@
+"""
+Генерация синтетического каталога и корзин для бенчмарков
+и команды generate_data.
+
+Данные зависят только от переданного генератора случайных чисел,
+поэтому при одном и том же seed каталог получается одинаковым.
+Подкатегории продуктов и популярность продуктов в корзинах
+распределены по закону Ципфа, цены - логнормально.
+"""
+import math
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from cart.models import Cart, CartItem
+
+from .bulk import batched, bulk_upsert
+from .models import Category, Product, Subcategory
+from .search import index_products
+
+CATEGORY_NAMES = ['Фрукты', 'Овощи', 'Напитки', 'Выпечка', 'Молочные продукты']
+ADJECTIVES = [
+    'свежий', 'спелый', 'сладкий', 'зеленый', 'красный', 'домашний',
+    'фермерский', 'отборный', 'сушеный', 'мороженый', 'органический',
+    'копченый', 'хрустящий', 'нежный', 'пряный', 'кислый',
+]
+NOUNS = [
+    'яблоко', 'груша', 'банан', 'апельсин', 'картофель', 'морковь',
+    'томат', 'огурец', 'сок', 'морс', 'чай', 'кофе', 'хлеб', 'батон',
+    'пирог', 'кефир', 'творог', 'сыр', 'йогурт', 'молоко', 'виноград',
+    'слива', 'капуста', 'лимонад', 'булочка', 'ряженка',
+]
+SUBCATEGORIES_PER_CATEGORY = 5
+# Поля продукта, обновляемые при повторной генерации с теми же слагами.
+PRODUCT_UPDATE_FIELDS = [
+    'parent_subcategory', 'parent_category', 'category_name',
+    'subcategory_name', 'price',
+]
+
+
+def generate_taxonomy(categories=len(CATEGORY_NAMES),
+                      subcategories=SUBCATEGORIES_PER_CATEGORY):
+    """
+    Создает categories категорий (названия из CATEGORY_NAMES)
+    и по subcategories подкатегорий в каждой. Слаги постоянные,
+    поэтому повторный вызов обновляет те же записи.
+
+    Возвращает:
+    - Список подкатегорий.
+    """
+    def numbered(names, number):
+        name = names[number % len(names)]
+        if number >= len(names):
+            name = f'{name} {number // len(names) + 1}'
+        return name
+
+    categories = bulk_upsert(Category, [
+        Category(name=numbered(CATEGORY_NAMES, number),
+                 slug=f'category-{number}')
+        for number in range(categories)
+    ], [])
+    return bulk_upsert(Subcategory, [
+        Subcategory(
+            name=f'{category.name} {numbered(ADJECTIVES, number)}',
+            slug=f'subcategory-{category.pk}-{number}',
+            parent_category=category
+        )
+        for category in categories
+        for number in range(subcategories)
+    ], ['parent_category'])
+
+
+class ZipfSampler:
+    """
+    Выборка рангов 1..n с распределением Ципфа: вероятность ранга k
+    пропорциональна 1 / k ** exponent.
+
+    Используется метод rejection-inversion (W. Hörmann, G. Derflinger):
+    память и время выборки не зависят от n, поэтому подходит
+    для миллионов продуктов.
+
+    Аргументы:
+    - n: Количество рангов.
+    - exponent: Показатель распределения (больше нуля).
+    - rng: Генератор случайных чисел (random.Random).
+    """
+
+    def __init__(self, n, exponent, rng):
+        if n < 1 or exponent <= 0:
+            raise ValueError('Ожидаются n >= 1 и exponent > 0.')
+        self.n = n
+        self.exponent = exponent
+        self.rng = rng
+        self.h_integral_x1 = self.h_integral(1.5) - 1.0
+        self.h_integral_n = self.h_integral(n + 0.5)
+        self.s = 2.0 - self.h_integral_inverse(
+            self.h_integral(2.5) - self.h(2.0))
+
+    def sample(self):
+        """
+        Возвращает случайный ранг от 1 до n.
+        """
+        while True:
+            u = self.h_integral_n + self.rng.random() * (
+                self.h_integral_x1 - self.h_integral_n)
+            x = self.h_integral_inverse(u)
+            k = min(max(int(x + 0.5), 1), self.n)
+            if (k - x <= self.s
+                    or u >= self.h_integral(k + 0.5) - self.h(k)):
+                return k
+
+    def h(self, x):
+        return math.exp(-self.exponent * math.log(x))
+
+    def h_integral(self, x):
+        log_x = math.log(x)
+        return _expm1_ratio((1.0 - self.exponent) * log_x) * log_x
+
+    def h_integral_inverse(self, x):
+        t = max(x * (1.0 - self.exponent), -1.0)
+        return math.exp(_log1p_ratio(t) * x)
+
+
+def _log1p_ratio(x):
+    """log1p(x) / x с точностью около нуля."""
+    if abs(x) > 1e-8:
+        return math.log1p(x) / x
+    return 1.0 - x * (0.5 - x * (1.0 / 3.0 - 0.25 * x))
+
+
+def _expm1_ratio(x):
+    """expm1(x) / x с точностью около нуля."""
+    if abs(x) > 1e-8:
+        return math.expm1(x) / x
+    return 1.0 + x * 0.5 * (1.0 + x / 3.0 * (1.0 + 0.25 * x))
+
+
+def sample_price(rng):
+    """
+    Возвращает цену с логнормальным распределением: большинство
+    продуктов дешевые (медиана около 300), немного дорогих.
+    """
+    price = min(max(rng.lognormvariate(math.log(300), 1.0), 1), 99_999)
+    return Decimal(f'{price:.2f}')
+
+
+def product_slug(number):
+    """Слаг сгенерированного продукта с номером number."""
+    return f'synthetic-product-{number}'
+
+
+def popular_product(rank, count):
+    """
+    Возвращает номер продукта с рангом популярности rank (от 1).
+
+    Ранги переставляются взаимно однозначным отображением
+    (a * rank + b) mod count, чтобы популярные продукты не совпадали
+    с первыми созданными и не собирались в одной подкатегории.
+    """
+    multiplier = 2_654_435_761
+    while math.gcd(multiplier, count) != 1:
+        multiplier += 2
+    return (multiplier * (rank - 1) + 12_345) % count
+
+
+def iter_products(count, subcategories, rng, exponent=1.1):
+    """
+    Поочередно создает count несохраненных продуктов: подкатегория
+    выбирается по распределению Ципфа (несколько подкатегорий
+    содержат большую часть продуктов), цена - логнормальная.
+
+    Аргументы:
+    - count: Количество продуктов.
+    - subcategories: Список подкатегорий.
+    - rng: Генератор случайных чисел (random.Random).
+    - exponent: Показатель распределения Ципфа для подкатегорий.
+    """
+    subcategory_sampler = ZipfSampler(len(subcategories), exponent, rng)
+    for number in range(count):
+        subcategory = subcategories[subcategory_sampler.sample() - 1]
+        product = Product(
+            name=f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} '
+                 f'{rng.choice(NOUNS)}',
+            slug=product_slug(number),
+            parent_subcategory=subcategory,
+            price=sample_price(rng)
+        )
+        product.fill_taxonomy(subcategory)
+        yield product
+
+
+def iter_cart_items(users, products, rng, cart_items=5, exponent=1.1):
+    """
+    Поочередно выдает содержимое корзин для номеров пользователей
+    users: для каждого пользователя - кортеж (номер пользователя,
+    список пар (номер продукта, количество)).
+
+    Количество позиций в корзине равномерно от 0 до 2 * cart_items,
+    продукты выбираются по популярности с распределением Ципфа
+    (см. popular_product).
+    """
+    sampler = ZipfSampler(products, exponent, rng)
+    for user in users:
+        size = min(rng.randint(0, 2 * cart_items), products)
+        numbers = {}
+        while len(numbers) < size:
+            number = popular_product(sampler.sample(), products)
+            numbers.setdefault(number, rng.randint(1, 3))
+        yield user, list(numbers.items())
+
+
+def write_products(count, subcategories, rng, exponent=1.1,
+                   batch_size=5000, index=True):
+    """
+    Записывает count продуктов (см. iter_products) пакетами через
+    bulk_upsert по слагу, поэтому повторный запуск обновляет те же
+    продукты. В памяти одновременно находится только один пакет.
+
+    Аргументы:
+    - count: Количество продуктов.
+    - subcategories: Список подкатегорий.
+    - rng: Генератор случайных чисел (random.Random).
+    - exponent: Показатель распределения Ципфа для подкатегорий.
+    - batch_size: Размер пакета записи.
+    - index: Добавлять ли продукты в поисковый индекс.
+
+    Возвращает:
+    - Итератор по записанным пакетам продуктов (списки в порядке
+      номеров продуктов).
+    """
+    products = iter_products(count, subcategories, rng, exponent)
+    for batch in batched(products, batch_size):
+        with transaction.atomic():
+            written = bulk_upsert(Product, batch, PRODUCT_UPDATE_FIELDS)
+            if index:
+                index_products([product.pk for product in written])
+        yield written
+
+
+def write_customers(count, products, rng, cart_items=5, exponent=1.1,
+                    password='synthetic-password', batch_size=5000):
+    """
+    Создает count пользователей, их корзины и позиции корзин
+    (см. iter_cart_items) пакетами.
+
+    Продукты корзин определяются по номеру (слаг
+    synthetic-product-<номер>) и загружаются одним запросом
+    на пакет. Существующие пользователи и корзины не создаются
+    повторно, количество существующих позиций обновляется.
+    Пароль хэшируется один раз и используется всеми пользователями.
+
+    Аргументы:
+    - count: Количество пользователей.
+    - products: Количество сгенерированных продуктов (write_products).
+    - rng: Генератор случайных чисел (random.Random).
+    - cart_items: Среднее количество позиций в корзине.
+    - exponent: Показатель распределения Ципфа для популярности.
+    - password: Пароль пользователей.
+    - batch_size: Размер пакета записи.
+
+    Возвращает:
+    - Итератор по пакетам: кортежи (список ID пользователей пакета,
+      количество записанных позиций корзин).
+    """
+    User = get_user_model()
+    password = make_password(password)
+    carts = iter_cart_items(range(count), products, rng, cart_items, exponent)
+    for batch in batched(carts, batch_size):
+        usernames = {
+            number: f'synthetic-user-{number}' for number, _ in batch}
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=username,
+                      email=f'{username}@example.com',
+                      password=password)
+                 for username in usernames.values()],
+                ignore_conflicts=True
+            )
+            user_ids = dict(User.objects.filter(
+                username__in=usernames.values()
+            ).values_list('username', 'pk'))
+            Cart.objects.bulk_create(
+                [Cart(user_id=user_id) for user_id in user_ids.values()],
+                ignore_conflicts=True
+            )
+            cart_ids = dict(Cart.objects.filter(
+                user_id__in=user_ids.values()
+            ).values_list('user_id', 'pk'))
+            slugs = {
+                product_slug(product)
+                for _, numbers in batch for product, _ in numbers
+            }
+            product_ids = dict(Product.objects.filter(
+                slug__in=slugs).values_list('slug', 'pk'))
+            cart_items = [
+                CartItem(
+                    cart_id=cart_ids[user_ids[usernames[number]]],
+                    product_id=product_ids[product_slug(product)],
+                    quantity=quantity
+                )
+                for number, numbers in batch
+                for product, quantity in numbers
+                if product_slug(product) in product_ids
+            ]
+            CartItem.objects.bulk_create(
+                cart_items, batch_size=batch_size,
+                update_conflicts=True, unique_fields=['cart', 'product'],
+                update_fields=['quantity']
+            )
+        yield list(user_ids.values()), len(cart_items)
+
+
+def generate_catalog(count, rng, batch_size=5000, exponent=1.1):
+    """
+    Создает категории, подкатегории (generate_taxonomy) и count
+    продуктов (write_products) с поисковым индексом.
+
+    Возвращает:
+    - Список первичных ключей продуктов в порядке номеров продуктов.
+    """
+    subcategories = generate_taxonomy()
+    return [
+        product.pk
+        for written in write_products(
+            count, subcategories, rng, exponent, batch_size)
+        for product in written
+    ]
+
+
+def generate_customers(count, products, rng, cart_items=5, exponent=1.1,
+                       password='benchmark-password', batch_size=5000):
+    """
+    Создает count пользователей с корзинами (write_customers).
+
+    Возвращает:
+    - Список созданных пользователей.
+    """
+    user_ids = [
+        user_id
+        for batch_user_ids, _ in write_customers(
+            count, products, rng, cart_items, exponent, password, batch_size)
+        for user_id in batch_user_ids
+    ]
+    return list(get_user_model().objects.filter(pk__in=user_ids)
+                .order_by('pk'))
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from PIL import Image
+
+from .images import IMAGE_ERRORS, IMAGE_EXTENSIONS, render_image
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Высота не ограничивается: превью строится по ширине.
+MAX_HEIGHT = 100_000
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Блокировки внутри процесса: фиксированный набор, превью
+# распределяются по ним по хэшу пути.
+_locks = [threading.Lock() for _ in range(64)]
+
+
+class ThumbnailError(Exception):
+    """
+    Исходное изображение не найдено или не может быть обработано.
+    """
+
+
+def source_path(path):
+    """
+    Возвращает абсолютный путь к исходному файлу в MEDIA_ROOT.
+
+    Исключения:
+    - ThumbnailError: Если путь выходит за пределы MEDIA_ROOT
+      или файл не существует.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise ThumbnailError(path)
+    if not os.path.isfile(full_path):
+        raise ThumbnailError(path)
+    return full_path
+
+
+def content_digest(full_path):
+    """
+    Возвращает SHA-256 содержимого файла.
+
+    Хэш кэшируется по пути, времени изменения и размеру файла,
+    поэтому файл читается только после его изменения.
+    """
+    stat = os.stat(full_path)
+    key = 'thumbnail:source:' + hashlib.md5(
+        f'{full_path}:{stat.st_mtime_ns}:{stat.st_size}'.encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    digest = cache.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(full_path, 'rb') as source:
+            while chunk := source.read(HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        cache.set(key, digest, None)
+    return digest
+
+
+def variant_path(digest, width, image_format):
+    """
+    Возвращает путь к файлу превью в settings.THUMBNAIL_CACHE_DIR.
+
+    Имя строится из хэша содержимого исходного файла, поэтому
+    одинаковые файлы по разным путям используют одно превью,
+    а измененный файл получает новое.
+    """
+    extension = IMAGE_EXTENSIONS.get(image_format, image_format.lower())
+    return os.path.join(
+        settings.THUMBNAIL_CACHE_DIR, digest[:2],
+        f'{digest}-{width}.{extension}')
+
+
+@contextmanager
+def variant_lock(path):
+    """
+    Блокировка построения одного превью.
+
+    Внутри процесса используется threading.Lock (один из набора,
+    по хэшу пути превью), между процессами (если доступен fcntl) -
+    flock на файле .lock рядом с превью.
+    """
+    with _locks[hash(path) % len(_locks)]:
+        if fcntl is None:
+            yield
+            return
+        with open(f'{path}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def render_variant(full_path, path, width, image_format):
+    """
+    Строит превью и атомарно записывает его: сначала во временный
+    файл в том же каталоге, затем os.replace.
+    """
+    try:
+        with Image.open(full_path) as image:
+            content = render_image(
+                image, (width, MAX_HEIGHT), image_format,
+                settings.PRODUCT_IMAGE_QUALITY)
+    except IMAGE_ERRORS as error:
+        raise ThumbnailError(full_path) from error
+
+    descriptor, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def get_thumbnail(path, width, image_format='JPEG'):
+    """
+    Возвращает путь к превью изображения из MEDIA_ROOT шириной width.
+
+    Готовое превью берется с диска; если его нет, оно строится один
+    раз, даже при одновременных запросах одного и того же превью.
+
+    Аргументы:
+    - path: Путь к исходному изображению относительно MEDIA_ROOT.
+    - width: Ширина из settings.THUMBNAIL_WIDTHS.
+    - image_format: Формат превью ('WEBP' или 'JPEG',
+      см. images.accepted_format).
+
+    Возвращает:
+    - Кортеж (путь к файлу превью, хэш содержимого исходного файла).
+
+    Исключения:
+    - ThumbnailError: Если исходный файл не найден или не является
+      изображением.
+    """
+    full_path = source_path(path)
+    digest = content_digest(full_path)
+    path = variant_path(digest, width, image_format)
+    if os.path.exists(path):
+        return path, digest
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with variant_lock(path):
+        # Превью могло быть построено, пока мы ждали блокировку.
+        if not os.path.exists(path):
+            render_variant(full_path, path, width, image_format)
+    return path, digest
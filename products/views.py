@@ -1,18 +1,39 @@
-from rest_framework import permissions, viewsets
+import mimetypes
+from functools import partial
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 
 from products.paginations import CustomPagination
 
+from .filters import ProductFilter, StableOrderingFilter
+from .images import accepted_format
+from .mixins import CachedResponseMixin, CatalogConditionalGetMixin
 from .models import Category, Product, Subcategory
-from .serializers import (CategorySerializer, ProductSerializer,
-                          SubcategorySerializer)
+from .renderers import FastJSONRenderer
+from .search import search_product_ids
+from .serializers import (CategorySerializer, ProductRowSerializer,
+                          ProductSerializer, SubcategorySerializer)
+from .thumbnails import ThumbnailError, get_thumbnail
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CatalogConditionalGetMixin, CachedResponseMixin,
+                      viewsets.ReadOnlyModelViewSet):
     """
     Представление для модели Category.
 
     Поддерживает только чтение (GET-запросы).
     Позволяет получать список всех категорий или одну категорию по её ID.
+    Ответы кэшируются до изменения каталога (см. CachedResponseMixin),
+    поддерживаются условные запросы по ETag и Last-Modified.
     """
 
     queryset = Category.objects.all().order_by('id')
@@ -21,26 +42,135 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.AllowAny,)
 
 
-class SubcategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class SubcategoryViewSet(CatalogConditionalGetMixin, CachedResponseMixin,
+                         viewsets.ReadOnlyModelViewSet):
     """
     Представление для модели Subcategory.
 
     Поддерживает только чтение (GET-запросы).
     Позволяет получать список всех подкатегорий или одну подкатегорию по её ID.
+    Родительская категория подгружается тем же запросом (select_related),
+    из БД выбираются только поля, которые выводит сериализатор.
+    Ответы кэшируются до изменения каталога.
     """
 
-    queryset = Subcategory.objects.all().order_by('id')
+    queryset = (
+        Subcategory.objects
+        .select_related('parent_category')
+        .only('id', 'name', 'slug', 'image', 'parent_category__name')
+        .order_by('id')
+    )
     serializer_class = SubcategorySerializer
     pagination_class = CustomPagination
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(CatalogConditionalGetMixin, CachedResponseMixin,
+                     viewsets.ReadOnlyModelViewSet):
     """
     Представление для получения списка продуктов.
 
     Поддерживает только чтение (GET-запросы).
     Позволяет получать список всех продуктов или один продукт по его ID.
+    Названия подкатегории и категории хранятся в самом продукте,
+    поэтому список выбирается одним запросом без JOIN связанных моделей.
+    Список фильтруется по слагу категории и подкатегории и диапазону
+    цен (см. ProductFilter) и сортируется по цене или названию
+    (?ordering=price, ?ordering=-name).
+    Список выводится без ModelSerializer (см. ProductRowSerializer),
+    если включен settings.PRODUCT_LIST_FAST_PATH, JSON кодируется
+    через orjson (см. FastJSONRenderer).
+    Ответы кэшируются до изменения каталога.
     """
-    queryset = Product.objects.all().order_by('id')
+    queryset = Product.objects.with_taxonomy().order_by('id')
     serializer_class = ProductSerializer
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
     pagination_class = CustomPagination
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
+    filterset_class = ProductFilter
+    ordering_fields = ('price', 'name')
+    ordering = ('id',)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.PRODUCT_LIST_FAST_PATH:
+            return super().list(request, *args, **kwargs)
+        return self.get_conditional_response(
+            partial(self.get_cached_response, self.list_rows),
+            request, *args, **kwargs)
+
+    def list_rows(self, request, *args, **kwargs):
+        """
+        Список продуктов из кортежей values_list: та же фильтрация,
+        сортировка и пагинация, что и в list, но без создания
+        экземпляров модели и ModelSerializer.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values_list(
+            *ProductRowSerializer.fields, named=True)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            ProductRowSerializer(request).serialize(page))
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            'q', str, required=True,
+            description='Поисковый запрос по названию продукта, '
+                        'подкатегории и категории.'
+        ),
+    ])
+    @action(detail=False)
+    def search(self, request):
+        """
+        Полнотекстовый поиск продуктов.
+
+        Поиск идет по индексу (FTS5 в SQLite, tsvector в PostgreSQL),
+        результаты отсортированы по релевантности и разбиты на страницы.
+        Ответы кэшируются до изменения каталога.
+        """
+        return self.get_conditional_response(
+            partial(self.get_cached_response, self.search_products), request)
+
+    def search_products(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': "Параметр 'q' обязателен."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        page = self.paginate_queryset(search_product_ids(query))
+        products = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [products[pk] for pk in page if pk in products], many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+@require_safe
+def thumbnail(request, width, path):
+    """
+    Превью изображения из MEDIA_ROOT заданной ширины.
+
+    Ширина должна входить в settings.THUMBNAIL_WIDTHS. Превью строится
+    при первом запросе и сохраняется на диск, следующие запросы
+    отдают готовый файл. Формат выбирается по заголовку Accept
+    (см. accepted_format), поэтому ответ содержит Vary: Accept.
+    Ответ кэшируется браузером и CDN на settings.THUMBNAIL_MAX_AGE
+    секунд, ETag - хэш содержимого исходного файла, ширина и формат.
+    """
+    if width not in settings.THUMBNAIL_WIDTHS:
+        raise Http404('Недопустимая ширина превью.')
+    image_format = accepted_format(request.headers.get('Accept', ''))
+    try:
+        thumbnail_path, digest = get_thumbnail(path, width, image_format)
+    except ThumbnailError:
+        raise Http404('Изображение не найдено.')
+
+    @condition(etag_func=lambda request: (
+        f'{digest}-{width}-{image_format.lower()}'))
+    def serve(request):
+        content_type, _ = mimetypes.guess_type(thumbnail_path)
+        return FileResponse(
+            open(thumbnail_path, 'rb'), content_type=content_type)
+
+    response = serve(request)
+    patch_cache_control(
+        response, public=True, max_age=settings.THUMBNAIL_MAX_AGE)
+    patch_vary_headers(response, ['Accept'])
+    return response
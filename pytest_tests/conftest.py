@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
@@ -22,6 +23,19 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура для очистки кэша перед каждым тестом.
+
+    Кэш не откатывается вместе с транзакцией теста, поэтому
+    кэшированные количества и ответы не должны переходить
+    из одного теста в другой.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def category(db):
     """Создание категории для тестов."""
@@ -122,3 +136,17 @@ def cart_item(cart, product, db):
 def other_user_cart(other_user):
     """Создание фикстуры для корзины другого пользователя."""
     return Cart.objects.create(user=other_user)
+
+
+@pytest.fixture
+def products(subcategory, db):
+    """Создание набора продуктов без изображений для тестов списков."""
+    return [
+        Product.objects.create(
+            parent_subcategory=subcategory,
+            name=f'Product {number}',
+            slug=f'product-{number}',
+            price=number
+        )
+        for number in range(1, 31)
+    ]
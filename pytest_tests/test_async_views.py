@@ -0,0 +1,123 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from cart.models import Cart, CartItem
+
+
+def bearer(user):
+    """Заголовок Authorization с JWT пользователя."""
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+def test_async_product_list_matches_sync(client, api_client, products):
+    """
+    Тест для проверки асинхронного списка продуктов.
+
+    Страницы совпадают со списком /api/products/, следующая
+    страница выбирается по ключу after, фильтры применяются.
+    """
+    url = reverse('async-product-list')
+    response = client.get(url, {'page_size': 5, 'price_min': 3})
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    expected = api_client.get(
+        reverse('product-list'), {'page_size': 5, 'price_min': 3}).json()
+    assert data['results'] == expected['results']
+
+    ids = [product['id'] for product in data['results']]
+    response = client.get(data['next'])
+    next_ids = [product['id'] for product in response.json()['results']]
+    assert len(next_ids) == 5
+    assert min(next_ids) > max(ids)
+
+    response = client.get(url, {'after': 'x'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_async_product_detail(client, product):
+    """
+    Тест для проверки получения продукта и ответа 404.
+    """
+    response = client.get(
+        reverse('async-product-detail', args=[product.pk]))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['name'] == product.name
+
+    response = client.get(reverse('async-product-detail', args=[0]))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_cart_requires_authentication(client):
+    """
+    Тест для проверки ответа 401 без учетных данных.
+    """
+    response = client.get(reverse('async-cart-detail'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get(
+        reverse('async-cart-detail'), HTTP_AUTHORIZATION='Bearer invalid')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_async_cart_detail_deleted_user(client, user):
+    """
+    Тест для проверки ответа 401 на JWT удаленного пользователя.
+    """
+    authorization = bearer(user)
+    user.delete()
+    response = client.get(
+        reverse('async-cart-detail'), HTTP_AUTHORIZATION=authorization)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_async_cart_detail(client, user, cart_item):
+    """
+    Тест для проверки получения корзины по JWT и по токену.
+    """
+    for authorization in (bearer(user), f'Token {user.auth_token.key}'):
+        response = client.get(
+            reverse('async-cart-detail'), HTTP_AUTHORIZATION=authorization)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['user'] == user.username
+        assert len(data['items']) == 1
+        assert data['total_items_cart'] == 2
+
+
+def test_async_cart_add_and_remove(client, user, product):
+    """
+    Тест для проверки добавления и удаления продукта.
+
+    Пустая корзина читается без записи в БД, корзина создается
+    при первом добавлении, повторное добавление увеличивает
+    количество.
+    """
+    headers = {'HTTP_AUTHORIZATION': bearer(user)}
+    response = client.get(reverse('async-cart-detail'), **headers)
+    assert response.json()['items'] == []
+    assert not Cart.objects.filter(user=user).exists()
+
+    url = reverse('async-cart-add')
+    data = {'product_id': product.pk, 'quantity': 2}
+    response = client.post(
+        url, data, content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    response = client.post(url, data, **headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['quantity'] == 4
+
+    response = client.post(
+        url, {'product_id': product.pk, 'quantity': CartItem.MAX_QUANTITY},
+        content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = client.post(
+        url, {'product_id': 0, 'quantity': 1},
+        content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    item = CartItem.objects.get(cart__user=user)
+    url = reverse('async-cart-remove', args=[item.pk])
+    response = client.delete(url, **headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.delete(url, **headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,33 @@
+import json
+from io import StringIO
+
+from products.management.commands.run_benchmarks import SCENARIOS, Command
+
+
+def test_run_benchmarks_scenarios(settings):
+    """
+    Тест для проверки сценариев бенчмарка на небольшом каталоге.
+
+    Все сценарии выполняются без ошибок, в результатах есть запросы
+    в секунду, перцентили и число запросов к БД, результаты
+    сериализуются в JSON.
+    """
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    }
+    command = Command(stdout=StringIO())
+    options = vars(command.create_parser('manage.py', 'run_benchmarks')
+                   .parse_args(['--products', '30', '--users', '2',
+                                '--requests', '3', '--warmup', '1']))
+    results = command.run(options)
+
+    assert results['meta']['products'] == 30
+    assert set(results['scenarios']) == set(SCENARIOS)
+    for result in results['scenarios'].values():
+        assert result['errors'] == 0
+        assert result['requests'] == 3
+        assert result['ops_per_sec'] > 0
+        assert result['latency_ms']['count'] == 3
+        assert result['queries_per_request'] > 0
+    json.dumps(results)
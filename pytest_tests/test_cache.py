@@ -0,0 +1,87 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+
+from products.cache import get_cache_stats, record_cache_hit
+from products.models import Product
+
+
+@pytest.mark.parametrize('url_name', [
+    'category-list', 'subcategory-list', 'product-list'])
+def test_catalog_list_is_cached(api_client, product, url_name,
+                                django_assert_num_queries):
+    """
+    Тест для проверки кэширования ответов списков каталога.
+
+    Повторный запрос возвращается из кэша без запросов к БД.
+    """
+    url = reverse(url_name)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['X-Cache'] == 'MISS'
+
+    with django_assert_num_queries(0):
+        cached_response = api_client.get(url)
+    assert cached_response['X-Cache'] == 'HIT'
+    assert cached_response.data == response.data
+
+    stats = get_cache_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_catalog_cache_invalidated_on_save_and_delete(api_client, product):
+    """
+    Тест для проверки сброса кэша при изменении и удалении продукта.
+    """
+    url = reverse('product-detail', kwargs={'pk': product.pk})
+    api_client.get(url)
+
+    product.name = 'Renamed Product'
+    product.save()
+    response = api_client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['name'] == 'Renamed Product'
+
+    list_url = reverse('product-list')
+    api_client.get(list_url)
+    Product.objects.filter(pk=product.pk).get().delete()
+    response = api_client.get(list_url)
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['count'] == 0
+
+
+def test_catalog_cache_key_depends_on_query_params(api_client, products):
+    """
+    Тест для проверки, что разные параметры запроса кэшируются отдельно.
+    """
+    url = reverse('product-list')
+    first_page = api_client.get(url, {'page': 1})
+    second_page = api_client.get(url, {'page': 2})
+    assert second_page['X-Cache'] == 'MISS'
+    assert first_page.data['results'] != second_page.data['results']
+
+
+def test_catalog_cache_stats_requires_shared_cache(settings, tmp_path):
+    """
+    Тест для проверки команды catalog_cache_stats.
+
+    С кэшем в памяти процесса команда завершается ошибкой, так как
+    не видит счетчики сервера; с общим кэшем выводит статистику.
+    """
+    with pytest.raises(CommandError, match='/metrics/'):
+        call_command('catalog_cache_stats', stdout=StringIO())
+
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    record_cache_hit()
+    output = StringIO()
+    call_command('catalog_cache_stats', stdout=output)
+    assert 'Попадания: 1' in output.getvalue()
@@ -1,7 +1,16 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIClient
 
-from cart.models import CartItem
+from cart.models import Cart, CartItem, CartItemQuerySet, CartQuerySet
+from products.models import Product
 
 
 def test_get_cart(authenticated_client, cart_item):
@@ -106,3 +115,283 @@ def test_get_cart_unauthenticated(api_client):
 
     assert response.status_code == status.HTTP_401_UNAUTHORIZED, (
         'Неаутентифицированный пользователь должен получить 401 статус')
+
+
+def test_get_cart_query_count(authenticated_client, cart, subcategory,
+                              django_assert_num_queries):
+    """Тест для проверки числа запросов к БД при получении корзины.
+
+    Дата изменения корзины (для ETag), корзина с итогами и элементы
+    корзины с продуктами загружаются тремя запросами независимо
+    от количества элементов. Названия подкатегории и категории
+    читаются из продукта без JOIN их таблиц.
+    """
+    for number in range(1, 21):
+        product = Product.objects.create(
+            parent_subcategory=subcategory,
+            name=f'Product {number}',
+            slug=f'product-{number}',
+            price=number
+        )
+        CartItem.objects.create(cart=cart, product=product, quantity=2)
+
+    url = reverse('cart-detail')
+    with django_assert_num_queries(3) as context:
+        response = authenticated_client.get(url)
+
+    items_sql = context.captured_queries[-1]['sql']
+    assert 'products_subcategory' not in items_sql
+    assert 'products_category"' not in items_sql
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['items']) == 20
+    assert response.data['items'][0]['product']['subcategory'] == (
+        subcategory.name)
+    assert response.data['total_items_cart'] == 40, (
+        'Общее количество товаров в корзине не совпадает')
+    assert float(response.data['total_price_cart']) == 420.00, (
+        'Общая стоимость корзины не совпадает')
+
+
+def test_get_cart_without_cart_is_read_only(authenticated_client, user,
+                                            product,
+                                            django_assert_num_queries):
+    """Тест для получения корзины, которой еще нет в БД.
+
+    GET возвращает пустую корзину одним запросом на чтение и не
+    создает строку корзины; она создается при первом изменении.
+    """
+    url = reverse('cart-detail')
+    with django_assert_num_queries(1) as context:
+        response = authenticated_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['id'] is None
+    assert response.data['user'] == user.username
+    assert response.data['items'] == []
+    assert response.data['total_items_cart'] == 0
+    assert float(response.data['total_price_cart']) == 0
+    assert context.captured_queries[0]['sql'].startswith('SELECT')
+    assert not Cart.objects.filter(user=user).exists()
+
+    response = authenticated_client.post(
+        reverse('cart-add'), {'product_id': product.pk, 'quantity': 1})
+    assert response.status_code == status.HTTP_201_CREATED
+    response = authenticated_client.get(url)
+    assert response.data['id'] == Cart.objects.get(user=user).pk
+    assert len(response.data['items']) == 1
+
+
+def test_add_to_cart_increments_existing_item(authenticated_client,
+                                              cart_item):
+    """Тест для повторного добавления товара в корзину.
+
+    Этот тест проверяет, что повторное добавление увеличивает
+    количество в существующем элементе (статус 200), а превышение
+    максимального количества возвращает 400 без изменения корзины.
+    """
+    url = reverse('cart-add')
+    data = {'product_id': cart_item.product_id, 'quantity': 3}
+    response = authenticated_client.post(url, data)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['quantity'] == 5
+    assert CartItem.objects.filter(cart=cart_item.cart).count() == 1
+
+    data['quantity'] = CartItem.MAX_QUANTITY
+    response = authenticated_client.post(url, data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    cart_item.refresh_from_db()
+    assert cart_item.quantity == 5
+
+
+def test_add_to_cart_query_count(authenticated_client, cart_item):
+    """Тест для числа запросов при добавлении товара в корзину.
+
+    Добавление выполняет чтение продукта и две записи в одной
+    транзакции: корзина и элемент корзины записываются запросами
+    INSERT ... ON CONFLICT, элемент не читается повторно.
+    Дата изменения корзины обновляется.
+    """
+    stale = cart_item.cart.updated_at - timedelta(days=1)
+    Cart.objects.filter(pk=cart_item.cart_id).update(updated_at=stale)
+    url = reverse('cart-add')
+    data = {'product_id': cart_item.product_id, 'quantity': 3}
+
+    with CaptureQueriesContext(connection) as context:
+        response = authenticated_client.post(url, data)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['id'] == cart_item.pk
+    assert response.data['quantity'] == 5
+    # Тест выполняется в транзакции, поэтому вместо BEGIN/COMMIT
+    # вложенный atomic создает точку сохранения.
+    statements = [
+        query['sql'] for query in context.captured_queries
+        if 'SAVEPOINT' not in query['sql']
+    ]
+    assert len(statements) == 3, statements
+    assert Cart.objects.get(pk=cart_item.cart_id).updated_at > stale
+
+    response = authenticated_client.post(url, {'product_id': 0})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert Cart.objects.count() == 1
+
+
+def test_rejected_add_to_cart_keeps_cart_etag(authenticated_client,
+                                              cart_item):
+    """Тест для отклоненного добавления товара в корзину.
+
+    Добавление сверх максимального количества возвращает 400
+    и не меняет дату изменения корзины, поэтому ETag корзины
+    остается прежним.
+    """
+    stale = cart_item.cart.updated_at - timedelta(days=1)
+    Cart.objects.filter(pk=cart_item.cart_id).update(updated_at=stale)
+    etag = authenticated_client.get(reverse('cart-detail'))['ETag']
+
+    response = authenticated_client.post(reverse('cart-add'), {
+        'product_id': cart_item.product_id,
+        'quantity': CartItem.MAX_QUANTITY,
+    })
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Cart.objects.get(pk=cart_item.cart_id).updated_at == stale
+    response = authenticated_client.get(
+        reverse('cart-detail'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_add_to_cart_concurrent(user, product):
+    """Тест для параллельного добавления товара в корзину.
+
+    Несколько потоков одновременно добавляют один и тот же товар.
+    Итоговое количество должно равняться сумме всех добавлений,
+    а элемент корзины должен быть один.
+    """
+    url = reverse('cart-add')
+    workers, adds_per_worker = 4, 5
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def add_to_cart():
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            for _ in range(adds_per_worker):
+                response = client.post(
+                    url, {'product_id': product.id, 'quantity': 1})
+                if response.status_code not in (
+                        status.HTTP_200_OK, status.HTTP_201_CREATED):
+                    errors.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=add_to_cart) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, f'Ошибки при параллельном добавлении: {errors}'
+    items = CartItem.objects.filter(cart__user=user, product=product)
+    assert items.count() == 1, 'Создано несколько элементов корзины'
+    assert items.get().quantity == workers * adds_per_worker, (
+        'Часть параллельных добавлений потеряна')
+
+
+def test_batch_cart_operations(authenticated_client, cart_item, subcategory):
+    """Тест для пакетного изменения корзины.
+
+    Этот тест отправляет POST-запрос с операциями add/set/remove
+    и проверяет, что в ответе возвращается обновленная корзина.
+    """
+    first, second = (
+        Product.objects.create(
+            parent_subcategory=subcategory,
+            name=f'Batch Product {number}',
+            slug=f'batch-product-{number}',
+            price=number
+        )
+        for number in (1, 2)
+    )
+    url = reverse('cart-batch')
+    data = {'operations': [
+        {'op': 'add', 'product_id': first.id, 'quantity': 2},
+        {'op': 'add', 'product_id': first.id, 'quantity': 3},
+        {'op': 'set', 'product_id': second.id, 'quantity': 4},
+        {'op': 'remove', 'product_id': cart_item.product_id},
+    ]}
+    response = authenticated_client.post(url, data, format='json')
+
+    assert response.status_code == status.HTTP_200_OK, response.data
+    quantities = {
+        item['product']['id']: item['quantity']
+        for item in response.data['items']
+    }
+    assert quantities == {first.id: 5, second.id: 4}
+    assert response.data['total_items_cart'] == 9
+    assert float(response.data['total_price_cart']) == 13.00
+
+
+def test_batch_cart_is_atomic(authenticated_client, cart_item):
+    """Тест для атомарности пакетного изменения корзины.
+
+    Если одна из операций нарушает ограничение количества
+    или ссылается на несуществующий продукт, корзина не меняется.
+    """
+    url = reverse('cart-batch')
+    data = {'operations': [
+        {'op': 'set', 'product_id': cart_item.product_id, 'quantity': 10},
+        {'op': 'add', 'product_id': cart_item.product_id,
+         'quantity': CartItem.MAX_QUANTITY},
+    ]}
+    response = authenticated_client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    data = {'operations': [
+        {'op': 'set', 'product_id': cart_item.product_id, 'quantity': 10},
+        {'op': 'add', 'product_id': 0, 'quantity': 1},
+    ]}
+    response = authenticated_client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    cart_item.refresh_from_db()
+    assert cart_item.quantity == 2
+
+
+def test_batch_cart_retries_concurrent_insert(cart, cart_item, product):
+    """Тест для повторного применения операций при конфликте вставки.
+
+    Если параллельный запрос вставил тот же элемент корзины между
+    чтением и bulk_create (IntegrityError), операции применяются
+    заново. Удаление элементов не обновляет дату корзины сигналом
+    на каждый элемент: корзина обновляется один раз в конце.
+    """
+    bulk_create = CartItemQuerySet.bulk_create
+    calls = []
+
+    def conflicting_bulk_create(queryset, objs, *args, **kwargs):
+        calls.append(len(objs))
+        if len(calls) == 1:
+            raise IntegrityError('UNIQUE constraint failed')
+        return bulk_create(queryset, objs, *args, **kwargs)
+
+    other = Product.objects.create(
+        parent_subcategory=product.parent_subcategory,
+        name='Other Product', price=1)
+
+    with mock.patch.object(
+            CartItemQuerySet, 'bulk_create', conflicting_bulk_create), \
+            mock.patch.object(CartQuerySet, 'touch', autospec=True,
+                              side_effect=CartQuerySet.touch) as touch:
+        CartItem.objects.apply_operations(cart, [
+            {'op': 'add', 'product_id': other.pk, 'quantity': 2},
+            {'op': 'remove', 'product_id': product.pk},
+        ])
+
+    assert calls == [1, 1]
+    assert touch.call_count == 1
+    assert dict(cart.items.values_list('product_id', 'quantity')) == {
+        other.pk: 2}
@@ -0,0 +1,60 @@
+from django.urls import reverse
+from rest_framework import status
+
+from cart.models import CartItem
+
+
+def test_product_list_etag(api_client, product):
+    """
+    Тест для проверки условного запроса списка продуктов по ETag.
+
+    Повторный запрос с If-None-Match возвращает 304, а после изменения
+    продукта - новый ответ с другим ETag.
+    """
+    url = reverse('product-list')
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+    assert response.has_header('Last-Modified')
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+    product.price = 99
+    product.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+def test_category_detail_last_modified(api_client, category):
+    """
+    Тест для проверки условного запроса категории по If-Modified-Since.
+    """
+    url = reverse('category-detail', kwargs={'pk': category.pk})
+    response = api_client.get(url)
+    last_modified = response['Last-Modified']
+
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_cart_etag(authenticated_client, cart_item, product):
+    """
+    Тест для проверки условного запроса корзины по ETag.
+
+    ETag корзины меняется после изменения или удаления её элемента.
+    """
+    url = reverse('cart-detail')
+    response = authenticated_client.get(url)
+    etag = response['ETag']
+
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    CartItem.objects.get(pk=cart_item.pk).delete()
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['items'] == []
+    assert response['ETag'] != etag
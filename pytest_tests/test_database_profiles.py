@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest
+from django.db import connection
+
+from myshop.benchmarking import database_profile
+from products.management.commands.stress_database import Command
+
+
+def pragma(name):
+    """Значение PRAGMA name для текущего соединения."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def restore_journal_mode():
+    """
+    Фикстура, возвращающая тестовой базе журнал по умолчанию:
+    режим WAL сохраняется в файле базы и после закрытия соединения.
+    """
+    yield
+    with database_profile('default'):
+        pragma('journal_mode=DELETE')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_production_profile_pragmas(restore_journal_mode):
+    """
+    Тест для проверки настроек соединения в профиле production.
+    """
+    with database_profile('production'):
+        assert pragma('journal_mode') == 'wal'
+        assert pragma('synchronous') == 1
+        assert pragma('busy_timeout') == 20000
+        assert connection.transaction_mode == 'IMMEDIATE'
+        assert connection.settings_dict['CONN_MAX_AGE'] > 0
+    assert connection.settings_dict['CONN_MAX_AGE'] == 0
+    assert pragma('busy_timeout') == 5000
+    assert connection.transaction_mode is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stress_database_production_profile(restore_journal_mode):
+    """
+    Тест для проверки конкурентного чтения и записи корзин.
+
+    В профиле production запись не получает ошибок блокировки.
+    """
+    command = Command(stdout=StringIO())
+    options = vars(command.create_parser('manage.py', 'stress_database')
+                   .parse_args(['--readers', '2', '--writers', '2',
+                                '--duration', '0.5', '--products', '10',
+                                '--users', '3']))
+    with database_profile('production'):
+        results = command.run(options)
+
+    reads, read_errors, _ = results['Чтение']
+    writes, write_errors, _ = results['Запись']
+    assert reads and writes
+    assert read_errors == write_errors == 0
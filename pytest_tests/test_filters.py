@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+# Полный проход по таблице без индекса: "SCAN products_product"
+# без "USING INDEX"/"USING COVERING INDEX". Обход по индексу
+# первичного ключа (сортировка по id с LIMIT) допускается.
+FULL_SCAN_RE = re.compile(r'^SCAN \S+$')
+
+FILTERS = [
+    {'category': 'test-category'},
+    {'subcategory': 'test-subcategory'},
+    {'price_min': 5},
+    {'price_max': 20},
+    {'price_min': 5, 'price_max': 20},
+    {'category': 'test-category', 'price_min': 5},
+    {'subcategory': 'test-subcategory', 'price_max': 20},
+]
+
+
+def test_product_filters(api_client, products):
+    """
+    Тест для проверки фильтрации и сортировки списка продуктов.
+    """
+    url = reverse('product-list')
+    response = api_client.get(
+        url, {'subcategory': 'test-subcategory', 'price_min': 5,
+              'price_max': 7, 'ordering': '-price'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [float(item['price']) for item in response.data['results']] == [
+        7, 6, 5]
+
+    response = api_client.get(url, {'category': 'missing'})
+    assert response.data['count'] == 0
+
+    response = api_client.get(url, {'ordering': 'name', 'page_size': 3})
+    assert [item['name'] for item in response.data['results']] == [
+        'Product 1', 'Product 10', 'Product 11']
+
+
+@pytest.mark.parametrize('ordering', [None, 'price', '-name'])
+@pytest.mark.parametrize('params', FILTERS)
+def test_product_filters_use_indexes(api_client, products, params, ordering):
+    """
+    Тест для проверки планов запросов фильтрации продуктов.
+
+    Для каждого запроса к БД (COUNT и выборка страницы) выполняется
+    EXPLAIN QUERY PLAN, ни одна таблица не должна читаться
+    полным проходом без индекса.
+    """
+    if connection.vendor != 'sqlite':
+        pytest.skip('План запроса проверяется только для SQLite')
+    if ordering:
+        params = {**params, 'ordering': ordering}
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(reverse('product-list'), params)
+    assert response.status_code == status.HTTP_200_OK
+
+    for query in context.captured_queries:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        scans = [line for line in plan if FULL_SCAN_RE.match(line)]
+        assert not scans, (
+            f'Полный проход по таблице для {params}: {scans}\n'
+            f'{query["sql"]}')
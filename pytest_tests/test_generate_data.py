@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from cart.models import CartItem
+from products.models import Product
+from products.synthetic import ZipfSampler, popular_product
+
+
+def generated_data():
+    """Продукты и позиции корзин в виде, не зависящем от первичных ключей."""
+    products = list(Product.objects.order_by('slug').values_list(
+        'slug', 'name', 'price', 'subcategory_name'))
+    items = sorted(CartItem.objects.values_list(
+        'cart__user__username', 'product__slug', 'quantity'))
+    return products, items
+
+
+def test_zipf_sampler_is_skewed():
+    """
+    Тест для проверки распределения Ципфа и перестановки рангов.
+
+    Первый ранг выпадает примерно вдвое чаще второго, перестановка
+    рангов популярности взаимно однозначна.
+    """
+    sampler = ZipfSampler(1000, 1.0, random.Random(0))
+    counts = Counter(sampler.sample() for _ in range(20000))
+
+    assert set(counts) <= set(range(1, 1001))
+    assert 1.6 < counts[1] / counts[2] < 2.4
+    assert counts[1] > counts[100] * 20
+    assert sorted(popular_product(rank, 12) for rank in range(1, 13)) == (
+        list(range(12)))
+
+
+def test_generate_data_is_deterministic():
+    """
+    Тест для проверки генерации синтетических данных.
+
+    При одном seed данные совпадают, повторный запуск обновляет
+    те же записи, а не создает новые.
+    """
+    args = ['--products', '40', '--users', '6', '--cart-items', '3',
+            '--categories', '2', '--subcategories', '3',
+            '--batch-size', '7', '--seed', '5']
+    call_command('generate_data', *args, stdout=StringIO())
+    first = generated_data()
+    call_command('generate_data', *args, stdout=StringIO())
+
+    assert generated_data() == first
+    products, items = first
+    assert len(products) == 40
+    assert items
+    assert len({product for _, product, _ in items}) < len(items)
+    assert Product.objects.filter(price__lte=0).count() == 0
+
+
+@pytest.mark.parametrize(
+    'option', ['--categories', '--subcategories', '--batch-size'])
+def test_generate_data_rejects_non_positive_options(option):
+    """
+    Тест для проверки ошибки команды при количестве категорий,
+    подкатегорий или размере пакета меньше единицы.
+    """
+    with pytest.raises(CommandError, match=option):
+        call_command('generate_data', '--products', '5', option, '0',
+                     stdout=StringIO())
+    assert not Product.objects.exists()
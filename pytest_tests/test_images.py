@@ -0,0 +1,81 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from products.images import build_product_images
+from products.models import Product
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Временный каталог для загружаемых и производных изображений."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def make_source(width=1600, height=1200, orientation=None):
+    """Создание исходного JPEG-изображения с EXIF."""
+    image = Image.new('RGB', (width, height), 'red')
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'
+    if orientation:
+        exif[0x0112] = orientation
+    output = BytesIO()
+    image.save(output, 'JPEG', exif=exif)
+    return SimpleUploadedFile(
+        'source.jpg', output.getvalue(), content_type='image/jpeg')
+
+
+def test_build_product_images(media_root, subcategory, settings):
+    """
+    Тест для проверки построения трех размеров изображения продукта.
+
+    Изображения уменьшаются с сохранением пропорций, ориентация
+    из EXIF применяется, метаданные удаляются, при
+    PRODUCT_IMAGE_FORMAT=WEBP изображения сохраняются в WebP.
+    """
+    settings.PRODUCT_IMAGE_FORMAT = 'WEBP'
+    product = Product.objects.create(
+        parent_subcategory=subcategory, name='Photo', price=1,
+        image_source=make_source(orientation=6))
+    build_product_images(product)
+
+    expected = {'image_small': 200, 'image_medium': 600, 'image_large': 1200}
+    for field, height in expected.items():
+        with Image.open(getattr(product, field).path) as image:
+            assert image.format == 'WEBP'
+            # Ориентация 6 - поворот на 90 градусов.
+            assert image.size == (height * 3 // 4, height)
+            assert not image.getexif()
+
+
+def test_build_product_images_command(media_root, subcategory):
+    """
+    Тест для проверки команды build_product_images.
+
+    Общий исходный файл обрабатывается один раз, продукт без
+    image_source использует image_large как исходный, по умолчанию
+    изображения сохраняются в JPEG.
+    """
+    source = make_source()
+    shared = Product.objects.create(
+        parent_subcategory=subcategory, name='Shared', price=1,
+        image_large=source)
+    copy = Product.objects.create(
+        parent_subcategory=subcategory, name='Copy', price=1,
+        image_large=shared.image_large.name)
+
+    call_command('build_product_images', workers=2)
+
+    shared.refresh_from_db()
+    copy.refresh_from_db()
+    assert shared.image_source.name == copy.image_source.name == (
+        'products/large/source.jpg')
+    assert shared.image_small.name == copy.image_small.name
+    assert shared.image_small.name.endswith('.jpg')
+    with Image.open(shared.image_large.path) as image:
+        assert image.format == 'JPEG'
+        assert image.size == (1200, 900)
@@ -0,0 +1,69 @@
+from django.urls import reverse
+from rest_framework import status
+
+
+def obtain_tokens(api_client):
+    response = api_client.post(reverse('jwt-create'), {
+        'email': 'testuser@mail.ru', 'password': 'testpassword'})
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def test_cart_with_jwt_does_not_query_user(api_client, user, cart_item,
+                                           django_assert_num_queries):
+    """
+    Тест для проверки аутентификации по JWT без запросов к БД.
+
+    Запрос корзины с access-токеном выполняет те же три запроса,
+    что и с принудительной аутентификацией: пользователь и токен
+    из БД не загружаются.
+    """
+    access = obtain_tokens(api_client)['access']
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    url = reverse('cart-detail')
+    with django_assert_num_queries(3):
+        response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['user'] == user.username
+    assert len(response.data['items']) == 1
+
+
+def test_token_auth_still_supported(api_client, user, cart):
+    """
+    Тест для проверки того, что токены 'Token <key>' продолжают работать.
+    """
+    api_client.credentials(HTTP_AUTHORIZATION=f'Token {user.auth_token.key}')
+    response = api_client.get(reverse('cart-detail'))
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_jwt_refresh_rotation_and_blacklist(api_client, user):
+    """
+    Тест для проверки обновления и отзыва refresh-токенов.
+
+    После обновления старый refresh-токен попадает в черный список,
+    отозванный токен нельзя использовать.
+    """
+    refresh = obtain_tokens(api_client)['refresh']
+    response = api_client.post(reverse('jwt-refresh'), {'refresh': refresh})
+    assert response.status_code == status.HTTP_200_OK
+    rotated = response.data['refresh']
+
+    response = api_client.post(reverse('jwt-refresh'), {'refresh': refresh})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = api_client.post(
+        reverse('jwt-blacklist'), {'refresh': rotated})
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.post(reverse('jwt-refresh'), {'refresh': rotated})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_invalid_jwt_rejected(api_client):
+    """
+    Тест для проверки отказа при некорректном access-токене.
+    """
+    api_client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+    response = api_client.get(reverse('cart-detail'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,262 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+
+from cart.models import Cart, CartItem
+from products.bulk import bulk_upsert, iter_json_array
+from products.models import Category, Product, Subcategory
+from products.search import index_products, search_product_ids
+
+User = get_user_model()
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def test_iter_json_array_reads_in_small_chunks(tmp_path):
+    """
+    Тест для проверки потокового чтения JSON-массива.
+
+    Элементы, разрезанные границей куска, должны читаться целиком.
+    """
+    data = [{'name': f'Продукт {number}', 'price': f'{number}.50'}
+            for number in range(50)]
+    path = write_json(tmp_path / 'products.json', data)
+
+    assert list(iter_json_array(path, chunk_size=7)) == data
+
+
+def test_load_database_bulk(tmp_path, category, subcategory):
+    """
+    Тест для проверки пакетной загрузки каталога.
+
+    Существующие записи обновляются по slug, новые создаются,
+    повторная загрузка не создает дубликатов.
+    """
+    write_json(tmp_path / 'users.json', [])
+    write_json(tmp_path / 'categories.json', [
+        {'name': 'Renamed Category', 'slug': category.slug},
+    ])
+    write_json(tmp_path / 'subcategories.json', [])
+    write_json(tmp_path / 'products.json', [
+        {'name': f'Product {number}', 'slug': f'product-{number}',
+         'parent_subcategory': subcategory.pk, 'price': f'{number}.00'}
+        for number in range(1, 6)
+    ] + [
+        {'name': 'Orphan', 'slug': 'orphan', 'parent_subcategory': 0,
+         'price': '1.00'},
+    ])
+
+    for _ in range(2):
+        call_command('load_database', '--bulk', '--batch-size', '2',
+                     '--data-dir', str(tmp_path), stdout=StringIO())
+
+    assert Category.objects.get(pk=category.pk).name == 'Renamed Category'
+    products = Product.objects.order_by('id')
+    assert [product.slug for product in products] == [
+        f'product-{number}' for number in range(1, 6)]
+    assert all(product.parent_subcategory_id == subcategory.pk
+               for product in products)
+
+
+def test_load_database_bulk_users(tmp_path, user):
+    """
+    Тест для проверки пакетной загрузки пользователей.
+
+    Пароли хэшируются в пуле процессов, готовые хэши сохраняются
+    как есть, существующие пользователи не изменяются.
+    """
+    password_hash = make_password('prehashed')
+    write_json(tmp_path / 'users.json', [
+        {'username': 'plain', 'email': 'plain@mail.ru',
+         'password': 'plainpassword'},
+        {'username': 'hashed', 'email': 'hashed@mail.ru',
+         'password_hash': password_hash},
+        {'username': user.username, 'email': user.email,
+         'password': 'changed'},
+    ])
+    for name in ('categories', 'subcategories', 'products'):
+        write_json(tmp_path / f'{name}.json', [])
+
+    call_command('load_database', '--bulk', '--workers', '2',
+                 '--data-dir', str(tmp_path), stdout=StringIO())
+
+    assert User.objects.get(username='plain').check_password('plainpassword')
+    assert User.objects.get(username='hashed').password == password_hash
+    user.refresh_from_db()
+    assert user.check_password('testpassword')
+
+
+def test_load_database_delta(tmp_path, subcategory):
+    """
+    Тест для проверки загрузки изменений каталога (--delta).
+
+    Записываются только новые и измененные продукты, продукты,
+    отсутствующие в фиде, удаляются, неизмененные не трогаются.
+    """
+    for name in ('users', 'categories', 'subcategories'):
+        write_json(tmp_path / f'{name}.json', [])
+    products = [
+        {'name': f'Product {number}', 'slug': f'product-{number}',
+         'parent_subcategory': subcategory.pk, 'price': f'{number}.00'}
+        for number in range(1, 5)
+    ]
+    write_json(tmp_path / 'products.json', products)
+    call_command('load_database', '--bulk', '--data-dir', str(tmp_path),
+                 stdout=StringIO())
+    unchanged = Product.objects.get(slug='product-1')
+    manual = Product.objects.create(
+        parent_subcategory=subcategory, name='Manual', slug='manual',
+        price=1)
+
+    products[1]['price'] = '99.00'
+    del products[2]
+    products.append({'name': 'Product 5', 'slug': 'product-5',
+                     'parent_subcategory': subcategory.pk, 'price': '5.00'})
+    write_json(tmp_path / 'products.json', products)
+    output = StringIO()
+    call_command('load_database', '--delta', '--data-dir', str(tmp_path),
+                 stdout=output)
+
+    assert ('новых: 1, изменено: 1, удалено: 1, без изменений: 2'
+            in output.getvalue())
+    assert set(Product.objects.values_list('slug', flat=True)) == {
+        'product-1', 'product-2', 'product-4', 'product-5', manual.slug}
+    assert Product.objects.get(slug='product-2').price == 99
+    assert Product.objects.get(
+        slug='product-1').updated_at == unchanged.updated_at
+
+
+def test_bulk_upsert_respects_slug_owner(product, category, caplog):
+    """
+    Тест для проверки записи по слагу, занятому записью другой модели.
+
+    Категория со слагом продукта не записывается и не меняет базовую
+    запись продукта, повторяющийся слаг пакета записывается один раз.
+    """
+    written = bulk_upsert(Category, [
+        Category(name='Захват', slug=product.slug),
+        Category(name='Первая', slug='new-category'),
+        Category(name='Вторая', slug='new-category'),
+        Category(name='Обновленная', slug=category.slug),
+    ], [])
+
+    assert [obj.slug for obj in written] == ['new-category', category.slug]
+    assert 'занят записью другого типа' in caplog.text
+    product.refresh_from_db()
+    assert product.name == 'Test Product'
+    assert not Category.objects.filter(pk=product.pk).exists()
+    assert Category.objects.get(slug='new-category').name == 'Вторая'
+    assert Category.objects.get(pk=category.pk).name == 'Обновленная'
+
+
+def test_bulk_upsert_without_update_fields_is_repeatable(subcategory):
+    """
+    Тест для проверки повторной записи без полей для обновления.
+
+    Строки собственной таблицы модели уже существуют: конфликт
+    по первичному ключу не должен приводить к IntegrityError.
+    """
+    def products():
+        products = [
+            Product(name=f'Продукт {number}', slug=f'product-{number}',
+                    parent_subcategory=subcategory, price=number)
+            for number in range(1, 4)
+        ]
+        for product in products:
+            product.fill_taxonomy(subcategory)
+        return products
+
+    first = [obj.pk for obj in bulk_upsert(Product, products(), [])]
+    second = [obj.pk for obj in bulk_upsert(Product, products(), [])]
+
+    assert first == second
+    assert Product.objects.count() == 3
+
+
+def test_load_database_delta_keeps_rejected_and_cascades_once(
+        tmp_path, category, subcategory, cart_item):
+    """
+    Тест для проверки удаления в режиме --delta.
+
+    Запись фида, отклоненная из-за отсутствующего родителя, не удаляет
+    существующую строку. Удаление подкатегории удаляет ее продукты
+    каскадом без сигналов на каждую строку: продукты удаляются
+    из поискового индекса, корзины с ними обновляются один раз.
+    """
+    write_json(tmp_path / 'users.json', [])
+    write_json(tmp_path / 'categories.json', [])
+    write_json(tmp_path / 'subcategories.json', [
+        {'name': 'Feed Subcategory', 'slug': 'feed-subcategory',
+         'parent_category': category.pk},
+    ])
+    write_json(tmp_path / 'products.json', [
+        {'name': 'Feed Apple', 'slug': 'feed-apple',
+         'parent_subcategory': subcategory.pk, 'price': '1.00'},
+    ])
+    call_command('load_database', '--bulk', '--data-dir', str(tmp_path),
+                 stdout=StringIO())
+    feed_subcategory = Subcategory.objects.get(slug='feed-subcategory')
+    doomed = Product.objects.create(
+        parent_subcategory=feed_subcategory, name='Doomed Pear', price=1)
+    cart_item.product = doomed
+    cart_item.save()
+    touched_at = Cart.objects.get(pk=cart_item.cart_id).updated_at
+
+    write_json(tmp_path / 'subcategories.json', [])
+    write_json(tmp_path / 'products.json', [
+        {'name': 'Feed Apple', 'slug': 'feed-apple',
+         'parent_subcategory': 0, 'price': '1.00'},
+    ])
+    with mock.patch('products.signals.bump_catalog_version') as bump, \
+            mock.patch('products.signals.remove_products') as remove:
+        call_command('load_database', '--delta', '--data-dir',
+                     str(tmp_path), stdout=StringIO())
+
+    assert Product.objects.filter(slug='feed-apple').exists()
+    assert not Subcategory.objects.filter(pk=feed_subcategory.pk).exists()
+    assert not Product.objects.filter(pk=doomed.pk).exists()
+    assert not CartItem.objects.filter(pk=cart_item.pk).exists()
+    assert Cart.objects.get(pk=cart_item.cart_id).updated_at > touched_at
+    assert search_product_ids('Doomed') == []
+    bump.assert_not_called()
+    remove.assert_not_called()
+
+
+def test_load_database_delta_reindexes_changed_taxonomy_only(
+        tmp_path, category, product):
+    """
+    Тест для проверки поискового индекса после переименования
+    категории в режиме --delta.
+
+    Переиндексируются только продукты измененной категории,
+    остальной каталог не перестраивается.
+    """
+    other_category = Category.objects.create(name='Other', slug='other')
+    other_product = Product.objects.create(
+        parent_subcategory=Subcategory.objects.create(
+            name='Other Subcategory', slug='other-subcategory',
+            parent_category=other_category),
+        name='Other Product', price=1)
+    for name in ('users', 'subcategories', 'products'):
+        write_json(tmp_path / f'{name}.json', [])
+    write_json(tmp_path / 'categories.json', [
+        {'name': 'Renamed Category', 'slug': category.slug},
+    ])
+
+    with mock.patch(
+            'products.management.commands.load_database.index_products',
+            wraps=index_products) as reindex:
+        call_command('load_database', '--delta', '--data-dir',
+                     str(tmp_path), stdout=StringIO())
+
+    reindexed = {pk for call in reindex.call_args_list for pk in call.args[0]}
+    assert reindexed == {product.pk}
+    assert search_product_ids('Renamed') == [product.pk]
+    assert search_product_ids('Other Product') == [other_product.pk]
@@ -0,0 +1,102 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+
+from myshop.metrics import Histogram, request_metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Фикстура для очистки метрик запросов между тестами."""
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+def observed(view, name):
+    """Снимок гистограммы метрики name представления view."""
+    return request_metrics.histograms[view][name].snapshot()
+
+
+def test_histogram_quantiles():
+    """
+    Тест для проверки оценки перцентилей по корзинам гистограммы.
+    """
+    histogram = Histogram((10, 20, 50))
+    for value in range(1, 101):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == ([10, 20, 50, 100], 5050, 100)
+    assert histogram.quantile(0.05) == 5
+    assert histogram.quantile(0.15) == 15
+    assert histogram.quantile(0.99) == 50
+    assert Histogram((1,)).snapshot()[2] == 0
+
+
+def test_metrics_middleware_records_request(client, products):
+    """
+    Тест для проверки метрик запроса и заголовка Server-Timing.
+
+    Метрики записываются по имени представления: количество
+    запросов к БД, время и размер ответа.
+    """
+    response = client.get(reverse('product-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Server-Timing'].startswith('app;dur=')
+    assert 'db;dur=' in response['Server-Timing']
+    _, queries, count = observed('product-list', 'myshop_request_db_queries')
+    assert count == 1
+    assert queries > 0
+    _, size, _ = observed('product-list', 'myshop_response_size_bytes')
+    assert size == len(response.content)
+
+    client.get('/missing/')
+    assert '<unresolved>' in request_metrics.histograms
+
+
+def test_metrics_middleware_async(products):
+    """
+    Тест для проверки метрик асинхронного представления под ASGI.
+    """
+    response = async_to_sync(AsyncClient().get)(
+        reverse('async-product-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'Server-Timing' in response
+    _, queries, count = observed(
+        'async-product-list', 'myshop_request_db_queries')
+    assert count == 1
+    assert queries > 0
+
+
+def test_metrics_endpoint(api_client, user, products):
+    """
+    Тест для проверки эндпоинта метрик.
+
+    Эндпоинт доступен только администраторам и отдает гистограммы
+    и перцентили в текстовом формате Prometheus.
+    """
+    url = reverse('metrics')
+    api_client.get(reverse('product-list'))
+    response = api_client.get(url)
+    assert response.status_code in (
+        status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+    api_client.force_authenticate(user=user)
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    user.is_staff = True
+    user.save()
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain')
+    body = response.content.decode()
+    assert '# TYPE myshop_request_duration_ms histogram' in body
+    assert ('myshop_request_db_queries_count{view="product-list"} 1'
+            in body)
+    assert ('myshop_request_duration_ms_quantile{view="product-list",'
+            'quantile="0.95"}' in body)
+    assert 'myshop_catalog_cache_misses_total 1' in body
@@ -0,0 +1,57 @@
+from django.urls import reverse
+from rest_framework import status
+
+from products.models import Product
+
+
+def test_product_cursor_pagination(api_client, products):
+    """
+    Тест для проверки курсорной пагинации списка продуктов.
+
+    Этот тест проходит весь список продуктов по ссылкам next
+    и проверяет, что каждый продукт получен ровно один раз
+    в порядке возрастания id, а общее количество не считается.
+    """
+    url = reverse('product-list')
+    response = api_client.get(url, {'pagination': 'cursor', 'page_size': 7})
+    assert response.status_code == status.HTTP_200_OK
+    assert 'count' not in response.data, (
+        'В курсорном режиме общее количество не должно считаться')
+
+    received = []
+    while True:
+        received.extend(item['id'] for item in response.data['results'])
+        if not response.data['next']:
+            break
+        response = api_client.get(response.data['next'])
+        assert response.status_code == status.HTTP_200_OK
+
+    assert received == [product.id for product in products], (
+        'Курсорная пагинация вернула не все продукты или нарушила порядок')
+
+
+def test_product_page_count_is_cached(api_client, products,
+                                      django_assert_num_queries):
+    """
+    Тест для проверки кэширования общего количества продуктов.
+
+    Повторный запрос страницы не выполняет COUNT(*), а изменение
+    каталога сбрасывает кэшированное значение.
+    """
+    url = reverse('product-list')
+    response = api_client.get(url, {'page': 2})
+    assert response.data['count'] == len(products)
+
+    with django_assert_num_queries(1):
+        response = api_client.get(url, {'page': 3})
+    assert response.data['count'] == len(products)
+
+    Product.objects.create(
+        parent_subcategory=products[0].parent_subcategory,
+        name='New Product',
+        slug='new-product',
+        price=1
+    )
+    response = api_client.get(url, {'page': 3})
+    assert response.data['count'] == len(products) + 1, (
+        'Кэшированное количество не сброшено после изменения каталога')
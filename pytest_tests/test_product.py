@@ -1,5 +1,16 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+import orjson
+import pytest
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Category, Product, Subcategory
+from products.renderers import FastJSONRenderer
 
 
 def test_product_list_api(api_client, product):
@@ -46,3 +57,156 @@ def test_category_list_api(api_client):
     assert response.status_code == status.HTTP_200_OK, (
         f'Ожидался статус код 200, но получен {response.status_code}'
     )
+
+
+@pytest.mark.parametrize('page_size', [1, 10, 30])
+def test_product_list_query_count(api_client, products, page_size,
+                                  django_assert_num_queries):
+    """
+    Тест для проверки числа запросов к БД при получении списка продуктов.
+
+    Число запросов (COUNT для пагинации и выборка страницы) не должно
+    зависеть от размера страницы.
+    """
+    url = reverse('product-list')
+    with django_assert_num_queries(2):
+        response = api_client.get(url, {'page_size': page_size})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == page_size
+
+
+def test_product_detail_query_count(api_client, product,
+                                    django_assert_num_queries):
+    """
+    Тест для проверки числа запросов к БД при получении одного продукта.
+    """
+    url = reverse('product-detail', kwargs={'pk': product.pk})
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['category'] == (
+        product.parent_subcategory.parent_category.name)
+
+
+def test_subcategory_list_query_count(api_client, category,
+                                      django_assert_num_queries):
+    """
+    Тест для проверки числа запросов к БД при получении списка подкатегорий.
+
+    Категория подкатегории не должна запрашиваться отдельно для каждой
+    записи.
+    """
+    for number in range(20):
+        Subcategory.objects.create(
+            parent_category=category,
+            name=f'Subcategory {number}',
+            slug=f'subcategory-{number}'
+        )
+    url = reverse('subcategory-list')
+    with django_assert_num_queries(2):
+        response = api_client.get(url, {'page_size': 20})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['category'] == category.name
+
+
+def test_product_list_reads_taxonomy_without_joins(
+        api_client, products, django_assert_num_queries):
+    """
+    Тест для проверки чтения названий категории и подкатегории
+    из денормализованных полей продукта.
+
+    Запрос страницы не должен обращаться к таблицам подкатегорий
+    и категорий.
+    """
+    url = reverse('product-list')
+    with django_assert_num_queries(2) as context:
+        response = api_client.get(url)
+
+    page_sql = context.captured_queries[-1]['sql']
+    assert 'products_subcategory' not in page_sql
+    assert 'products_category"' not in page_sql
+    assert response.data['results'][0]['subcategory'] == 'Test Subcategory'
+
+
+def test_product_taxonomy_sync_on_rename(products, subcategory, category):
+    """
+    Тест для проверки обновления денормализованных названий
+    при переименовании категории и подкатегории и переносе
+    подкатегории в другую категорию.
+    """
+    category.name = 'Renamed Category'
+    category.save()
+    subcategory.name = 'Renamed Subcategory'
+    subcategory.save()
+    assert set(Product.objects.values_list(
+        'category_name', 'subcategory_name')) == {
+            ('Renamed Category', 'Renamed Subcategory')}
+
+    other = Category.objects.create(name='Other', slug='other')
+    subcategory.parent_category = other
+    subcategory.save()
+    assert set(Product.objects.values_list(
+        'parent_category', 'category_name')) == {(other.pk, 'Other')}
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'page_size': 7, 'page': 2},
+    {'ordering': '-price', 'price_min': 5},
+    {'pagination': 'cursor', 'ordering': 'name'},
+])
+def test_product_list_fast_path_matches_serializer(api_client, settings,
+                                                   product, products, params):
+    """
+    Тест для проверки того, что быстрый вывод списка продуктов
+    (ProductRowSerializer и FastJSONRenderer) дает тот же ответ,
+    байт в байт, что и ProductSerializer с JSONRenderer.
+    """
+    url = reverse('product-list')
+    settings.PRODUCT_LIST_FAST_PATH = False
+    expected = api_client.get(url, params, HTTP_ACCEPT='application/json')
+    cache.clear()
+    settings.PRODUCT_LIST_FAST_PATH = True
+    response = api_client.get(url, params, HTTP_ACCEPT='application/json')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == expected.content
+    assert response.json()['results'], 'Список продуктов пуст'
+
+
+def test_fast_json_renderer_matches_json_renderer():
+    """
+    Тест для проверки того, что FastJSONRenderer кодирует данные
+    так же, как JSONRenderer.
+    """
+    data = {
+        'text': 'Текст   "кавычки"',
+        'price': Decimal('10.50'),
+        'date': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        'items': [1, 2.5, None, True],
+        1: 'ключ-число',
+    }
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    for indent in (2, 4):
+        media_type = f'application/json; indent={indent}'
+        assert FastJSONRenderer().render(
+            data, media_type) == JSONRenderer().render(data, media_type)
+
+
+def test_fast_json_renderer_uses_orjson():
+    """
+    Тест для проверки того, что FastJSONRenderer кодирует через orjson
+    (orjson указан в requirements.txt), а при запрошенном отступе
+    использует JSONRenderer.
+    """
+    data = {'price': Decimal('10.50')}
+    with mock.patch('products.renderers.orjson.dumps',
+                    wraps=orjson.dumps) as dumps:
+        FastJSONRenderer().render(data)
+        assert dumps.call_count == 1
+        FastJSONRenderer().render(data, 'application/json; indent=2')
+        FastJSONRenderer().render(data, 'application/json; indent=4')
+        assert dumps.call_count == 1
@@ -0,0 +1,199 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from cart.models import Cart, CartItem
+from myshop.middleware import ReplicaRoutingMiddleware
+from myshop.routers import ReplicaRouter, current_state, replica_reads
+from products.models import Category, Product
+
+REPLICAS = {'replica1': 2, 'replica2': 1}
+# Реплика в отдельном файле, отстающая от основной БД.
+LAGGING = 'lagging'
+
+
+@pytest.fixture(scope='module')
+def replica_connections(django_db_setup, tmp_path_factory):
+    """
+    Фикстура, добавляющая реплики - зеркала тестовой БД.
+
+    Реплика читает тестовую БД через отдельное соединение
+    и видит только зафиксированные данные, поэтому тесты
+    с репликами выполняются с transaction=True. Фикстура уровня
+    модуля, чтобы алиасы существовали до проверки databases теста.
+    """
+    for alias in REPLICAS:
+        connections.settings[alias] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            'TEST': {'MIRROR': DEFAULT_DB_ALIAS},
+        }
+    connections.settings[LAGGING] = {
+        **connections[DEFAULT_DB_ALIAS].settings_dict,
+        'NAME': tmp_path_factory.mktemp('replicas') / 'lagging.sqlite3',
+        'TEST': {'MIRROR': DEFAULT_DB_ALIAS},
+    }
+    yield list(REPLICAS)
+    for alias in [*REPLICAS, LAGGING]:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@pytest.fixture
+def replicas(replica_connections, settings):
+    """Фикстура, включающая реплики и отключающая кэш ответов."""
+    settings.DATABASE_REPLICAS = REPLICAS
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    }
+    return replica_connections
+
+
+def test_replica_router(settings):
+    """
+    Тест для проверки выбора БД роутером.
+
+    Реплики выбираются по кругу с учетом весов, модели вне каталога
+    читаются из основной БД, после записи запрос закрепляется
+    за основной БД, вне запроса реплики не используются.
+    """
+    settings.DATABASE_REPLICAS = REPLICAS
+    router = ReplicaRouter()
+
+    assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+    with replica_reads():
+        assert [router.db_for_read(Product) for _ in range(6)] == [
+            'replica1', 'replica1', 'replica2'] * 2
+        assert router.db_for_read(Cart) == DEFAULT_DB_ALIAS
+        assert router.db_for_write(Cart) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+    with replica_reads():
+        assert router.db_for_read(Product) in REPLICAS
+    assert router.allow_migrate('replica1', 'products') is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, 'products') is None
+
+    settings.DATABASE_REPLICAS = {}
+    with replica_reads():
+        assert router.db_for_read(Product) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=[DEFAULT_DB_ALIAS, *REPLICAS, LAGGING])
+def test_catalog_reads_use_replicas(replicas, authenticated_client, product):
+    """
+    Тест для проверки чтения каталога с реплик в запросах.
+
+    Список продуктов без кэша ответов (асинхронный эндпоинт)
+    читается с реплик, а не из основной БД.
+    Продукт, прочитанный с реплики, добавляется в корзину
+    в основной БД.
+    """
+    captured = {
+        alias: CaptureQueriesContext(connections[alias])
+        for alias in [DEFAULT_DB_ALIAS, *replicas]
+    }
+    for context in captured.values():
+        context.__enter__()
+    try:
+        for _ in range(3):
+            response = authenticated_client.get(
+                reverse('async-product-list'))
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()['results'][0]['name'] == product.name
+    finally:
+        for context in captured.values():
+            context.__exit__(None, None, None)
+
+    assert all(len(captured[alias]) for alias in replicas)
+    assert not any('products_product' in query['sql']
+                   for query in captured[DEFAULT_DB_ALIAS].captured_queries)
+
+    response = authenticated_client.post(
+        reverse('cart-add'), {'product_id': product.pk, 'quantity': 1})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert CartItem.objects.filter(product=product).exists()
+    assert current_state.get() is None
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=[DEFAULT_DB_ALIAS, *REPLICAS, LAGGING])
+def test_slug_check_ignores_lagging_replica(replica_connections, settings):
+    """
+    Тест для проверки подбора слага при отстающей реплике.
+
+    Занятые слаги читаются из основной БД, поэтому категория,
+    которой еще нет на реплике, не приводит к повторному слагу.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    lagging = connections[LAGGING]
+    primary.ensure_connection()
+    lagging.ensure_connection()
+    primary.connection.backup(lagging.connection)
+    Category.objects.create(name='Apples')
+    settings.DATABASE_REPLICAS = {LAGGING: 1}
+
+    with replica_reads():
+        assert not Category.objects.filter(slug='apples').exists()
+        # save() до вызова Model.save не обращается к db_for_write.
+        category = Category(name='Apples')
+        category.save()
+
+    assert category.slug == 'apples-1'
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=[DEFAULT_DB_ALIAS, *REPLICAS, LAGGING])
+def test_catalog_cache_ignores_lagging_replica(replica_connections, settings,
+                                               api_client, product):
+    """
+    Тест для проверки кэша каталога при отстающей реплике.
+
+    После изменения продукта версия каталога увеличивается, но реплика
+    еще хранит старое название. Ответ для кэша читается из основной
+    БД, поэтому в кэш под новой версией не попадают старые данные.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    lagging = connections[LAGGING]
+    primary.ensure_connection()
+    lagging.ensure_connection()
+    primary.connection.backup(lagging.connection)
+    product.name = 'Renamed Product'
+    product.save()
+    settings.DATABASE_REPLICAS = {LAGGING: 1}
+    url = reverse('product-detail', kwargs={'pk': product.pk})
+
+    with replica_reads():
+        assert Product.objects.get(pk=product.pk).name == 'Test Product'
+    for cache_status in ('MISS', 'HIT'):
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Cache'] == cache_status
+        assert response.data['name'] == 'Renamed Product'
+
+
+def test_unsafe_requests_read_from_primary():
+    """
+    Тест для проверки закрепления запросов с изменяющими методами
+    за основной БД с самого начала запроса.
+    """
+    pinned = {}
+
+    def get_response(request):
+        pinned[request.method] = current_state.get().pinned
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    factory = RequestFactory()
+    for method in ('get', 'head', 'post', 'put', 'patch', 'delete'):
+        middleware(getattr(factory, method)('/'))
+
+    assert pinned == {
+        'GET': False, 'HEAD': False, 'POST': True, 'PUT': True,
+        'PATCH': True, 'DELETE': True,
+    }
+    assert current_state.get() is None
@@ -0,0 +1,100 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from products.models import Product
+from products.search import SearchBackend, search_product_ids
+
+
+def test_product_search_ranking(api_client, subcategory):
+    """
+    Тест для проверки поиска продуктов по индексу.
+
+    Совпадение в названии продукта ранжируется выше совпадения
+    в названии подкатегории, поиск работает по префиксу слова
+    и не зависит от регистра.
+    """
+    subcategory.name = 'Яблоки и груши'
+    subcategory.save()
+    in_subcategory = Product.objects.create(
+        parent_subcategory=subcategory, name='Сок', slug='juice', price=1)
+    in_name = Product.objects.create(
+        parent_subcategory=subcategory, name='Яблоко зеленое',
+        slug='green-apple', price=2)
+    Product.objects.create(
+        parent_subcategory=subcategory, name='Хлеб', slug='bread', price=3)
+
+    response = api_client.get(reverse('product-search'), {'q': 'ЯБЛО'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 3
+    assert response.data['results'][0]['id'] == in_name.id, (
+        'Совпадение в названии продукта должно быть первым')
+
+    response = api_client.get(reverse('product-search'), {'q': 'зелен ябл'})
+    assert [item['id'] for item in response.data['results']] == [in_name.id]
+
+    response = api_client.get(reverse('product-search'), {'q': 'сок'})
+    assert [item['id'] for item in response.data['results']] == [
+        in_subcategory.id]
+
+
+def test_product_search_index_sync(api_client, products):
+    """
+    Тест для проверки синхронизации индекса при изменении
+    и удалении продуктов и переименовании подкатегории.
+    """
+    url = reverse('product-search')
+    product = products[0]
+    product.name = 'Уникальный товар'
+    product.save()
+    response = api_client.get(url, {'q': 'уникальный'})
+    assert [item['id'] for item in response.data['results']] == [product.id]
+
+    product.delete()
+    response = api_client.get(url, {'q': 'уникальный'})
+    assert response.data['count'] == 0, (
+        'Удаленный продукт остался в поисковом индексе')
+
+    subcategory = products[1].parent_subcategory
+    subcategory.name = 'Переименованная'
+    subcategory.save()
+    response = api_client.get(url, {'q': 'переименованная', 'page_size': 5})
+    assert response.data['count'] == len(products) - 1
+    assert len(response.data['results']) == 5
+
+
+def test_product_search_requires_query(api_client):
+    """
+    Тест для проверки ответа 400 при пустом поисковом запросе.
+    """
+    response = api_client.get(reverse('product-search'), {'q': ' '})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_index_migration_backfills_products(products):
+    """
+    Тест для проверки миграции поискового индекса.
+
+    Миграция не использует products.search: она создает таблицу
+    индекса и заполняет ее существующими продуктами сама.
+    """
+    migration = import_module('products.migrations.0004_product_search_index')
+    with connection.schema_editor() as schema_editor:
+        migration.drop_search_index(apps, schema_editor)
+        migration.create_search_index(apps, schema_editor)
+
+    assert sorted(search_product_ids('product')) == sorted(
+        product.pk for product in products)
+
+
+def test_search_backend_requires_search():
+    """
+    Тест для проверки, что поиск без метода search не создается.
+    """
+    with pytest.raises(TypeError):
+        SearchBackend(connection)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.models import Category, Product
+from products.slugs import assign_unique_slugs, taken_suffixes
+
+
+def test_slug_allocation_query_count(subcategory):
+    """
+    Тест для проверки выбора свободного суффикса слага одним запросом.
+
+    Число запросов SELECT при сохранении не должно зависеть
+    от количества уже занятых слагов с тем же названием.
+    """
+    for number in range(20):
+        Category.objects.create(name='Apples', slug=(
+            f'apples-{number}' if number else 'apples'))
+
+    with CaptureQueriesContext(connection) as context:
+        category = Category.objects.create(name='Apples')
+    slug_queries = [
+        query for query in context.captured_queries
+        if 'products_categorybase' in query['sql']
+        and query['sql'].startswith('SELECT')
+    ]
+    assert category.slug == 'apples-20'
+    assert len(slug_queries) == 1
+
+    # Слаги других моделей каталога тоже считаются занятыми.
+    Category.objects.filter(slug='apples-3').delete()
+    product = Product.objects.create(
+        parent_subcategory=subcategory, name='Apples', price=1)
+    assert product.slug == 'apples-3'
+
+
+def test_assign_unique_slugs(subcategory):
+    """
+    Тест для проверки пакетного заполнения слагов у несохраненных
+    объектов, включая совпадения внутри пакета и с базой.
+    """
+    Category.objects.create(name='Pears', slug='pears')
+    Category.objects.create(name='Plums', slug='plums-1')
+    objs = [
+        Category(name='Pears'),
+        Category(name='Pears'),
+        Category(name='Plums'),
+        Category(name='Plums'),
+        Category(name='Plums', slug='plums'),
+        Category(name='Figs'),
+    ]
+    assign_unique_slugs(objs)
+    assert [obj.slug for obj in objs] == [
+        'pears-1', 'pears-2', 'plums-2', 'plums-3', 'plums', 'figs']
+
+
+@pytest.mark.parametrize('vendor, operator', [
+    ('sqlite', '>='), ('postgresql', 'LIKE')])
+def test_taken_suffixes_uses_slug_index(vendor, operator):
+    """
+    Тест для проверки поиска занятых суффиксов по индексу slug.
+
+    Запрос не использует регулярное выражение: в SQLite слаги
+    выбираются диапазоном, в других СУБД, где правило сравнения
+    может не сравнивать '-' и '.' побайтно, - префиксом LIKE.
+    Слаги с другим продолжением ("apples-red-2") не считаются
+    занятыми номерами.
+    """
+    for slug in ('apples', 'apples-2', 'apples-red-2', 'apples2', 'apple'):
+        Category.objects.create(name=slug, slug=slug)
+
+    with mock.patch.object(connection, 'vendor', vendor), \
+            CaptureQueriesContext(connection) as context:
+        taken = taken_suffixes(['apples', 'pears'])
+
+    assert taken == {'apples': {0, 2}}
+    sql = context.captured_queries[0]['sql'].upper()
+    assert 'REGEXP' not in sql
+    assert operator in sql
@@ -0,0 +1,118 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from django.urls import reverse
+from PIL import Image
+
+from products import thumbnails
+
+
+@pytest.fixture
+def source_image(settings, tmp_path):
+    """Исходное изображение в MEDIA_ROOT и каталог кэша превью."""
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+    settings.THUMBNAIL_CACHE_DIR = str(tmp_path / 'thumbnails')
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, 'products'))
+    Image.new('RGB', (1000, 500), 'blue').save(
+        os.path.join(settings.MEDIA_ROOT, 'products', 'photo.jpg'))
+    return 'products/photo.jpg'
+
+
+def test_thumbnail_endpoint(client, source_image, settings):
+    """
+    Тест для проверки эндпоинта превью.
+
+    Первый запрос строит превью, повторный отдает готовый файл
+    с диска с заголовками долгого кэширования и ETag.
+    """
+    url = reverse('thumbnail', kwargs={'width': 320, 'path': source_image})
+    accept = 'image/avif,image/webp,*/*'
+    response = client.get(url, HTTP_ACCEPT=accept)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'image/webp'
+    assert f'max-age={settings.THUMBNAIL_MAX_AGE}' in response[
+        'Cache-Control']
+    image = Image.open(BytesIO(b''.join(response.streaming_content)))
+    assert image.size == (320, 160)
+
+    cached = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(settings.THUMBNAIL_CACHE_DIR)
+        for name in names if name.endswith('.webp')
+    ]
+    assert len(cached) == 1
+    modified = os.stat(cached[0]).st_mtime_ns
+
+    response = client.get(
+        url, HTTP_ACCEPT=accept, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == 304
+    response = client.get(url, HTTP_ACCEPT=accept)
+    assert response.status_code == 200
+    assert os.stat(cached[0]).st_mtime_ns == modified, (
+        'Превью построено повторно')
+
+
+def test_thumbnail_negotiates_format(client, source_image):
+    """
+    Тест для проверки выбора формата превью по заголовку Accept.
+
+    Клиент без image/webp в Accept (в том числе с масками image/*
+    и */*) получает JPEG, в ответах есть Vary: Accept, у форматов
+    разные ETag.
+    """
+    url = reverse('thumbnail', kwargs={'width': 320, 'path': source_image})
+    responses = {
+        accept: client.get(url, HTTP_ACCEPT=accept)
+        for accept in ('image/webp,*/*', 'image/png,image/*;q=0.8,*/*', '')
+    }
+
+    assert [response['Content-Type'] for response in responses.values()] == [
+        'image/webp', 'image/jpeg', 'image/jpeg']
+    assert all('Accept' in response['Vary']
+               for response in responses.values())
+    webp, jpeg, _ = responses.values()
+    assert webp['ETag'] != jpeg['ETag']
+    response = client.get(
+        url, HTTP_ACCEPT='image/webp', HTTP_IF_NONE_MATCH=jpeg['ETag'])
+    assert response.status_code == 200
+    assert 'Accept' in response['Vary']
+
+
+@pytest.mark.parametrize('width, path', [
+    (321, 'products/photo.jpg'),
+    (320, 'products/missing.jpg'),
+    (320, '../../etc/passwd'),
+])
+def test_thumbnail_not_found(client, source_image, width, path):
+    """
+    Тест для проверки ответа 404 для недопустимой ширины,
+    отсутствующего файла и пути за пределами MEDIA_ROOT.
+    """
+    response = client.get(f'/image/w/{width}/{path}')
+    assert response.status_code == 404
+
+
+def test_thumbnail_concurrent_generation(source_image, monkeypatch):
+    """
+    Тест для проверки того, что одновременные запросы одного
+    превью строят его только один раз.
+    """
+    calls = []
+    render_variant = thumbnails.render_variant
+
+    def slow_render_variant(*args):
+        calls.append(args)
+        time.sleep(0.2)
+        render_variant(*args)
+
+    monkeypatch.setattr(thumbnails, 'render_variant', slow_render_variant)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = set(executor.map(
+            lambda _: thumbnails.get_thumbnail(source_image, 640)[0],
+            range(8)))
+
+    assert len(calls) == 1
+    assert len(paths) == 1
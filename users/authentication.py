@@ -0,0 +1,67 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import \
+    JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+async def aauthenticate(request):
+    """
+    Асинхронная аутентификация запроса по заголовку Authorization.
+
+    Поддерживает те же схемы, что и API на DRF: JWT ('Bearer <token>')
+    проверяется только по подписи, без запросов к БД, токен
+    'Token <key>' ищется в БД асинхронным запросом.
+
+    Аргументы:
+    - request: Экземпляр HttpRequest.
+
+    Возвращает:
+    - Пользователя (TokenUser для JWT, модель пользователя для Token)
+    или None, если учетные данные не переданы или некорректны.
+    """
+    header = request.headers.get('Authorization', '').split()
+    if len(header) != 2:
+        return None
+    keyword, key = header
+    if keyword in api_settings.AUTH_HEADER_TYPES:
+        authentication = JWTStatelessUserAuthentication()
+        try:
+            return authentication.get_user(
+                authentication.get_validated_token(key.encode()))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+    if keyword == 'Token':
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        return token.user if token.user.is_active else None
+    return None
+
+
+def async_auth_required(view):
+    """
+    Декоратор асинхронного представления, доступного только
+    аутентифицированным пользователям (см. aauthenticate).
+
+    Пользователь сохраняется в request.user, без учетных данных
+    возвращается ответ HTTP 401 в формате ошибок DRF.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aauthenticate(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Учетные данные не были предоставлены '
+                           'или некорректны.'},
+                status=401
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from cart.models import Cart
+from myshop.benchmarking import (format_summary, isolated_database, measure,
+                                 summarize)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение времени запроса корзины с аутентификацией по токену '
+        'из БД (Token) и по JWT (Bearer) в отдельной тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Количество запросов для каждой схемы (по умолчанию 1000).'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with isolated_database():
+                self.run(options['requests'])
+        finally:
+            teardown_test_environment()
+
+    def run(self, requests):
+        user = User.objects.create_user(
+            username='benchmark', email='benchmark@example.com',
+            password='benchmark-password')
+        # GET корзины ничего не пишет в БД, поэтому корзина создается
+        # заранее: обе схемы измеряют чтение существующей корзины.
+        Cart.objects.create(user=user)
+        schemes = {
+            'Token': f'Token {Token.objects.create(user=user).key}',
+            'JWT': f'Bearer {RefreshToken.for_user(user).access_token}',
+        }
+        url = reverse('cart-detail')
+        for name, authorization in schemes.items():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=authorization)
+
+            def request():
+                response = client.get(url)
+                assert response.status_code == 200, response.content
+
+            # Первый запрос прогревает кэши.
+            request()
+            # Журнал запросов очищается в начале каждого HTTP-запроса.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                request()
+            queries = len(context.captured_queries)
+            timings = measure(request, requests)
+            self.stdout.write(
+                f'{format_summary(name, summarize(timings))}; '
+                f'запросов к БД на запрос: {queries}')
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def available_cpu_count():
+    """
+    Возвращает количество ядер, доступных текущему процессу.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _setup_worker(settings_module):
+    """
+    Настраивает Django в дочернем процессе пула.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+@contextmanager
+def password_hasher(workers=None):
+    """
+    Контекстный менеджер для хэширования паролей в пуле процессов.
+
+    Хэширование (PBKDF2) занимает процессор, поэтому оно распределяется
+    по процессам, а не потокам. Пул создается один раз и используется
+    для всех пакетов.
+
+    Аргументы:
+    - workers: Количество процессов (по умолчанию - число доступных ядер).
+      При значении 1 пароли хэшируются в текущем процессе.
+
+    Возвращает:
+    - Функцию, которая принимает список паролей и возвращает
+      список хэшей в том же порядке.
+    """
+    workers = workers or available_cpu_count()
+    if workers <= 1:
+        yield lambda passwords: [make_password(pw) for pw in passwords]
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_setup_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE',
+                                 'myshop.settings'),)
+    ) as executor:
+        def hash_passwords(passwords):
+            chunksize = max(1, len(passwords) // (workers * 4))
+            return list(executor.map(
+                make_password, passwords, chunksize=chunksize))
+        yield hash_passwords